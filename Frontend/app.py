@@ -1,8 +1,95 @@
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+
+# "http": ask the API at SHL_API_URL. "inprocess": import the retrieval
+# engine and search in this process, for single-box deployments (run from
+# the repository root, like the API; needs requirements-inprocess.txt)
+FRONTEND_MODE = os.getenv("SHL_FRONTEND_MODE", "http")
+API_URL = os.getenv("SHL_API_URL", "http://127.0.0.1:8000").rstrip("/")
+# NDJSON: one assessment per line as soon as the API has it
+STREAM_URL = f"{API_URL}/recommend/stream"
+# Queries whose results each browser session keeps
+RESULT_CACHE_SIZE = int(os.getenv("SHL_FRONTEND_CACHE_SIZE", "64"))
+
+
+class BackendError(Exception):
+    pass
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    # One keep-alive pool shared by every browser session of this server
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource(show_spinner="Loading the retrieval engine...")
+def get_engine():
+    # Streamlit only puts Frontend/ on the path
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from Processing.serving import LeanEngine
+
+    engine = LeanEngine()
+    engine.wait_ready()
+    return engine
+
+
+def stream_from_api(query, top_k):
+    with get_session().post(
+        STREAM_URL,
+        json={"query": query, "top_k": top_k},
+        stream=True,
+        timeout=60
+    ) as response:
+        if response.status_code != 200:
+            raise BackendError(f"HTTP {response.status_code}")
+
+        for line in response.iter_lines():
+            if not line:
+                continue
+            event = json.loads(line)
+
+            if event["event"] == "result":
+                yield event["assessment"]
+            elif event["event"] == "error":
+                raise BackendError(event["detail"])
+
+
+def search_in_process(query, top_k):
+    return get_engine().recommend_batch([query], top_n=top_k, include_evidence=False)[0]
+
+
+def cached_results(query, top_k):
+    """
+    Results for the same query and at least `top_k` were fetched earlier
+    in this session: their prefix is the answer.
+    """
+    cache = st.session_state.setdefault("results", OrderedDict())
+    entry = cache.get(query.strip())
+    if entry is None or entry[0] < top_k:
+        return None
+    cache.move_to_end(query.strip())
+    return entry[1][:top_k]
+
+
+def cache_results(query, top_k, results):
+    cache = st.session_state.setdefault("results", OrderedDict())
+    cache[query.strip()] = (top_k, results)
+    cache.move_to_end(query.strip())
+    while len(cache) > RESULT_CACHE_SIZE:
+        cache.popitem(last=False)
 
-API_URL = "http://127.0.0.1:8000/recommend"
- 
 
 st.set_page_config(
     page_title="SHL Assessment Recommendation Engine",
@@ -27,42 +114,84 @@ top_k = st.slider("Number of recommendations", 3, 10, 5)
 
 submit = st.button("Get Recommendations")
 
+
+def render_result(idx, r):
+    with st.container():
+        st.markdown(f"### {idx}. {r['name']}")
+        st.markdown(f"**Match Score:** `{round(r['match_score'], 2)}`")
+
+        st.markdown(
+            f"""
+            - **Assessment ID:** `{r['assessment_id']}`
+            - **Job Levels:** {", ".join(r.get("job_levels", []))}
+            - **Test Types:** {", ".join(r.get("test_types", []))}
+            - **Duration (mins):** {r.get("duration_minutes", "N/A")}
+            """
+        )
+        st.divider()
+
+
+def show_recommendations(query, top_k):
+    status = st.empty()
+
+    results = cached_results(query, top_k)
+    if results is not None:
+        if not results:
+            status.info("No matching assessments found.")
+            return
+        status.success("Top Recommended Assessments")
+        for idx, r in enumerate(results, start=1):
+            render_result(idx, r)
+        st.caption("Results from earlier in this session")
+        return
+
+    status.info("Finding best assessments...")
+
+    start = time.perf_counter()
+    first_result_ms = None
+    results = []
+
+    try:
+        if FRONTEND_MODE == "inprocess":
+            source = search_in_process(query, top_k)
+        else:
+            source = stream_from_api(query, top_k)
+
+        for r in source:
+            if first_result_ms is None:
+                first_result_ms = 1000 * (time.perf_counter() - start)
+                status.success("Top Recommended Assessments")
+            results.append(r)
+            render_result(len(results), r)
+
+    except BackendError:
+        status.error("Backend error. Please try again later.")
+        return
+    except Exception as e:
+        if FRONTEND_MODE == "inprocess":
+            status.error(f"Search failed: {e}")
+        else:
+            status.error(f"Failed to connect to backend: {e}")
+        return
+
+    cache_results(query, top_k, results)
+
+    if not results:
+        status.info("No matching assessments found.")
+    else:
+        total_ms = 1000 * (time.perf_counter() - start)
+        st.caption(
+            f"First result in {first_result_ms:.0f} ms, "
+            f"all {len(results)} in {total_ms:.0f} ms"
+        )
+
+
 if submit:
+    st.session_state["submitted_query"] = query
+
+# Moving the slider reruns the script: keep showing the submitted query
+if submit or (query.strip() and query == st.session_state.get("submitted_query")):
     if not query.strip():
         st.warning("Please enter a job description.")
     else:
-        with st.spinner("Finding best assessments..."):
-            try:
-                response = requests.post(
-                    API_URL,
-                    json={"query": query, "top_k": top_k},
-                    timeout=60
-                )
-
-                if response.status_code != 200:
-                    st.error("Backend error. Please try again later.")
-                else:
-                    results = response.json()
-
-                    if not results:
-                        st.info("No matching assessments found.")
-                    else:
-                        st.success("Top Recommended Assessments")
-
-                        for idx, r in enumerate(results, start=1):
-                            with st.container():
-                                st.markdown(f"### {idx}. {r['name']}")
-                                st.markdown(f"**Match Score:** `{round(r['match_score'], 2)}`")
-
-                                st.markdown(
-                                    f"""
-                                    - **Assessment ID:** `{r['assessment_id']}`
-                                    - **Job Levels:** {", ".join(r.get("job_levels", []))}
-                                    - **Test Types:** {", ".join(r.get("test_types", []))}
-                                    - **Duration (mins):** {r.get("duration_minutes", "N/A")}
-                                    """
-                                )
-                                st.divider()
-
-            except Exception as e:
-                st.error(f"Failed to connect to backend: {e}")
+        show_recommendations(query, top_k)
@@ -0,0 +1,132 @@
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from Processing.hash_embeddings import HASH_EMBEDDING_DIM, HASH_EMBEDDING_MODEL_NAME
+
+# Query/document encoders the index can be built and served with, picked by
+# SHL_EMBEDDING_BACKEND at build time (Processing.embeddings --backend) and
+# at serve time. Every index version records the encoder it was built with
+# in embedding.json, and loaders refuse to pair it with a different one:
+# vectors from two models live in unrelated spaces, so a mismatch would
+# return plausible-looking but meaningless rankings instead of an error.
+#
+# Chunks are at most CHUNK_SIZE characters (~250 tokens), inside the
+# window of every model below (MiniLM truncates at 256 tokens).
+
+EMBEDDING_MANIFEST_FILE = "embedding.json"
+
+
+class EmbeddingMismatchError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class EmbeddingBackend:
+    name: str
+    model_name: str
+    dim: int
+    # "sentence-transformers" or "hash"
+    kind: str = "sentence-transformers"
+
+    @property
+    def stand_in(self) -> bool:
+        """
+        The hash encoder serves any index, at the index's dimension, for
+        load tests; its rankings are not meaningful.
+        """
+        return self.kind == "hash"
+
+
+BACKENDS: Dict[str, EmbeddingBackend] = {
+    backend.name: backend
+    for backend in (
+        EmbeddingBackend("mpnet", "sentence-transformers/all-mpnet-base-v2", 768),
+        EmbeddingBackend("minilm", "sentence-transformers/all-MiniLM-L6-v2", 384),
+        EmbeddingBackend("minilm-l12", "sentence-transformers/all-MiniLM-L12-v2", 384),
+        EmbeddingBackend("hash", HASH_EMBEDDING_MODEL_NAME, HASH_EMBEDDING_DIM, kind="hash"),
+    )
+}
+
+# "huggingface" predates the registry and meant mpnet
+ALIASES = {"huggingface": "mpnet"}
+
+DEFAULT_BACKEND = "mpnet"
+EMBEDDING_BACKEND = os.getenv("SHL_EMBEDDING_BACKEND", DEFAULT_BACKEND)
+
+# What an index without embedding.json was built with: before the registry,
+# every build used mpnet
+LEGACY_BACKEND = "mpnet"
+
+
+def get_backend(name: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+    name = ALIASES.get(name, name)
+    if name not in BACKENDS:
+        raise ValueError(
+            f"Unknown embedding backend {name!r} (use {', '.join(BACKENDS)})"
+        )
+    return BACKENDS[name]
+
+
+def write_embedding_manifest(directory: Path, backend: EmbeddingBackend, dim: int):
+    manifest = {"backend": backend.name, "model_name": backend.model_name, "dim": int(dim)}
+    with open(Path(directory) / EMBEDDING_MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_embedding_manifest(directory: Path) -> Optional[Dict]:
+    path = Path(directory) / EMBEDDING_MANIFEST_FILE
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def index_backend(directory: Path) -> Dict:
+    """The manifest of the index in `directory`, or the legacy default."""
+    manifest = read_embedding_manifest(directory)
+    if manifest is None:
+        legacy = BACKENDS[LEGACY_BACKEND]
+        return {"backend": legacy.name, "model_name": legacy.model_name, "dim": legacy.dim}
+    return manifest
+
+
+def check_compatible(
+    directory: Path,
+    backend: EmbeddingBackend,
+    dim: int,
+    encoder_dim: Optional[int] = None,
+):
+    """
+    Raises EmbeddingMismatchError unless `backend` encodes queries in the
+    space of the index in `directory`, whose vectors are `dim`-d.
+    `encoder_dim` is the size of an already loaded encoder's vectors.
+
+    Any model name goes for the hash stand-in, but its dimension must
+    still match the index.
+    """
+    built = index_backend(directory)
+    if not backend.stand_in and built["model_name"] != backend.model_name:
+        raise EmbeddingMismatchError(
+            f"{directory} was built with {built['model_name']} ({built['backend']}), "
+            f"not {backend.model_name} ({backend.name}); serve it with "
+            f"SHL_EMBEDDING_BACKEND={built['backend']} or rebuild it with "
+            f"`python -m Processing.embeddings --backend {backend.name}`"
+        )
+
+    if built["dim"] != dim:
+        raise EmbeddingMismatchError(
+            f"{directory} holds {dim}-d vectors, its manifest says {built['dim']}-d"
+        )
+
+    if not backend.stand_in and backend.dim != dim:
+        raise EmbeddingMismatchError(
+            f"{directory} holds {dim}-d vectors, {backend.name} encodes {backend.dim}-d"
+        )
+
+    if encoder_dim is not None and encoder_dim != dim:
+        raise EmbeddingMismatchError(
+            f"{directory} holds {dim}-d vectors, the loaded encoder produces {encoder_dim}-d"
+        )
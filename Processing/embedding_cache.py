@@ -0,0 +1,232 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form used for cache keys: NFKC + collapsed whitespace
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(text: str, model_name: str, dim: int) -> str:
+    # The hash stand-in encodes at whatever dimension its index was built with
+    payload = f"{model_name}\x00{dim}\x00{normalize_query(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """
+    Two-tier cache for query embeddings.
+
+    Tier 1 is an in-memory LRU bounded by `max_size` entries and
+    `ttl_seconds`. Tier 2 is an optional directory of `.npy` files keyed by
+    normalized query text + model name + dimension; it has no TTL because an embedding
+    never goes stale for a fixed model. Once it holds `disk_max_entries`
+    files, new vectors stay in memory only. Several processes may share the
+    directory, so the bound is approximate: each counts its own writes.
+
+    A failing disk write is ignored; the cache never fails a request.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_size: int = 1024,
+        ttl_seconds: Optional[float] = 3600,
+        disk_dir: Optional[Path] = None,
+        disk_max_entries: int = 50_000,
+    ):
+        self.model_name = model_name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_entries = disk_max_entries
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._encode_seconds = 0.0
+        self._encodes = 0
+
+        self.set_disk_dir(disk_dir)
+
+    def set_disk_dir(self, disk_dir: Optional[Path]):
+        """Turns the disk tier on at `disk_dir`, or off with None."""
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._disk_entries = 0
+
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_entries = sum(1 for _ in self.disk_dir.glob("*/*.npy"))
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.npy"
+
+    def _remember(self, key: str, vector: np.ndarray):
+        # caller holds the lock
+        self._memory[key] = (vector, time.monotonic())
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+            self._evictions += 1
+
+    def get(self, text: str, dim: int) -> Optional[List[float]]:
+        key = cache_key(text, self.model_name, dim)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self._hits += 1
+                    return vector.tolist()
+
+                del self._memory[key]
+                self._expirations += 1
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                vector = np.load(path, allow_pickle=False)
+            except (FileNotFoundError, ValueError, OSError):
+                vector = None
+
+            if vector is not None:
+                with self._lock:
+                    self._remember(key, vector)
+                    self._disk_hits += 1
+                return vector.tolist()
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, text: str, vector: Sequence[float], encode_seconds: float = 0.0):
+        array = np.asarray(vector, dtype=np.float32)
+        key = cache_key(text, self.model_name, len(array))
+
+        with self._lock:
+            self._remember(key, array)
+            self._encode_seconds += encode_seconds
+            self._encodes += 1
+
+        if self.disk_dir and self._disk_entries < self.disk_max_entries:
+            self._write(self._disk_path(key), array)
+
+    def _write(self, path: Path, array: np.ndarray):
+        # A temp file per writer: request threads, the batcher and other
+        # workers may store the same key at once
+        tmp_path = None
+        try:
+            if path.exists():
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(tmp_path, path)
+            tmp_path = None
+            with self._lock:
+                self._disk_entries += 1
+        except OSError:
+            pass
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            avg_encode = self._encode_seconds / self._encodes if self._encodes else 0.0
+            saved = self._hits + self._disk_hits
+
+            return {
+                "model_name": self.model_name,
+                "size": len(self._memory),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self.disk_dir is not None,
+                "disk_entries": self._disk_entries,
+                "disk_max_entries": self.disk_max_entries,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "hit_rate": round(saved / lookups, 4) if lookups else 0.0,
+                "avg_encode_seconds": round(avg_encode, 6),
+                "estimated_encoder_seconds_saved": round(saved * avg_encode, 3),
+            }
+
+
+class CachedEmbeddings:
+    """
+    Wraps an embeddings model (anything with `embed_query` /
+    `embed_documents`) so repeated queries skip the forward pass.
+    Document embeddings are passed straight through. `dim` is the size of
+    the vectors `embeddings` produces.
+
+    Kept free of LangChain imports; `load_vector_store()` registers it as a
+    virtual subclass of `langchain_core.embeddings.Embeddings`.
+    """
+
+    def __init__(self, embeddings, cache: QueryEmbeddingCache, dim: int):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.dim = dim
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = self.cache.get(text, self.dim)
+        if vector is not None:
+            return vector
+
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(normalize_query(text))
+        self.cache.put(text, vector, encode_seconds=time.perf_counter() - start)
+
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        vectors = [self.cache.get(text, self.dim) for text in texts]
+        missing = [i for i, v in enumerate(vectors) if v is None]
+
+        if missing:
+            start = time.perf_counter()
+            encoded = self.embeddings.embed_documents(
+                [normalize_query(texts[i]) for i in missing]
+            )
+            per_query = (time.perf_counter() - start) / len(missing)
+
+            for i, vector in zip(missing, encoded):
+                self.cache.put(texts[i], vector, encode_seconds=per_query)
+                vectors[i] = vector
+
+        return vectors
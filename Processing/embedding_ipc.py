@@ -0,0 +1,141 @@
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Wire format between API workers and the shared embedding server
+# (api/embedding_server.py) over a Unix domain socket. Every message is a
+# frame: a 4-byte big-endian length, then a JSON header line, then an
+# optional raw payload.
+#
+#   request   {"op": "embed", "texts": [...]}      | {"op": "info"}
+#   response  {"rows": n, "dim": d} + n*d float32  | {"backend", "model_name", "dim"}
+#             {"error": "..."} on failure
+#
+# Vectors travel as float32 bytes, not JSON, so a batch costs one memcpy.
+
+# When set, lean workers encode through the server at this socket path
+# instead of loading a model of their own
+EMBEDDING_SERVER = os.getenv("SHL_EMBEDDING_SERVER", "")
+EMBEDDING_SERVER_TIMEOUT_SECONDS = 60
+EMBEDDING_SERVER_READY_TIMEOUT_SECONDS = 300
+
+_LENGTH = struct.Struct(">I")
+
+
+class EmbeddingServerError(RuntimeError):
+    pass
+
+
+def pack(header: Dict, payload: bytes = b"") -> bytes:
+    body = json.dumps(header).encode("utf-8") + b"\n" + payload
+    return _LENGTH.pack(len(body)) + body
+
+
+def unpack(body: bytes) -> Tuple[Dict, bytes]:
+    line, _, payload = body.partition(b"\n")
+    return json.loads(line), payload
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < n:
+        chunk = sock.recv(n - len(buffer))
+        if not chunk:
+            raise ConnectionError("Embedding server closed the connection")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def recv_frame(sock: socket.socket) -> Tuple[Dict, bytes]:
+    (length,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    return unpack(_recv_exactly(sock, length))
+
+
+async def read_frame(reader) -> Tuple[Dict, bytes]:
+    """asyncio counterpart of recv_frame, for the server side."""
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return unpack(await reader.readexactly(length))
+
+
+class RemoteEmbeddings:
+    """
+    Embeddings served by another process: the same embed_query /
+    embed_documents interface as the local models, so CachedEmbeddings
+    wraps it unchanged. Each calling thread keeps its own connection; a
+    broken connection is reopened once per call.
+    """
+
+    def __init__(self, path: str = EMBEDDING_SERVER, timeout: float = EMBEDDING_SERVER_TIMEOUT_SECONDS):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, header: Dict) -> Tuple[Dict, bytes]:
+        message = pack(header)
+
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(message)
+                response, payload = recv_frame(sock)
+                break
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt:
+                    raise
+
+        if "error" in response:
+            raise EmbeddingServerError(response["error"])
+        return response, payload
+
+    def info(self) -> Dict:
+        return self._call({"op": "info"})[0]
+
+    def wait_ready(self, timeout: float = EMBEDDING_SERVER_READY_TIMEOUT_SECONDS) -> Dict:
+        """info() once the server accepts connections (it may still be loading)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.info()
+            except (OSError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.2)
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        header, payload = self._call({"op": "embed", "texts": list(texts)})
+        return np.frombuffer(payload, dtype=np.float32).reshape(header["rows"], header["dim"])
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -1,10 +1,36 @@
+import argparse
+import hashlib
 import json
+import re
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
+import faiss
+import numpy as np
 from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+
+from Processing.embedding_backends import (
+    BACKENDS,
+    EMBEDDING_BACKEND,
+    EmbeddingBackend,
+    get_backend,
+    index_backend,
+    write_embedding_manifest,
+)
+from Processing.hash_embeddings import HashEmbeddings
+from Processing.index_versions import current_version, resolve_index_dir, staged_version
+from Processing.lexical import write_lexical_index
+from Processing.metadata_store import MetadataStore
+from Processing.records import read_records, resolve_input
+from Processing.vector_store import (
+    INDEX_FILE,
+    INDEX_MODE,
+    INDEX_MODES,
+    build_index,
+    index_mode,
+    write_index_files,
+)
 
 STRUCTURED_DATA_PATH = Path(
     "Data/final_enriched_data/shl_assessments_structured.json"
@@ -13,10 +39,22 @@ STRUCTURED_DATA_PATH = Path(
 VECTOR_STORE_DIR = Path("Data/vector_store/shl_faiss")
 VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
-EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+BACKEND = get_backend(EMBEDDING_BACKEND)
+EMBEDDING_MODEL_NAME = BACKEND.model_name
 
+# Chunk bounds in characters (~200-250 tokens; mpnet's window is 384,
+# MiniLM's 256)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 150
 
-def build_embedding_text(assessment: Dict) -> str:
+# Content-addressed vector cache: one row per embedded text, keyed by
+# sha256(model + chunk text). Rebuilds only encode texts
+# whose hash is not in here. One cache per backend (embedding_cache_dir),
+# so switching encoders back and forth re-encodes nothing.
+EMBEDDING_CACHE_DIR = Path("Data/vector_store/embedding_cache")
+
+
+def build_profile_text(assessment: Dict) -> str:
 
     parts = []
 
@@ -46,6 +84,13 @@ def build_embedding_text(assessment: Dict) -> str:
     if skills:
         parts.append("Skills & Competencies: " + " | ".join(skills))
 
+    return "\n".join(parts)
+
+
+def build_embedding_text(assessment: Dict) -> str:
+
+    parts = [build_profile_text(assessment)]
+
     
     text_corpus = assessment.get("text_corpus", {})
     if text_corpus.get("description"):
@@ -57,11 +102,61 @@ def build_embedding_text(assessment: Dict) -> str:
     return "\n".join(parts)
 
 
-def create_documents(data: List[Dict]) -> List[Document]:
-    documents = []
+def split_text(
+    text: str,
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP
+) -> List[str]:
+    """
+    Whitespace-normalized windows of at most `chunk_size` characters,
+    cut on word boundaries, overlapping by roughly `overlap` characters.
+    """
+    text = re.sub(r"\s+", " ", text or "").strip()
+    if not text:
+        return []
+
+    chunks = []
+    start = 0
+
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+
+        if end < len(text):
+            space = text.rfind(" ", start + chunk_size // 2, end)
+            if space != -1:
+                end = space
+
+        chunks.append(text[start:end].strip())
+
+        if end >= len(text):
+            break
+
+        start = max(end - overlap, start + 1)
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+
+    return chunks
+
+
+def build_chunks(assessment: Dict) -> List[str]:
+    """
+    One profile chunk (name, levels, roles, duration, skills) followed by
+    bounded description and PDF chunks, each prefixed with the name.
+    """
+    chunks = [build_profile_text(assessment)]
+    name_line = f"Assessment Name: {assessment.get('name', '')}"
+
+    text_corpus = assessment.get("text_corpus", {})
+    for label, key in (("Description", "description"), ("PDF Content", "pdf_text")):
+        for piece in split_text(text_corpus.get(key)):
+            chunks.append(f"{name_line}\n{label}: {piece}")
+
+    return chunks
+
 
+def iter_documents(data: Iterable[Dict]) -> Iterator[Document]:
     for assessment in data:
-        content = build_embedding_text(assessment)
 
         metadata = {
             "assessment_id": assessment["assessment_id"],
@@ -72,39 +167,282 @@ def create_documents(data: List[Dict]) -> List[Document]:
                 "duration_minutes"
             ),
             "test_types": assessment.get("assessment_metadata", {}).get("test_types", []),
+            "remote_testing": assessment.get("assessment_metadata", {}).get(
+                "remote_testing"
+            ),
         }
 
-        documents.append(
-            Document(
+        for chunk_index, content in enumerate(build_chunks(assessment)):
+            yield Document(
                 page_content=content,
-                metadata=metadata,
+                metadata={**metadata, "chunk_index": chunk_index},
             )
+
+
+def create_documents(data: Iterable[Dict]) -> List[Document]:
+    return list(iter_documents(data))
+
+
+def embedding_cache_dir(backend: EmbeddingBackend = BACKEND) -> Path:
+    # mpnet keeps the directory it had before there were other backends
+    if backend.name == "mpnet":
+        return EMBEDDING_CACHE_DIR
+    return EMBEDDING_CACHE_DIR.with_name(f"{EMBEDDING_CACHE_DIR.name}-{backend.name}")
+
+
+def load_document_encoder(backend: EmbeddingBackend = BACKEND):
+    if backend.stand_in:
+        return HashEmbeddings(backend.dim)
+    return HuggingFaceEmbeddings(model_name=backend.model_name)
+
+
+def content_hash(text: str, model_name: str = EMBEDDING_MODEL_NAME) -> str:
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def load_embedding_cache(
+    cache_dir: Path = EMBEDDING_CACHE_DIR,
+    model_name: str = EMBEDDING_MODEL_NAME,
+) -> Tuple[Dict[str, int], Optional[np.ndarray]]:
+    """
+    Returns {content hash: row} and the memory-mapped vector matrix.
+    """
+    manifest_path = Path(cache_dir) / "ids.json"
+    vectors_path = Path(cache_dir) / "vectors.npy"
+
+    if not manifest_path.exists() or not vectors_path.exists():
+        return {}, None
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("model_name") != model_name:
+        print(f"Embedding cache built with {manifest.get('model_name')}, ignoring it")
+        return {}, None
+
+    vectors = np.load(vectors_path, mmap_mode="r")
+    rows = {entry["hash"]: row for row, entry in enumerate(manifest["entries"])}
+
+    return rows, vectors
+
+
+def save_embedding_cache(
+    ids: List[str],
+    hashes: List[str],
+    vectors: np.ndarray,
+    cache_dir: Path = EMBEDDING_CACHE_DIR,
+    model_name: str = EMBEDDING_MODEL_NAME,
+):
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    # Write-then-rename so a reader holding the old mmap is never torn
+    tmp_vectors = cache_dir / "vectors.tmp.npy"
+    out = np.lib.format.open_memmap(
+        tmp_vectors, mode="w+", dtype=np.float32, shape=vectors.shape
+    )
+    out[:] = vectors
+    out.flush()
+    del out
+    tmp_vectors.replace(cache_dir / "vectors.npy")
+
+    manifest = {
+        "model_name": model_name,
+        "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0,
+        "entries": [{"assessment_id": i, "hash": h} for i, h in zip(ids, hashes)],
+    }
+
+    tmp_manifest = cache_dir / "ids.tmp.json"
+    with open(tmp_manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    tmp_manifest.replace(cache_dir / "ids.json")
+
+
+def embed_incrementally(
+    documents: List[Document],
+    cache_dir: Path = EMBEDDING_CACHE_DIR,
+    embeddings=None,
+    backend: EmbeddingBackend = BACKEND,
+) -> np.ndarray:
+    """
+    Vectors for `documents`, in order, encoding only new or changed texts.
+    Entries for removed documents are dropped from the rewritten cache.
+    """
+    texts = [doc.page_content for doc in documents]
+    ids = [doc.metadata["assessment_id"] for doc in documents]
+    hashes = [content_hash(t, backend.model_name) for t in texts]
+
+    cached_rows, cached_vectors = load_embedding_cache(cache_dir, backend.model_name)
+
+    missing = [i for i, h in enumerate(hashes) if h not in cached_rows]
+    removed = len(set(cached_rows) - set(hashes))
+
+    print(
+        f"Embeddings: {len(texts) - len(missing)} reused, "
+        f"{len(missing)} new/changed, {removed} removed"
+    )
+
+    encoded = None
+    if missing:
+        embeddings = embeddings or load_document_encoder(backend)
+        encoded = np.asarray(
+            embeddings.embed_documents([texts[i] for i in missing]),
+            dtype=np.float32,
         )
 
-    return documents
+    if encoded is not None:
+        dim = encoded.shape[1]
+    elif cached_vectors is not None:
+        dim = cached_vectors.shape[1]
+    else:
+        dim = 0
 
-def main():
-    print("Loading structured assessment data...")
-    with open(STRUCTURED_DATA_PATH, "r", encoding="utf-8") as f:
-        assessments = json.load(f)
+    vectors = np.empty((len(texts), dim), dtype=np.float32)
+
+    missing_pos = {i: n for n, i in enumerate(missing)}
+    for i, h in enumerate(hashes):
+        if i in missing_pos:
+            vectors[i] = encoded[missing_pos[i]]
+        else:
+            vectors[i] = cached_vectors[cached_rows[h]]
+
+    save_embedding_cache(ids, hashes, vectors, cache_dir, backend.model_name)
+
+    return vectors
+
+
+def seed_cache_from_index(
+    documents: List[Document],
+    index_dir: Path = VECTOR_STORE_DIR,
+    backend: EmbeddingBackend = BACKEND,
+):
+    """
+    Bootstraps the vector cache from an existing index whose stored texts
+    match the current documents, so the first incremental build is free.
+    """
+    index_dir = resolve_index_dir(index_dir)
+    built = index_backend(index_dir)
+    if built["model_name"] != backend.model_name:
+        raise ValueError(f"{index_dir} was built with {built['model_name']}, not {backend.model_name}")
 
-    print(f"Loaded {len(assessments)} assessments")
+    index = faiss.read_index(str(index_dir / INDEX_FILE))
+    if index_mode(index) != "flat":
+        raise ValueError("Only a flat (lossless) index can seed the embedding cache")
 
-    print("Creating documents...")
-    documents = create_documents(assessments)
+    store = MetadataStore(index_dir)
+
+    stored = {store.text(row): row for row in range(len(store))}
+    matched = [doc for doc in documents if doc.page_content in stored]
+    skipped = len(documents) - len(matched)
+
+    if not matched:
+        # E.g. an index built before the current chunking: nothing to reuse
+        print(f"No stored text matches the current documents; skipped all {skipped}, cache not seeded")
+        return
+
+    vectors = np.stack([
+        index.reconstruct(stored[doc.page_content]) for doc in matched
+    ]).astype(np.float32)
+
+    save_embedding_cache(
+        [doc.metadata["assessment_id"] for doc in matched],
+        [content_hash(doc.page_content, backend.model_name) for doc in matched],
+        vectors,
+        embedding_cache_dir(backend),
+        backend.model_name,
+    )
+    print(f"Seeded embedding cache with {len(matched)}/{len(documents)} vectors ({skipped} skipped)")
+
+
+def build_lexical_index(assessments: Iterable[Dict], index_dir: Path = VECTOR_STORE_DIR):
+    # BM25 over exactly the text the dense side embeds, one doc per assessment
+    ids, texts = [], []
+    for a in assessments:
+        ids.append(a["assessment_id"])
+        texts.append(build_embedding_text(a))
+
+    write_lexical_index(ids, texts, index_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FAISS index incrementally")
+    parser.add_argument(
+        "--seed-from-index",
+        action="store_true",
+        help="populate the embedding cache from the current index before building",
+    )
+    parser.add_argument(
+        "--lexical-only",
+        action="store_true",
+        help="rebuild only the BM25 index (no model needed)",
+    )
+    parser.add_argument(
+        "--index-mode",
+        choices=INDEX_MODES,
+        default=INDEX_MODE,
+        help="encoding of index.faiss (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=list(BACKENDS),
+        default=BACKEND.name,
+        help="encoder to build with; serve with the same SHL_EMBEDDING_BACKEND (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="start while the structuring stage is still writing",
+    )
+    args = parser.parse_args()
+    backend = get_backend(args.backend)
+
+    source = resolve_input(STRUCTURED_DATA_PATH)
+    print(f"Streaming structured assessment data from {source}...")
+
+    # One pass over the records: the BM25 texts and the chunked documents
+    # are built as each record arrives, the records themselves are dropped
+    ids, texts, documents = [], [], []
+    for assessment in read_records(source, follow=args.follow):
+        ids.append(assessment["assessment_id"])
+        texts.append(build_embedding_text(assessment))
+        if not args.lexical_only:
+            documents.extend(iter_documents([assessment]))
+
+    print(f"Loaded {len(ids)} assessments")
+
+    if args.lexical_only:
+        print("Building BM25 index...")
+        # A new version with the current dense index and metadata copied over
+        with staged_version(VECTOR_STORE_DIR, base=resolve_index_dir(VECTOR_STORE_DIR)) as directory:
+            write_lexical_index(ids, texts, directory)
+
+        print(f"Lexical index written to version {current_version(VECTOR_STORE_DIR)}")
+        return
 
     print(f"Created {len(documents)} documents")
 
-    print("Generating embeddings...")
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    if args.seed_from_index:
+        seed_cache_from_index(documents, VECTOR_STORE_DIR, backend)
+
+    print(f"Generating embeddings with {backend.model_name}...")
+    vectors = embed_incrementally(documents, embedding_cache_dir(backend), backend=backend)
 
-    vector_store = FAISS.from_documents(documents, embeddings)
+    # Everything goes into a new version directory that only becomes
+    # current once complete; running servers pick it up on reload
+    with staged_version(VECTOR_STORE_DIR) as directory:
+        print("Building BM25 index...")
+        write_lexical_index(ids, texts, directory)
 
-    print("Saving FAISS index...")
-    vector_store.save_local(VECTOR_STORE_DIR)
+        print(f"Saving {args.index_mode} FAISS index...")
+        write_index_files(
+            build_index(vectors, args.index_mode),
+            [(doc.metadata, doc.page_content) for doc in documents],
+            directory,
+        )
+        write_embedding_manifest(directory, backend, vectors.shape[1])
 
     print("Vector store successfully built!")
-    print(f"Location: {VECTOR_STORE_DIR}")
+    print(f"Location: {resolve_index_dir(VECTOR_STORE_DIR)}")
 
 
 if __name__ == "__main__":
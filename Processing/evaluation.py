@@ -1,14 +1,42 @@
+import argparse
+import itertools
 import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Sequence
 
-from retrievel import (
+import numpy as np
+
+from Processing.retrievel import (
+    TOP_K,
+    FETCH_K,
+    LAMBDA_MULT,
+    AGGREGATION_METHODS,
+    RETRIEVAL_MODE,
+    RETRIEVAL_MODES,
     load_vector_store,
-    get_mmr_retriever,
-    aggregate_chunks_to_assessments,
+    embed_queries,
+    query_cache,
+    recommend_batch,
+    get_lexical_ranker,
 )
 
 GROUND_TRUTH_PATH = Path("Data/evaluation/ground_truth.json")
+# The CLI keeps query vectors here across runs, unless SHL_QUERY_CACHE_DIR
+# (or --query-cache-dir) says otherwise; "" turns it off
+EVAL_QUERY_CACHE_DIR = "Data/cache/query_embeddings"
+
+RECALL_KS = (5, 10)
+# Rankings are cut here for MRR, nDCG and MAP
+EVAL_DEPTH = 10
+
+SWEEP_TOP_K = (10, 15, 20, 30)
+SWEEP_FETCH_K = (20, 40, 80)
+SWEEP_LAMBDA_MULT = (0.3, 0.5, 0.6, 0.7, 0.9)
+SWEEP_KEYS = ("top_k", "fetch_k", "lambda_mult")
 
 
 def load_ground_truth() -> List[Dict]:
@@ -16,62 +44,315 @@ def load_ground_truth() -> List[Dict]:
         return json.load(f)
 
 
-def evaluate_recall_at_k(k: int) -> float:
-    vs = load_vector_store()
-    retriever = get_mmr_retriever(vs)
+def normalize_assessment_id(assessment_id: str) -> str:
+    """
+    Ground truth uses URL slugs ("core-java-advanced-level-new") while the
+    index keeps the catalog ids ("core-java-(advanced-level)-(new)").
+    """
+    return re.sub(r"[^a-z0-9]+", "-", assessment_id.lower()).strip("-")
+
+
+def score_rankings(
+    data: List[Dict],
+    all_recs: List[List[Dict]],
+    ks: Sequence[int] = RECALL_KS,
+) -> Dict[str, float]:
+    """
+    All metrics from one (queries x depth) hit matrix:
+
+    * recall@k - share of queries with a relevant assessment in the top k
+    * mrr      - reciprocal rank of the first relevant assessment
+    * ndcg@k   - binary-relevance nDCG
+    * map      - mean average precision
+    """
+    depth = max(max(ks), EVAL_DEPTH)
+
+    hits = np.zeros((len(data), depth), dtype=bool)
+    num_relevant = np.zeros(len(data))
+
+    for i, (item, recs) in enumerate(zip(data, all_recs)):
+        relevant = {normalize_assessment_id(a) for a in item["ground_truth_assessment_ids"]}
+        num_relevant[i] = len(relevant)
+
+        for rank, rec in enumerate(recs[:depth]):
+            hits[i, rank] = normalize_assessment_id(rec["assessment_id"]) in relevant
+
+    ranks = np.arange(1, depth + 1)
+    gains = 1 / np.log2(ranks + 1)
+
+    first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1) + 1, 0)
+    reciprocal = np.divide(1.0, first_hit, out=np.zeros(len(data)), where=first_hit > 0)
+
+    precision_at_rank = np.cumsum(hits, axis=1) / ranks
+    average_precision = (precision_at_rank * hits).sum(axis=1) / np.maximum(num_relevant, 1)
+
+    report = {}
+
+    for k in ks:
+        report[f"recall@{k}"] = float(hits[:, :k].any(axis=1).mean())
 
+    report["mrr"] = float(reciprocal.mean())
+
+    for k in ks:
+        dcg = (hits[:, :k] * gains[:k]).sum(axis=1)
+        ideal = np.array([gains[:int(min(n, k))].sum() for n in num_relevant])
+        report[f"ndcg@{k}"] = float(np.divide(dcg, ideal, out=np.zeros(len(data)), where=ideal > 0).mean())
+
+    report["map"] = float(average_precision.mean())
+
+    return report
+
+
+def evaluate(
+    vs=None,
+    ks: Sequence[int] = RECALL_KS,
+    mode: str = RETRIEVAL_MODE,
+    top_k: int = TOP_K,
+    fetch_k: int = FETCH_K,
+    lambda_mult: float = LAMBDA_MULT,
+) -> Dict[str, float]:
+    """
+    One pass over the ground truth: every query is encoded once, in a
+    batch, and every metric comes from the same rankings. Query vectors go
+    through the query embedding cache; they are kept across runs when its
+    disk tier is on, as the CLI turns it on by default.
+    """
+    vs = vs or load_vector_store()
     data = load_ground_truth()
-    hits = 0
+    queries = [item["query"] for item in data]
 
-    for item in data:
-        query = item["query"]
-        gt_ids = set(item["ground_truth_assessment_ids"])
+    embed_queries(vs, queries)
 
-        docs = retriever.invoke(query)
-        recs = aggregate_chunks_to_assessments(docs, top_n=k)
+    return run_config(vs, data, ks, mode, top_k, fetch_k, lambda_mult)
 
-        retrieved_ids = {r["assessment_id"] for r in recs}
 
-        if retrieved_ids.intersection(gt_ids):
-            hits += 1
+def run_config(
+    vs,
+    data: List[Dict],
+    ks: Sequence[int],
+    mode: str,
+    top_k: int,
+    fetch_k: int,
+    lambda_mult: float,
+) -> Dict[str, float]:
+    queries = [item["query"] for item in data]
 
-    return hits / len(data)
+    start = time.perf_counter()
+    all_recs = recommend_batch(
+        vs,
+        queries,
+        top_n=max(max(ks), EVAL_DEPTH),
+        include_evidence=False,
+        mode=mode,
+        k=top_k,
+        fetch_k=fetch_k,
+        lambda_mult=lambda_mult,
+    )
+    elapsed = time.perf_counter() - start
 
+    return {
+        **score_rankings(data, all_recs, ks),
+        "ms_per_query": 1000 * elapsed / len(queries),
+    }
 
-def evaluate_mrr() -> float:
-    vs = load_vector_store()
-    retriever = get_mmr_retriever(vs)
 
+def sweep(
+    vs=None,
+    top_ks: Sequence[int] = SWEEP_TOP_K,
+    fetch_ks: Sequence[int] = SWEEP_FETCH_K,
+    lambda_mults: Sequence[float] = SWEEP_LAMBDA_MULT,
+    ks: Sequence[int] = RECALL_KS,
+    mode: str = RETRIEVAL_MODE,
+    workers: int = 4,
+) -> List[Dict]:
+    """
+    Grid over TOP_K x FETCH_K x LAMBDA_MULT. Queries are encoded once up
+    front; configurations then run on a thread pool and only repeat the
+    FAISS search, MMR and aggregation.
+    """
+    vs = vs or load_vector_store()
     data = load_ground_truth()
-    reciprocal_ranks = []
+    embed_queries(vs, [item["query"] for item in data])
+
+    grid = [
+        (top_k, fetch_k, lambda_mult)
+        for top_k, fetch_k, lambda_mult in itertools.product(top_ks, fetch_ks, lambda_mults)
+        if fetch_k >= top_k
+    ]
+
+    def run(config):
+        top_k, fetch_k, lambda_mult = config
+        return {
+            "top_k": top_k,
+            "fetch_k": fetch_k,
+            "lambda_mult": lambda_mult,
+            **run_config(vs, data, ks, mode, top_k, fetch_k, lambda_mult),
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, grid))
+
+
+def evaluate_recall_at_k(k: int, vs=None) -> float:
+    return evaluate(vs, ks=(k,), mode="dense")[f"recall@{k}"]
+
+
+def evaluate_mrr(vs=None) -> float:
+    return evaluate(vs, mode="dense")["mrr"]
+
+
+def evaluate_aggregation_methods(methods=AGGREGATION_METHODS, vs=None) -> Dict[str, Dict]:
+    """
+    Recall@5, Recall@10, MRR and per-query latency for each way of rolling
+    chunk scores up into assessment scores.
+    """
+    vs = vs or load_vector_store()
+    data = load_ground_truth()
+    queries = [item["query"] for item in data]
+
+    # Warm the encoder and query cache so timings isolate search + MMR +
+    # aggregation, which is what differs between methods.
+    embed_queries(vs, queries)
+
+    report = {}
+
+    for method in methods:
+        start = time.perf_counter()
+        all_recs = [
+            recommend_batch(
+                vs, [q], top_n=10, include_evidence=False, method=method, mode="dense"
+            )[0]
+            for q in queries
+        ]
+        elapsed = time.perf_counter() - start
+
+        report[method] = {
+            **score_rankings(data, all_recs),
+            "ms_per_query": 1000 * elapsed / len(queries),
+        }
+
+    return report
+
+
+def evaluate_retrieval_modes(modes=RETRIEVAL_MODES, vs=None) -> Dict[str, Dict]:
+    """
+    Recall@5, Recall@10, MRR and per-query latency for dense-only,
+    BM25-only and fused retrieval. Dense latency is measured with a cold
+    in-memory query cache, so it includes the encoder forward pass that the
+    lexical fast path avoids.
+    """
+    vs = vs or load_vector_store()
+    data = load_ground_truth()
+    queries = [item["query"] for item in data]
+
+    ranker = get_lexical_ranker(vs)
+    encoder_skipped = {
+        "dense": 0,
+        "lexical": len(queries) if ranker else 0,
+        "hybrid": sum(ranker.is_fast_path(q) for q in queries) if ranker else 0,
+    }
+
+    cache = vs.embedding_function.cache
+    disk_dir, cache.disk_dir = cache.disk_dir, None
+
+    # Load the model once so the first mode does not pay for it
+    vs.embedding_function.embeddings.embed_query("warmup")
+
+    report = {}
+
+    try:
+        for mode in modes:
+            cache.clear()
+
+            start = time.perf_counter()
+            all_recs = [
+                recommend_batch(vs, [q], top_n=10, include_evidence=False, mode=mode)[0]
+                for q in queries
+            ]
+            elapsed = time.perf_counter() - start
+
+            report[mode] = {
+                **score_rankings(data, all_recs),
+                "ms_per_query": 1000 * elapsed / len(queries),
+                "encoder_skipped": encoder_skipped[mode],
+            }
+    finally:
+        cache.disk_dir = disk_dir
+
+    return report
+
+
+def format_metrics(metrics: Dict[str, float]) -> str:
+    return "  ".join(
+        f"{name}={value:.3f}" for name, value in metrics.items() if name != "ms_per_query"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval against the ground truth")
+    parser.add_argument("--k", type=int, nargs="+", default=list(RECALL_KS), help="cutoffs for recall / nDCG")
+    parser.add_argument("--mode", choices=RETRIEVAL_MODES, default=RETRIEVAL_MODE)
+    parser.add_argument("--sweep", action="store_true", help="grid over TOP_K / FETCH_K / LAMBDA_MULT")
+    parser.add_argument("--top-k", type=int, nargs="+", default=list(SWEEP_TOP_K))
+    parser.add_argument("--fetch-k", type=int, nargs="+", default=list(SWEEP_FETCH_K))
+    parser.add_argument("--lambda-mult", type=float, nargs="+", default=list(SWEEP_LAMBDA_MULT))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sort", default="mrr", help="sweep metric to rank configurations by")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    parser.add_argument(
+        "--query-cache-dir",
+        default=os.getenv("SHL_QUERY_CACHE_DIR", EVAL_QUERY_CACHE_DIR),
+        help='query embeddings kept across runs ("" to disable)',
+    )
+    args = parser.parse_args()
+
+    query_cache.set_disk_dir(args.query_cache_dir or None)
+    vs = load_vector_store()
+
+    if args.sweep:
+        start = time.perf_counter()
+        results = sweep(
+            vs, args.top_k, args.fetch_k, args.lambda_mult, args.k, args.mode, args.workers
+        )
+        elapsed = time.perf_counter() - start
+
+        results.sort(key=lambda r: (-r[args.sort], r["ms_per_query"]))
+
+        print(f"\n{len(results)} configurations in {elapsed:.1f}s ({args.mode}, sorted by {args.sort})")
+        for r in results:
+            config = f"top_k={r['top_k']:<3} fetch_k={r['fetch_k']:<3} lambda={r['lambda_mult']:<4}"
+            metrics = {k: v for k, v in r.items() if k not in SWEEP_KEYS}
+            print(f"{config} {format_metrics(metrics)}  {r['ms_per_query']:.2f} ms/query")
+
+        if args.json:
+            args.json.write_text(json.dumps(results, indent=2))
+        return
 
-    for item in data:
-        query = item["query"]
-        gt_ids = set(item["ground_truth_assessment_ids"])
+    metrics = evaluate(vs, ks=args.k, mode=args.mode)
 
-        docs = retriever.invoke(query)
-        recs = aggregate_chunks_to_assessments(docs, top_n=10)
+    print(f"\nEvaluation Results ({args.mode}, top_k={TOP_K}, fetch_k={FETCH_K}, lambda={LAMBDA_MULT})")
+    for name, value in metrics.items():
+        print(f"{name:<12} = {value:.2f}")
 
-        rank = 0
-        for idx, rec in enumerate(recs, start=1):
-            if rec["assessment_id"] in gt_ids:
-                rank = idx
-                break
+    print("\nChunk Aggregation")
+    print(f"{'method':<8} {'R@5':>6} {'R@10':>6} {'MRR':>6} {'ms/query':>9}")
+    for method, r in evaluate_aggregation_methods(vs=vs).items():
+        print(
+            f"{method:<8} {r['recall@5']:>6.2f} {r['recall@10']:>6.2f} "
+            f"{r['mrr']:>6.2f} {r['ms_per_query']:>9.2f}"
+        )
 
-        if rank > 0:
-            reciprocal_ranks.append(1 / rank)
-        else:
-            reciprocal_ranks.append(0)
+    print("\nRetrieval Modes")
+    print(f"{'mode':<8} {'R@5':>6} {'R@10':>6} {'MRR':>6} {'ms/query':>9} {'no-encode':>10}")
+    for mode, r in evaluate_retrieval_modes(vs=vs).items():
+        print(
+            f"{mode:<8} {r['recall@5']:>6.2f} {r['recall@10']:>6.2f} "
+            f"{r['mrr']:>6.2f} {r['ms_per_query']:>9.2f} {r['encoder_skipped']:>10}"
+        )
 
-    return sum(reciprocal_ranks) / len(reciprocal_ranks)
+    if args.json:
+        args.json.write_text(json.dumps(metrics, indent=2))
 
 
 if __name__ == "__main__":
-    r5 = evaluate_recall_at_k(5)
-    r10 = evaluate_recall_at_k(10)
-    mrr = evaluate_mrr()
-
-    print("\nEvaluation Results")
-    print(f"Recall@5  = {r5:.2f}")
-    print(f"Recall@10 = {r10:.2f}")
-    print(f"MRR       = {mrr:.2f}")
+    main()
@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Processing.metadata_store import MISSING, MetadataStore
+
+# Hard constraints are resolved to a set of allowed index rows before the
+# vector search. Postings are packed little-endian bitmaps (the layout
+# faiss.IDSelectorBitmap reads), so combining constraints is a handful of
+# bytewise AND / OR ops over n/8 bytes.
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    max_duration: Optional[int] = None
+    job_levels: Optional[Tuple[str, ...]] = None
+    test_types: Optional[Tuple[str, ...]] = None
+    remote_testing: Optional[bool] = None
+
+    @classmethod
+    def from_fields(
+        cls,
+        max_duration: Optional[int] = None,
+        job_levels: Optional[List[str]] = None,
+        test_types: Optional[List[str]] = None,
+        remote_testing: Optional[bool] = None,
+    ) -> Optional["SearchFilters"]:
+        filters = cls(
+            max_duration=max_duration,
+            job_levels=tuple(sorted(job_levels)) if job_levels else None,
+            test_types=tuple(sorted(test_types)) if test_types else None,
+            remote_testing=remote_testing,
+        )
+        return None if filters.is_empty() else filters
+
+    def is_empty(self) -> bool:
+        return (
+            self.max_duration is None
+            and not self.job_levels
+            and not self.test_types
+            and self.remote_testing is None
+        )
+
+
+@dataclass
+class RowSelection:
+    bitmap: np.ndarray      # packed uint8, bit i = row i allowed
+    rows: np.ndarray        # allowed row ids, ascending
+    total: int              # rows in the index
+
+    @property
+    def count(self) -> int:
+        return len(self.rows)
+
+
+def _normalize(value: str) -> str:
+    return value.strip().lower()
+
+
+class FilterIndex:
+    """
+    Bitmap postings over the metadata store, built once per loaded index.
+
+    Semantics: values within a field are OR-ed (any requested job level),
+    fields are AND-ed. Rows with unknown duration never satisfy
+    `max_duration`.
+    """
+
+    def __init__(self, store: MetadataStore):
+        columns = store.columns
+        self.total = len(columns)
+
+        self.durations = np.asarray(columns["duration_minutes"], dtype=np.int32)
+
+        if "remote_testing" in columns.dtype.names:
+            remote = np.asarray(columns["remote_testing"]) == 1
+        else:
+            remote = np.zeros(self.total, dtype=bool)
+        self.remote = self._pack(remote)
+
+        self.job_levels = self._postings(
+            store, columns["job_levels_start"], columns["job_levels_end"]
+        )
+        self.test_types = self._postings(
+            store, columns["test_types_start"], columns["test_types_end"]
+        )
+
+        self.all_rows = self._pack(np.ones(self.total, dtype=bool))
+
+    def _pack(self, mask: np.ndarray) -> np.ndarray:
+        return np.packbits(mask, bitorder="little")
+
+    def _postings(self, store: MetadataStore, starts, ends) -> Dict[str, np.ndarray]:
+        starts = np.asarray(starts, dtype=np.int64)
+        lengths = np.asarray(ends, dtype=np.int64) - starts
+
+        # CSR -> (row, string id) pairs, vectorized
+        rows = np.repeat(np.arange(self.total), lengths)
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        string_ids = np.asarray(store.list_values)[starts[rows] + offsets]
+
+        postings: Dict[str, np.ndarray] = {}
+        for string_id in np.unique(string_ids):
+            mask = np.zeros(self.total, dtype=bool)
+            mask[rows[string_ids == string_id]] = True
+
+            key = _normalize(store._string(int(string_id)))
+            if key in postings:
+                postings[key] |= self._pack(mask)
+            else:
+                postings[key] = self._pack(mask)
+
+        return postings
+
+    def _any_of(self, postings: Dict[str, np.ndarray], values) -> np.ndarray:
+        bitmap = np.zeros_like(self.all_rows)
+        for value in values:
+            posting = postings.get(_normalize(value))
+            if posting is not None:
+                bitmap |= posting
+        return bitmap
+
+    def select(self, filters: Optional[SearchFilters]) -> Optional[RowSelection]:
+        """
+        None means "no constraint": callers should run the unfiltered search.
+        """
+        if filters is None or filters.is_empty():
+            return None
+
+        bitmap = self.all_rows.copy()
+
+        if filters.max_duration is not None:
+            ok = (self.durations != MISSING) & (self.durations <= filters.max_duration)
+            bitmap &= self._pack(ok)
+
+        if filters.job_levels:
+            bitmap &= self._any_of(self.job_levels, filters.job_levels)
+
+        if filters.test_types:
+            bitmap &= self._any_of(self.test_types, filters.test_types)
+
+        if filters.remote_testing is not None:
+            bitmap &= self.remote if filters.remote_testing else ~self.remote & self.all_rows
+
+        rows = np.flatnonzero(np.unpackbits(bitmap, bitorder="little")[: self.total])
+
+        return RowSelection(bitmap=bitmap, rows=rows, total=self.total)
@@ -0,0 +1,46 @@
+import hashlib
+import re
+import time
+from typing import List
+
+import numpy as np
+
+HASH_EMBEDDING_MODEL_NAME = "hash-embeddings"
+HASH_EMBEDDING_DIM = 768
+
+
+class HashEmbeddings:
+    """
+    Deterministic, model-free stand-in for the sentence-transformer, for
+    load tests and machines without the Hugging Face model.
+
+    Signed feature hashing of lowercased word unigrams and bigrams,
+    L2-normalized: texts sharing words land close together, so candidate
+    sets and MMR still do realistic work, but scores are not comparable
+    with the real model's. `delay_ms` adds a fixed cost per encode call to
+    mimic a forward pass.
+    """
+
+    def __init__(self, dim: int = HASH_EMBEDDING_DIM, delay_ms: float = 0.0):
+        self.dim = dim
+        self.delay_ms = delay_ms
+
+    def _embed(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) & 1 else -1.0
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.delay_ms:
+            time.sleep(self.delay_ms / 1000)
+        return [self._embed(t).tolist() for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
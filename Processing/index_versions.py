@@ -0,0 +1,213 @@
+import argparse
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# Versioned index directories. A build writes a complete index
+# (index.faiss, metadata/, lexical/) into versions/<version>/ and then
+# points CURRENT at it with an atomic rename, so no reader ever sees a
+# half-written index and a running server can load the new version next
+# to the one it is serving. HISTORY lists activations, oldest first, for
+# rollback.
+#
+#   shl_faiss/CURRENT
+#   shl_faiss/HISTORY
+#   shl_faiss/versions/20251001T120000-3fa2c1/index.faiss ...
+#
+# A directory without CURRENT is served as it is (the pre-versioning flat
+# layout) under the name LEGACY_VERSION.
+
+VERSIONS_DIR_NAME = "versions"
+CURRENT_FILE = "CURRENT"
+HISTORY_FILE = "HISTORY"
+LEGACY_VERSION = "legacy"
+
+# Versions kept by prune(), besides the current and the previous one
+KEEP_VERSIONS = 3
+
+STAGING_SUFFIX = ".tmp"
+
+
+def current_version(root: Path) -> str:
+    try:
+        version = (Path(root) / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return LEGACY_VERSION
+    return version or LEGACY_VERSION
+
+
+def version_dir(root: Path, version: str) -> Path:
+    root = Path(root)
+    return root if version == LEGACY_VERSION else root / VERSIONS_DIR_NAME / version
+
+
+def resolve_index_dir(path: Path) -> Path:
+    """
+    The directory holding the index files: the current version of a
+    versioned root, or `path` itself (a flat root or a version directory).
+    """
+    return version_dir(path, current_version(path))
+
+
+def list_versions(root: Path) -> List[str]:
+    """Complete versions, oldest first (the names sort by build time)."""
+    root = Path(root)
+    versions = []
+
+    if (root / "index.faiss").exists():
+        versions.append(LEGACY_VERSION)
+
+    directory = root / VERSIONS_DIR_NAME
+    if directory.is_dir():
+        versions.extend(
+            sorted(p.name for p in directory.iterdir() if p.is_dir() and not p.name.startswith("."))
+        )
+
+    return versions
+
+
+def history(root: Path) -> List[str]:
+    try:
+        lines = (Path(root) / HISTORY_FILE).read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        return []
+    return [line.strip() for line in lines if line.strip()]
+
+
+def new_version_name() -> str:
+    return time.strftime("%Y%m%dT%H%M%S") + "-" + os.urandom(3).hex()
+
+
+def activate(root: Path, version: str):
+    """Atomically points CURRENT at `version` (LEGACY_VERSION removes it)."""
+    root = Path(root)
+
+    available = list_versions(root)
+    if version not in available:
+        raise ValueError(f"No complete index version {version!r} in {root}")
+
+    # Start the history with what was served before it existed (a flat
+    # index), so the first versioned build can be rolled back too
+    entries = [version]
+    previous = current_version(root)
+    if not history(root) and previous != version and previous in available:
+        entries.insert(0, previous)
+
+    if version == LEGACY_VERSION:
+        (root / CURRENT_FILE).unlink(missing_ok=True)
+    else:
+        tmp = root / (CURRENT_FILE + STAGING_SUFFIX)
+        tmp.write_text(version + "\n", encoding="utf-8")
+        os.replace(tmp, root / CURRENT_FILE)
+
+    with open(root / HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write("".join(entry + "\n" for entry in entries))
+
+
+def previous_version(root: Path) -> Optional[str]:
+    """The most recently activated version before the current one that still exists."""
+    current = current_version(root)
+    available = set(list_versions(root))
+
+    for version in reversed(history(root)):
+        if version != current and version in available:
+            return version
+    return None
+
+
+def rollback(root: Path) -> str:
+    version = previous_version(root)
+    if version is None:
+        raise ValueError(f"No previous index version to roll back to in {root}")
+    activate(root, version)
+    return version
+
+
+def prune(root: Path, keep: int = KEEP_VERSIONS) -> List[str]:
+    """
+    Deletes all but the newest `keep` versions, never the current or the
+    previous one. Returns the deleted names.
+    """
+    root = Path(root)
+    protected = {current_version(root), previous_version(root)}
+    versioned = [v for v in list_versions(root) if v != LEGACY_VERSION]
+
+    removed = []
+    for version in versioned[: max(0, len(versioned) - keep)]:
+        if version in protected:
+            continue
+        # Servers still holding the old files memory-mapped keep reading them
+        shutil.rmtree(version_dir(root, version))
+        removed.append(version)
+    return removed
+
+
+@contextmanager
+def staged_version(root: Path, base: Optional[Path] = None) -> Iterator[Path]:
+    """
+    ```
+    with staged_version(VECTOR_STORE_DIR) as directory:
+        write_index_files(index, records, directory)
+    ```
+
+    Yields an empty staging directory (or a copy of `base`, to change part
+    of an existing index). When the block exits cleanly the directory
+    becomes a new version and is activated; on error it is removed.
+    """
+    root = Path(root)
+    name = new_version_name()
+    staging = root / VERSIONS_DIR_NAME / f".{name}{STAGING_SUFFIX}"
+    staging.parent.mkdir(parents=True, exist_ok=True)
+
+    if base is not None:
+        shutil.copytree(
+            base,
+            staging,
+            ignore=shutil.ignore_patterns(VERSIONS_DIR_NAME, CURRENT_FILE, HISTORY_FILE, "*" + STAGING_SUFFIX),
+        )
+    else:
+        staging.mkdir()
+
+    try:
+        yield staging
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    os.replace(staging, version_dir(root, name))
+    activate(root, name)
+    prune(root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and switch index versions")
+    parser.add_argument("--root", type=Path, default=Path("Data/vector_store/shl_faiss"))
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="versions, oldest first; * marks the current one")
+    sub.add_parser("rollback", help="activate the previously active version")
+    sub.add_parser("prune", help=f"delete all but the newest {KEEP_VERSIONS} versions")
+    activate_parser = sub.add_parser("activate", help="point CURRENT at a version")
+    activate_parser.add_argument("version")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "list":
+            current = current_version(args.root)
+            for version in list_versions(args.root):
+                print(("* " if version == current else "  ") + version)
+        elif args.command == "rollback":
+            print(f"Active: {rollback(args.root)}")
+        elif args.command == "prune":
+            print(f"Removed: {', '.join(prune(args.root)) or 'nothing'}")
+        else:
+            activate(args.root, args.version)
+            print(f"Active: {args.version}")
+    except ValueError as e:
+        parser.error(str(e))
+
+
+if __name__ == "__main__":
+    main()
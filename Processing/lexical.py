@@ -0,0 +1,183 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# BM25 over the same text the dense index embeds (build_embedding_text),
+# one document per assessment.
+#
+#   lexical/
+#     manifest.json      N, avgdl, k1, b
+#     terms.json         vocabulary, position = term id
+#     doc_ids.json       assessment_id per document
+#     offsets.npy        postings offsets per term (V + 1)
+#     postings_doc.npy   document ids, grouped by term
+#     postings_tf.npy    term frequencies, aligned with postings_doc
+#     doc_lengths.npy    tokens per document
+
+LEXICAL_DIR_NAME = "lexical"
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Keeps tokens like ".net", "asp.net", "c#", "c++", "node.js", "java 8"
+TOKEN_PATTERN = re.compile(r"\.?[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be but by can for from has have i in is it its looking
+me my need of on or our that the their this to we who will with you your
+hiring hire want assessment assessments test tests candidate candidates
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def query_terms(text: str) -> List[str]:
+    seen = []
+    for token in tokenize(text):
+        if token not in STOPWORDS and token not in seen:
+            seen.append(token)
+    return seen
+
+
+def has_lexical_index(index_dir: Path) -> bool:
+    return (Path(index_dir) / LEXICAL_DIR_NAME / "manifest.json").exists()
+
+
+def write_lexical_index(doc_ids: List[str], texts: List[str], directory: Path) -> Path:
+    directory = Path(directory) / LEXICAL_DIR_NAME
+    directory.mkdir(parents=True, exist_ok=True)
+
+    term_ids: Dict[str, int] = {}
+    pairs_term, pairs_doc, pairs_tf = [], [], []
+    doc_lengths = np.zeros(len(texts), dtype=np.int32)
+
+    for doc, text in enumerate(texts):
+        tokens = tokenize(text)
+        doc_lengths[doc] = len(tokens)
+
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        for token, tf in counts.items():
+            pairs_term.append(term_ids.setdefault(token, len(term_ids)))
+            pairs_doc.append(doc)
+            pairs_tf.append(tf)
+
+    pairs_term = np.array(pairs_term, dtype=np.int32)
+    order = np.argsort(pairs_term, kind="stable")
+
+    offsets = np.zeros(len(term_ids) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(pairs_term, minlength=len(term_ids)))
+
+    np.save(directory / "offsets.npy", offsets)
+    np.save(directory / "postings_doc.npy", np.array(pairs_doc, dtype=np.int32)[order])
+    np.save(
+        directory / "postings_tf.npy",
+        np.minimum(np.array(pairs_tf, dtype=np.int64), 65535).astype(np.uint16)[order],
+    )
+    np.save(directory / "doc_lengths.npy", doc_lengths)
+
+    terms = sorted(term_ids, key=term_ids.get)
+    with open(directory / "terms.json", "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+
+    with open(directory / "doc_ids.json", "w", encoding="utf-8") as f:
+        json.dump(doc_ids, f, ensure_ascii=False)
+
+    with open(directory / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "documents": len(texts),
+            "terms": len(terms),
+            "avgdl": float(doc_lengths.mean()) if len(texts) else 0.0,
+            "k1": BM25_K1,
+            "b": BM25_B,
+        }, f, indent=2)
+
+    return directory
+
+
+class LexicalIndex:
+    def __init__(self, index_dir: Path):
+        directory = Path(index_dir) / LEXICAL_DIR_NAME
+
+        with open(directory / "manifest.json", "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        with open(directory / "terms.json", "r", encoding="utf-8") as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+        with open(directory / "doc_ids.json", "r", encoding="utf-8") as f:
+            self.doc_ids = json.load(f)
+
+        self.offsets = np.load(directory / "offsets.npy", mmap_mode="r")
+        self.postings_doc = np.load(directory / "postings_doc.npy", mmap_mode="r")
+        self.postings_tf = np.load(directory / "postings_tf.npy", mmap_mode="r")
+        doc_lengths = np.load(directory / "doc_lengths.npy").astype(np.float32)
+
+        self.num_docs = manifest["documents"]
+        self.k1 = manifest["k1"]
+
+        # Per-document part of the BM25 denominator, precomputed once
+        avgdl = manifest["avgdl"] or 1.0
+        self.length_norm = self.k1 * (1 - manifest["b"] + manifest["b"] * doc_lengths / avgdl)
+
+        df = np.diff(np.asarray(self.offsets)).astype(np.float32)
+        self.idf = np.log1p((self.num_docs - df + 0.5) / (df + 0.5))
+
+    def known_terms(self, terms: List[str]) -> List[int]:
+        return [self.term_ids[t] for t in terms if t in self.term_ids]
+
+    def search(
+        self,
+        query: str,
+        top_n: int = 20,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        (document, BM25 score) pairs, best first. `allowed` is a boolean
+        mask over documents.
+        """
+        term_ids = self.known_terms(query_terms(query))
+        if not term_ids:
+            return []
+
+        docs = np.concatenate([
+            self.postings_doc[self.offsets[t]:self.offsets[t + 1]] for t in term_ids
+        ])
+        tf = np.concatenate([
+            self.postings_tf[self.offsets[t]:self.offsets[t + 1]] for t in term_ids
+        ]).astype(np.float32)
+        idf = np.concatenate([
+            np.full(self.offsets[t + 1] - self.offsets[t], self.idf[t], dtype=np.float32)
+            for t in term_ids
+        ])
+
+        contributions = idf * tf * (self.k1 + 1) / (tf + self.length_norm[docs])
+        scores = np.bincount(docs, weights=contributions, minlength=self.num_docs)
+
+        if allowed is not None:
+            scores[~allowed] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_n]]
+
+        return [(int(d), float(scores[d])) for d in top]
+
+    def is_keyword_query(self, query: str, max_terms: int, min_idf: float) -> bool:
+        """
+        Short query whose every content term is in the vocabulary and, on
+        average, rare enough to be discriminative ("Java 8", ".NET MVC").
+        """
+        terms = query_terms(query)
+        if not 1 <= len(terms) <= max_terms:
+            return False
+
+        term_ids = self.known_terms(terms)
+        if len(term_ids) != len(terms):
+            return False
+
+        return float(np.mean(self.idf[term_ids])) >= min_idf
@@ -0,0 +1,204 @@
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Array-backed replacement for LangChain's pickled docstore (index.pkl).
+#
+#   metadata/
+#     manifest.json        row count + format version
+#     columns.npy          one fixed-width record per index row (mmap)
+#     list_values.npy      string ids for job_levels / test_types (mmap)
+#     string_offsets.npy   offsets into strings.bin (mmap)
+#     strings.bin          deduplicated UTF-8 string pool (mmap)
+#     texts.bin            page_content blob (mmap)
+#
+# Row i of the store is row i of index.faiss.
+
+METADATA_DIR_NAME = "metadata"
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+COLUMNS_DTYPE = np.dtype([
+    ("assessment_id", "<i4"),
+    ("name", "<i4"),
+    ("url", "<i4"),
+    ("duration_minutes", "<i4"),
+    ("remote_testing", "i1"),
+    ("job_levels_start", "<i4"),
+    ("job_levels_end", "<i4"),
+    ("test_types_start", "<i4"),
+    ("test_types_end", "<i4"),
+    ("text_offset", "<i8"),
+    ("text_length", "<i8"),
+])
+
+MISSING = -1
+
+
+def _memmap_bytes(path: Path) -> np.ndarray:
+    # np.memmap refuses zero-length files
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+def write_metadata_store(
+    records: Iterable[Tuple[Dict, str]],
+    directory: Path,
+) -> Path:
+    """
+    Writes (metadata, page_content) pairs, in index row order.
+    """
+    directory = Path(directory) / METADATA_DIR_NAME
+    directory.mkdir(parents=True, exist_ok=True)
+
+    string_ids: Dict[str, int] = {}
+    pool: List[bytes] = []
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return MISSING
+        if value not in string_ids:
+            string_ids[value] = len(pool)
+            pool.append(value.encode("utf-8"))
+        return string_ids[value]
+
+    rows = []
+    list_values: List[int] = []
+    text_offset = 0
+
+    with open(directory / "texts.bin", "wb") as texts:
+        for metadata, page_content in records:
+            job_levels_start = len(list_values)
+            list_values.extend(intern(v) for v in metadata.get("job_levels") or [])
+            test_types_start = len(list_values)
+            list_values.extend(intern(v) for v in metadata.get("test_types") or [])
+
+            encoded = (page_content or "").encode("utf-8")
+            texts.write(encoded)
+
+            duration = metadata.get("duration_minutes")
+            remote = metadata.get("remote_testing")
+
+            rows.append((
+                intern(metadata["assessment_id"]),
+                intern(metadata.get("name")),
+                intern(metadata.get("url")),
+                MISSING if duration is None else int(duration),
+                MISSING if remote is None else int(bool(remote)),
+                job_levels_start,
+                test_types_start,
+                test_types_start,
+                len(list_values),
+                text_offset,
+                len(encoded),
+            ))
+            text_offset += len(encoded)
+
+    offsets = np.zeros(len(pool) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in pool], dtype=np.int64)
+
+    np.save(directory / "columns.npy", np.array(rows, dtype=COLUMNS_DTYPE))
+    np.save(directory / "list_values.npy", np.array(list_values, dtype=np.int32))
+    np.save(directory / "string_offsets.npy", offsets)
+
+    with open(directory / "strings.bin", "wb") as f:
+        f.write(b"".join(pool))
+
+    with open(directory / "manifest.json", "w", encoding="utf-8") as f:
+        json.dump({"format_version": FORMAT_VERSION, "rows": len(rows)}, f, indent=2)
+
+    return directory
+
+
+class MetadataStore:
+    """
+    Read-only view over a metadata directory. Everything is memory-mapped,
+    so workers share the pages through the OS page cache.
+    """
+
+    def __init__(self, index_dir: Path):
+        self.directory = Path(index_dir) / METADATA_DIR_NAME
+
+        manifest_path = self.directory / "manifest.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(
+                f"{manifest_path} not found. Run `python -m Processing.vector_store "
+                "--migrate-pickle` to migrate index.pkl, or rebuild embeddings."
+            )
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("format_version") not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Unsupported metadata store version: {manifest}")
+
+        self.columns = np.load(self.directory / "columns.npy", mmap_mode="r")
+        self.list_values = np.load(self.directory / "list_values.npy", mmap_mode="r")
+        self.string_offsets = np.load(self.directory / "string_offsets.npy", mmap_mode="r")
+        self.strings = _memmap_bytes(self.directory / "strings.bin")
+        # Mapped now, not on first use: a pruned version's files stay
+        # readable through existing mappings, but cannot be opened anymore
+        self._texts = _memmap_bytes(self.directory / "texts.bin")
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == MISSING:
+            return None
+        start, end = self.string_offsets[string_id], self.string_offsets[string_id + 1]
+        return bytes(self.strings[start:end]).decode("utf-8")
+
+    def _string_list(self, start: int, end: int) -> List[str]:
+        return [self._string(int(i)) for i in self.list_values[start:end]]
+
+    def assessment_id(self, row: int) -> str:
+        return self._string(int(self.columns["assessment_id"][row]))
+
+    def metadata(self, row: int) -> Dict:
+        r = self.columns[row]
+        duration = int(r["duration_minutes"])
+
+        metadata = {
+            "assessment_id": self._string(int(r["assessment_id"])),
+            "name": self._string(int(r["name"])),
+            "url": self._string(int(r["url"])),
+            "job_levels": self._string_list(int(r["job_levels_start"]), int(r["job_levels_end"])),
+            "duration_minutes": None if duration == MISSING else duration,
+            "test_types": self._string_list(int(r["test_types_start"]), int(r["test_types_end"])),
+        }
+
+        if "remote_testing" in self.columns.dtype.names:
+            remote = int(r["remote_testing"])
+            metadata["remote_testing"] = None if remote == MISSING else bool(remote)
+
+        return metadata
+
+    def text(self, row: int) -> str:
+        r = self.columns[row]
+        start = int(r["text_offset"])
+        return bytes(self._texts[start:start + int(r["text_length"])]).decode("utf-8")
+
+    def document(self, row: int) -> "StoredDocument":
+        return StoredDocument(self, row)
+
+
+class StoredDocument:
+    """
+    Document-shaped row view: metadata is decoded up front, page_content
+    only when something actually reads it.
+    """
+
+    __slots__ = ("store", "row", "metadata")
+
+    def __init__(self, store: MetadataStore, row: int):
+        self.store = store
+        self.row = row
+        self.metadata = store.metadata(row)
+
+    @property
+    def page_content(self) -> str:
+        return self.store.text(self.row)
@@ -0,0 +1,255 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Minimal Prometheus instrumentation: histograms and counters that render
+# the text exposition format (served at GET /metrics). Kept dependency-free;
+# with SHL_METRICS=0 every hook is a shared no-op.
+
+ENABLED = os.getenv("SHL_METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+
+        # label values -> [per-bucket counts (last = +Inf), sum]
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *labels: str):
+        if not ENABLED:
+            return
+
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+        REGISTRY.append(self)
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        if not ENABLED:
+            return
+
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+
+        with self._lock:
+            snapshot = sorted(self._values.items())
+
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+        REGISTRY.append(self)
+
+    def set(self, value: float, *labels: str, replace: bool = False):
+        """replace=True drops every other label set (info-style gauges)."""
+        if not ENABLED:
+            return
+
+        with self._lock:
+            if replace:
+                self._values.clear()
+            self._values[labels] = float(value)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+
+        with self._lock:
+            snapshot = sorted(self._values.items())
+
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+
+        return lines
+
+
+REGISTRY: List = []
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+STAGE_SECONDS = Histogram(
+    "shl_stage_seconds",
+    "Time spent in each retrieval / serving stage",
+    labelnames=("stage",),
+)
+REQUEST_SECONDS = Histogram(
+    "shl_request_seconds",
+    "End-to-end handler time per endpoint",
+    labelnames=("endpoint",),
+)
+FIRST_RESULT_SECONDS = Histogram(
+    "shl_first_result_seconds",
+    "Time from request to the first streamed assessment",
+    labelnames=("format",),
+)
+QUERY_LENGTH = Histogram(
+    "shl_query_length_chars",
+    "Length of incoming queries in characters",
+    buckets=(10, 25, 50, 100, 200, 400, 800, 1600, 3200),
+)
+CANDIDATES_FETCHED = Histogram(
+    "shl_candidates_fetched",
+    "FAISS candidates passed to MMR per query",
+    buckets=(0, 5, 10, 20, 40, 80, 160, 320),
+)
+RESULTS_RETURNED = Histogram(
+    "shl_results_returned",
+    "Assessments returned per query",
+    buckets=(0, 1, 3, 5, 10, 20, 50),
+)
+QUERIES = Counter(
+    "shl_queries_total",
+    "Queries by retrieval path",
+    labelnames=("path",),
+)
+INDEX_INFO = Gauge(
+    "shl_index_info",
+    "Index version being served (always 1)",
+    labelnames=("version",),
+)
+INDEX_LOADED_AT = Gauge(
+    "shl_index_loaded_timestamp_seconds",
+    "Unix time the served index version was swapped in",
+)
+INDEX_RELOADS = Counter(
+    "shl_index_reloads_total",
+    "Index reloads and rollbacks by outcome",
+    labelnames=("result",),
+)
+RESPONSE_CACHE = Counter(
+    "shl_response_cache_total",
+    "Response cache lookups by outcome",
+    labelnames=("result",),
+)
+
+
+class _Timer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(time.perf_counter() - self.start, self.stage)
+        return False
+
+
+class _NoOp:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoOp()
+
+
+def timed(stage: str):
+    """
+    `with timed("faiss_search"): ...` records the block's duration in
+    shl_stage_seconds{stage="faiss_search"}.
+    """
+    return _Timer(stage) if ENABLED else _NOOP
@@ -0,0 +1,463 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# One entry point for refreshing the data and the index. Each stage is a
+# module run as `python -m <module>` from the repository root, with
+# declared input and output paths; a stage depends on the stages that
+# produce its inputs. A stage's fingerprint covers its command, the
+# source of its module and every repo module it imports (transitively),
+# its inputs and the environment variables that change its result. A stage
+# whose fingerprint and outputs match the last successful run is skipped,
+# so rebuilding the same upstream content does not ripple downstream.
+# Independent stages run in parallel.
+#
+# State (fingerprints, output hashes, a stat cache so unchanged files are
+# not re-hashed) lives in PIPELINE_STATE_PATH; stage logs next to it.
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PIPELINE_DIR = Path("Data/pipeline")
+PIPELINE_STATE_PATH = PIPELINE_DIR / "state.json"
+PIPELINE_LOG_DIR = PIPELINE_DIR / "logs"
+
+# Top-level packages whose imports count as stage code
+LOCAL_PACKAGES = ("Processing", "Scrapping", "api")
+
+PIPELINE_JOBS = 4
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    module: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    args: Tuple[str, ...] = ()
+    # Environment variables the outputs depend on
+    env: Tuple[str, ...] = ()
+
+
+# The two scraping stages have no upstream files to change, so a refresh
+# only re-scrapes when their code changes or with --force catalog / enrich
+STAGES = (
+    Stage(
+        name="catalog",
+        module="Scrapping.catalog_scraping",
+        outputs=("Data/Raw/shl_assessments.json", "Data/Raw/shl_assessments.csv"),
+    ),
+    Stage(
+        name="enrich",
+        module="Scrapping.scrape_assi_details",
+        inputs=("Data/Raw/shl_assessments.json",),
+        outputs=("Data/Enriched/shl_assessments_enriched.json",),
+    ),
+    Stage(
+        name="structure",
+        module="Scrapping.structured_data",
+        inputs=("Data/Enriched/shl_assessments_enriched.json",),
+        outputs=("Data/final_enriched_data/shl_assessments_structured.json",),
+    ),
+    Stage(
+        name="ground_truth",
+        module="Processing.build_ground_truth",
+        inputs=("Data/Raw/Gen_AI Dataset.xlsx",),
+        outputs=("Data/evaluation/ground_truth.json",),
+    ),
+    Stage(
+        name="embeddings",
+        module="Processing.embeddings",
+        inputs=("Data/final_enriched_data/shl_assessments_structured.json",),
+        outputs=("Data/vector_store/shl_faiss",),
+        env=("SHL_EMBEDDING_BACKEND",),
+    ),
+    Stage(
+        name="evaluation",
+        module="Processing.evaluation",
+        inputs=("Data/evaluation/ground_truth.json", "Data/vector_store/shl_faiss"),
+        outputs=("Data/evaluation/results.json",),
+        args=("--json", "Data/evaluation/results.json"),
+        env=("SHL_EMBEDDING_BACKEND",),
+    ),
+)
+
+
+def module_path(module: str, root: Path = REPO_ROOT) -> Optional[Path]:
+    base = root.joinpath(*module.split("."))
+    for path in (base.with_suffix(".py"), base / "__init__.py"):
+        if path.exists():
+            return path
+    return None
+
+
+def local_imports(path: Path) -> Set[str]:
+    """Repo modules imported by the file at `path` (parsed, not executed)."""
+    modules = set()
+
+    for node in ast.walk(ast.parse(path.read_text(encoding="utf-8"), str(path))):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from pkg import mod` may name a submodule rather than an attribute
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+
+        modules.update(n for n in names if n.split(".")[0] in LOCAL_PACKAGES)
+
+    return modules
+
+
+def code_files(module: str, root: Path = REPO_ROOT) -> List[Path]:
+    """The source of `module` and of every repo module it reaches."""
+    seen: Dict[str, Path] = {}
+    stack = [module]
+
+    while stack:
+        name = stack.pop()
+        if name in seen:
+            continue
+        path = module_path(name, root)
+        if path is None:
+            continue
+        seen[name] = path
+        stack.extend(local_imports(path))
+
+    return sorted(set(seen.values()))
+
+
+class FileHasher:
+    """
+    SHA-256 of files and directories, re-hashing a file only when its
+    size or mtime changed since the last run.
+    """
+
+    def __init__(self, root: Path, known: Optional[Dict[str, List]] = None):
+        self.root = root
+        self.known: Dict[str, List] = dict(known or {})
+        self._lock = threading.Lock()
+
+    def file(self, path: Path) -> str:
+        key = str(path.relative_to(self.root))
+        st = path.stat()
+
+        with self._lock:
+            entry = self.known.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+        with self._lock:
+            self.known[key] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path(self, relative: str) -> Optional[str]:
+        """Hash of a file, or of a directory's relative paths and contents; None if missing."""
+        path = self.root / relative
+        if path.is_file():
+            return self.file(path)
+        if not path.is_dir():
+            return None
+
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob("*") if p.is_file()):
+            digest.update(f"{child.relative_to(path)}\x00{self.file(child)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+
+def dependencies(stages: Iterable[Stage]) -> Dict[str, Set[str]]:
+    """Stage name -> names of the stages producing its inputs."""
+    stages = list(stages)
+    producers = {out: s.name for s in stages for out in s.outputs}
+
+    deps = {}
+    for stage in stages:
+        deps[stage.name] = {
+            producers[path] for path in stage.inputs if path in producers and producers[path] != stage.name
+        }
+    return deps
+
+
+def topological_order(stages: Iterable[Stage]) -> List[Stage]:
+    by_name = {s.name: s for s in stages}
+    deps = dependencies(by_name.values())
+    order, done, visiting = [], set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Pipeline has a cycle through {name!r}")
+        visiting.add(name)
+        for dep in sorted(deps[name]):
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+        order.append(by_name[name])
+
+    for name in by_name:
+        visit(name)
+    return order
+
+
+def select(stages: Iterable[Stage], targets: Iterable[str]) -> List[Stage]:
+    """`targets` and everything upstream of them, in dependency order."""
+    ordered = topological_order(stages)
+    by_name = {s.name: s for s in ordered}
+    deps = dependencies(ordered)
+
+    unknown = set(targets) - set(by_name)
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(sorted(unknown))} (use {', '.join(by_name)})")
+
+    wanted, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(deps[name])
+
+    return [s for s in ordered if s.name in wanted]
+
+
+class Pipeline:
+    """
+    ```
+    Pipeline().run()                       # everything that is stale
+    Pipeline().run(["embeddings"])         # embeddings and its upstream
+    Pipeline().run(force=["catalog"])      # re-scrape, then what changed
+    ```
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage] = STAGES,
+        root: Path = REPO_ROOT,
+        state_path: Path = PIPELINE_STATE_PATH,
+        log_dir: Path = PIPELINE_LOG_DIR,
+    ):
+        self.stages = topological_order(stages)
+        self.root = Path(root)
+        self.state_path = self.root / state_path
+        self.log_dir = self.root / log_dir
+        self.deps = dependencies(self.stages)
+
+        self.state = self._load_state()
+        self.hasher = FileHasher(self.root, self.state.get("files"))
+        self._lock = threading.Lock()
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"stages": {}, "files": {}}
+
+    def _save_state(self):
+        with self._lock:
+            self.state["files"] = dict(self.hasher.known)
+            payload = json.dumps(self.state, indent=2, sort_keys=True)
+
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_name(self.state_path.name + ".tmp")
+            tmp.write_text(payload, encoding="utf-8")
+            os.replace(tmp, self.state_path)
+
+    def command(self, stage: Stage) -> List[str]:
+        return [sys.executable, "-m", stage.module, *stage.args]
+
+    def fingerprint(self, stage: Stage) -> str:
+        code = {str(p.relative_to(self.root)): self.hasher.file(p) for p in code_files(stage.module, self.root)}
+        payload = {
+            "command": [stage.module, *stage.args],
+            "code": code,
+            "inputs": {path: self.hasher.path(path) for path in stage.inputs},
+            "env": {name: os.getenv(name) for name in stage.env},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def outputs(self, stage: Stage) -> Dict[str, Optional[str]]:
+        return {path: self.hasher.path(path) for path in stage.outputs}
+
+    def status(self, stage: Stage, fingerprint: str) -> str:
+        """'up to date', or why the stage has to run."""
+        recorded = self.state["stages"].get(stage.name)
+        outputs = self.outputs(stage)
+
+        if any(h is None for h in outputs.values()):
+            return "outputs missing"
+        if recorded is None:
+            return "never run"
+        if recorded["fingerprint"] != fingerprint:
+            return "inputs or code changed"
+        if recorded["outputs"] != outputs:
+            return "outputs changed since last run"
+        return "up to date"
+
+    def record(self, stage: Stage, fingerprint: str, seconds: float):
+        with self._lock:
+            self.state["stages"][stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": self.outputs(stage),
+                "seconds": round(seconds, 3),
+                "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+        self._save_state()
+
+    def _execute(self, stage: Stage) -> Tuple[int, float]:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        log_path = self.log_dir / f"{stage.name}.log"
+
+        start = time.perf_counter()
+        with open(log_path, "w", encoding="utf-8") as log:
+            code = subprocess.run(
+                self.command(stage),
+                cwd=self.root,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            ).returncode
+        return code, time.perf_counter() - start
+
+    def run(
+        self,
+        targets: Optional[Iterable[str]] = None,
+        force: Iterable[str] = (),
+        jobs: int = PIPELINE_JOBS,
+        dry_run: bool = False,
+        mark_done: bool = False,
+    ) -> Dict[str, Dict]:
+        """
+        Runs the stale stages among `targets` (default: all) and their
+        upstream, in parallel where the DAG allows. Returns stage name ->
+        {"result": ran | skipped | failed | blocked | would run, "reason",
+        "seconds"}.
+
+        dry_run only reports what is stale: a stage below one that would
+        run is listed as "after upstream". mark_done records the current
+        fingerprints as built without running anything, to adopt outputs
+        produced by hand.
+        """
+        selected = select(self.stages, targets or [s.name for s in self.stages])
+        force = set(force)
+        report: Dict[str, Dict] = {}
+
+        pending = list(selected)
+        running = {}
+
+        def deps_state(stage):
+            # Every upstream stage of a selected stage is selected too
+            states = [report.get(dep, {}).get("result") for dep in self.deps[stage.name]]
+            if any(s in ("failed", "blocked") for s in states):
+                return "blocked"
+            if any(s is None for s in states):
+                return "waiting"
+            if any(s == "would run" for s in states):
+                return "after upstream"
+            return "ready"
+
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            while pending or running:
+                for stage in list(pending):
+                    ready = deps_state(stage)
+                    if ready == "waiting":
+                        continue
+                    pending.remove(stage)
+
+                    if ready == "blocked":
+                        report[stage.name] = {"result": "blocked", "reason": "an upstream stage failed"}
+                        continue
+                    if ready == "after upstream":
+                        report[stage.name] = {"result": "would run", "reason": "after upstream"}
+                        continue
+
+                    fingerprint = self.fingerprint(stage)
+                    reason = "forced" if stage.name in force else self.status(stage, fingerprint)
+
+                    if reason == "up to date" or (mark_done and reason != "outputs missing"):
+                        if mark_done and reason != "up to date":
+                            self.record(stage, fingerprint, 0.0)
+                            reason = "marked up to date"
+                        report[stage.name] = {"result": "skipped", "reason": reason}
+                        continue
+
+                    if dry_run or mark_done:
+                        report[stage.name] = {"result": "would run", "reason": reason}
+                        continue
+
+                    print(f"[{stage.name}] running ({reason}): {' '.join(self.command(stage)[1:])}", flush=True)
+                    running[pool.submit(self._execute, stage)] = (stage, fingerprint, reason)
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage, fingerprint, reason = running.pop(future)
+                    code, seconds = future.result()
+
+                    if code == 0:
+                        self.record(stage, fingerprint, seconds)
+                        report[stage.name] = {"result": "ran", "reason": reason, "seconds": seconds}
+                    else:
+                        report[stage.name] = {
+                            "result": "failed",
+                            "reason": f"exit code {code}, see {self.log_dir / (stage.name + '.log')}",
+                            "seconds": seconds,
+                        }
+                    print(f"[{stage.name}] {report[stage.name]['result']} in {seconds:.1f}s", flush=True)
+
+        self._save_state()
+        return {s.name: report[s.name] for s in selected}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the pipeline stages whose inputs or code changed")
+    parser.add_argument("stages", nargs="*", help="targets (with their upstream); default: all")
+    parser.add_argument("--force", nargs="+", default=[], metavar="STAGE", help="run these even if up to date")
+    parser.add_argument("--jobs", type=int, default=PIPELINE_JOBS, help="stages run at once")
+    parser.add_argument("--dry-run", action="store_true", help="only report what is stale")
+    parser.add_argument("--mark-done", action="store_true", help="adopt the existing outputs as up to date")
+    parser.add_argument("--list", action="store_true", help="print the stages and their dependencies")
+    args = parser.parse_args()
+
+    pipeline = Pipeline()
+
+    if args.list:
+        for stage in pipeline.stages:
+            after = ", ".join(sorted(pipeline.deps[stage.name])) or "-"
+            print(f"{stage.name:<13} python -m {' '.join([stage.module, *stage.args]):<55} after: {after}")
+        return
+
+    start = time.perf_counter()
+    try:
+        report = pipeline.run(args.stages, args.force, args.jobs, args.dry_run, args.mark_done)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    print()
+    for name, r in report.items():
+        seconds = f"{r['seconds']:7.1f}s" if "seconds" in r else " " * 8
+        print(f"{name:<13} {r['result']:<10} {seconds}  {r['reason']}")
+    print(f"\nPipeline finished in {elapsed:.2f}s")
+
+    if any(r["result"] in ("failed", "blocked") for r in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Union
+
+# Line-delimited record files shared by the pipeline stages (catalog ->
+# enriched -> structured -> embeddings). Each stage reads its input as a
+# generator and writes one record per line, so memory does not grow with
+# the catalog. The JSON array and CSV outputs the stages used to write can
+# still be produced in the same pass.
+#
+# A .jsonl file is written to `<name>.jsonl.partial` and renamed when the
+# stage finishes. A downstream stage started with follow=True tails the
+# partial file while it grows, so stages can run at the same time.
+
+PathLike = Union[str, Path]
+
+PARTIAL_SUFFIX = ".partial"
+FOLLOW_POLL_SECONDS = 0.2
+JSON_ARRAY_CHUNK = 1 << 16
+
+
+def jsonl_path(path: PathLike) -> Path:
+    return Path(path).with_suffix(".jsonl")
+
+
+def partial_path(path: PathLike) -> Path:
+    return Path(str(path) + PARTIAL_SUFFIX)
+
+
+def resolve_input(path: PathLike) -> Path:
+    """
+    The .jsonl sibling of a stage's .json output when it exists (or is
+    being written), else the path itself.
+    """
+    stream = jsonl_path(path)
+    if stream.exists() or partial_path(stream).exists():
+        return stream
+    return Path(path)
+
+
+def _iter_json_array(f, chunk_size: int = JSON_ARRAY_CHUNK) -> Iterator[Dict]:
+    # Incremental decode of `[{...}, {...}]`: holds one chunk plus the
+    # element being decoded, never the whole array
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    eof = False
+
+    while True:
+        buffer = buffer.lstrip()
+
+        if not started:
+            if not buffer and not eof:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if not buffer.startswith("["):
+                raise ValueError("Expected a JSON array")
+            buffer = buffer[1:]
+            started = True
+            continue
+
+        if buffer.startswith(","):
+            buffer = buffer[1:]
+            continue
+        if buffer.startswith("]"):
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        yield record
+        buffer = buffer[end:]
+
+
+def _iter_lines(f, follow_until: Optional[Path] = None) -> Iterator[Dict]:
+    pending = ""
+
+    while True:
+        line = f.readline()
+
+        if line.endswith("\n"):
+            line, pending = pending + line, ""
+            if line.strip():
+                yield json.loads(line)
+            continue
+
+        # A partial line: the writer has not finished it yet
+        pending += line
+
+        if follow_until is None or follow_until.exists():
+            # Renamed into place: drain whatever is left, then stop
+            rest = pending + f.read()
+            for tail in rest.splitlines():
+                if tail.strip():
+                    yield json.loads(tail)
+            return
+
+        if not partial_path(follow_until).exists() and not follow_until.exists():
+            raise RuntimeError(f"Writer of {follow_until} stopped without finishing it")
+
+        time.sleep(FOLLOW_POLL_SECONDS)
+
+
+def read_records(path: PathLike, follow: bool = False) -> Iterator[Dict]:
+    """
+    Records of a .jsonl file (one per line) or a .json array, lazily.
+
+    With follow=True and a .jsonl path that is still being written, tails
+    `<path>.partial` until the writer renames it into place.
+    """
+    path = Path(path)
+
+    if path.suffix != ".jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f)
+        return
+
+    if follow and not path.exists():
+        partial = partial_path(path)
+        while not partial.exists() and not path.exists():
+            time.sleep(FOLLOW_POLL_SECONDS)
+
+        if not path.exists():
+            try:
+                f = open(partial, "r", encoding="utf-8")
+            except FileNotFoundError:
+                # Renamed between the check and the open
+                f = open(path, "r", encoding="utf-8")
+            with f:
+                yield from _iter_lines(f, follow_until=path)
+            return
+
+    with open(path, "r", encoding="utf-8") as f:
+        yield from _iter_lines(f)
+
+
+class RecordWriter:
+    """
+    ```
+    with RecordWriter("out.jsonl", "out.json", "out.csv") as out:
+        for record in records:
+            out.write(record)
+    ```
+
+    Writes every record to each path, formatted by suffix: .jsonl (one
+    line each, flushed so followers see it), .json (the indented array
+    json.dump would produce) or .csv (columns from the first record). Each
+    file is renamed into place only when the block exits cleanly.
+    """
+
+    def __init__(self, *paths: PathLike):
+        self.paths = [Path(p) for p in paths]
+        self.count = 0
+        self._files = []
+        self._csv_writers: Dict[int, csv.DictWriter] = {}
+
+    def _tmp(self, path: Path) -> Path:
+        return partial_path(path) if path.suffix == ".jsonl" else path.with_name(f".{path.name}.tmp")
+
+    def __enter__(self):
+        for path in self.paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            newline = "" if path.suffix == ".csv" else None
+            self._files.append(open(self._tmp(path), "w", encoding="utf-8", newline=newline))
+        return self
+
+    def write(self, record: Dict):
+        for i, (path, f) in enumerate(zip(self.paths, self._files)):
+            if path.suffix == ".jsonl":
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+
+            elif path.suffix == ".csv":
+                if i not in self._csv_writers:
+                    self._csv_writers[i] = csv.DictWriter(f, fieldnames=list(record.keys()))
+                    self._csv_writers[i].writeheader()
+                self._csv_writers[i].writerow(record)
+
+            else:
+                body = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+                f.write(("[\n  " if self.count == 0 else ",\n  ") + body)
+
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        for path, f in zip(self.paths, self._files):
+            if path.suffix == ".json":
+                f.write("\n]" if self.count else "[]")
+            f.close()
+
+        if exc_type is None:
+            for path in self.paths:
+                # CSV needs a header row, so an empty stream writes no CSV
+                if path.suffix == ".csv" and not self.count:
+                    self._tmp(path).unlink()
+                    continue
+                os.replace(self._tmp(path), path)
+        else:
+            for path in self.paths:
+                self._tmp(path).unlink(missing_ok=True)
+
+        return False
+
+
+def write_records(records: Iterable[Dict], *paths: PathLike) -> int:
+    with RecordWriter(*paths) as out:
+        for record in records:
+            out.write(record)
+    return out.count
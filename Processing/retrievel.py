@@ -1,28 +1,114 @@
+from __future__ import annotations
+
+import os
 from pathlib import Path
-from typing import List, Dict
-from collections import defaultdict
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from Processing.embedding_cache import CachedEmbeddings, QueryEmbeddingCache
+from Processing.embedding_backends import EMBEDDING_BACKEND, get_backend, index_backend
+from Processing.filters import FilterIndex, RowSelection, SearchFilters
+from Processing.hash_embeddings import HashEmbeddings
+from Processing.index_versions import resolve_index_dir
+from Processing.lexical import LexicalIndex, has_lexical_index
+from Processing.metadata_store import MetadataStore
+from Processing.metrics import (
+    CANDIDATES_FETCHED,
+    QUERIES,
+    QUERY_LENGTH,
+    RESULTS_RETURNED,
+    timed,
+)
 
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_core.documents import Document
+# LangChain is imported lazily inside the functions that need it, so the
+# lean serving path (Processing/serving.py) can use this module without
+# pulling in langchain_community / langchain_huggingface.
+if TYPE_CHECKING:
+    from langchain_community.vectorstores import FAISS
+    from langchain_core.documents import Document
 
 VECTOR_STORE_PATH = Path("Data/vector_store/shl_faiss")
-EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+
+# The query encoder, from the registry in Processing/embedding_backends.py
+# (SHL_EMBEDDING_BACKEND). "hash" is a deterministic, model-free stand-in
+# (Processing/hash_embeddings.py) for load tests and machines without the
+# model; its results are not meaningful rankings.
+BACKEND = get_backend(EMBEDDING_BACKEND)
+EMBEDDING_MODEL_NAME = BACKEND.model_name
+HASH_EMBEDDING_DELAY_MS = float(os.getenv("SHL_HASH_EMBEDDING_DELAY_MS", "0"))
 
 TOP_K = 15
 FETCH_K = 40
 LAMBDA_MULT = 0.6
 
-def load_vector_store() -> FAISS:
-    embeddings = HuggingFaceEmbeddings(
-        model_name=EMBEDDING_MODEL_NAME
-    )
+# How chunk similarities roll up into one assessment score
+AGGREGATION_METHODS = ("max", "sum", "softmax")
+AGGREGATION = "max"
+SOFTMAX_TEMPERATURE = 0.05
 
-    return FAISS.load_local(
-        VECTOR_STORE_PATH,
-        embeddings,
-        allow_dangerous_deserialization=True
-    )
+# "hybrid" fuses dense and BM25 rankings with reciprocal rank fusion. Its
+# match_score is an RRF score, not a cosine similarity, so it is opt-in
+RETRIEVAL_MODES = ("dense", "lexical", "hybrid")
+RETRIEVAL_MODE = os.getenv("SHL_RETRIEVAL_MODE", "dense")
+RRF_K = 60
+FUSION_DEPTH = 20
+
+# Lexical-only fast path: short queries made of rare catalog terms
+# ("Java 8", "SQL Server") are answered by BM25 without the encoder
+LEXICAL_FAST_PATH_MAX_TERMS = 3
+LEXICAL_FAST_PATH_MIN_IDF = 2.0
+
+QUERY_CACHE_SIZE = 2048
+QUERY_CACHE_TTL_SECONDS = 6 * 60 * 60
+# Disk tier, off unless a directory is given (e.g. Data/cache/query_embeddings)
+QUERY_CACHE_DIR = os.getenv("SHL_QUERY_CACHE_DIR", "")
+QUERY_CACHE_DISK_MAX_ENTRIES = int(os.getenv("SHL_QUERY_CACHE_DISK_MAX_ENTRIES", "50000"))
+
+query_cache = QueryEmbeddingCache(
+    EMBEDDING_MODEL_NAME,
+    max_size=QUERY_CACHE_SIZE,
+    ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+    disk_dir=QUERY_CACHE_DIR or None,
+    disk_max_entries=QUERY_CACHE_DISK_MAX_ENTRIES,
+)
+
+
+def get_query_cache_stats() -> Dict:
+    return query_cache.stats()
+
+
+def load_vector_store(
+    directory: Path = VECTOR_STORE_PATH,
+    embeddings: Optional[CachedEmbeddings] = None,
+) -> FAISS:
+    """
+    Pass the `embedding_function` of a loaded store as `embeddings` to
+    open another index version without loading the model again.
+    """
+    from langchain_core.embeddings import Embeddings
+
+    from Processing.vector_store import load_vector_store as load_faiss_store
+
+    Embeddings.register(CachedEmbeddings)
+
+    if embeddings is not None:
+        return load_faiss_store(embeddings, directory, BACKEND)
+
+    if BACKEND.stand_in:
+        # Sized like the index, as in lean mode (load_encoder)
+        dim = index_backend(resolve_index_dir(Path(directory)))["dim"]
+        base = HashEmbeddings(dim, delay_ms=HASH_EMBEDDING_DELAY_MS)
+    else:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        dim = BACKEND.dim
+        base = HuggingFaceEmbeddings(model_name=BACKEND.model_name)
+
+    embeddings = CachedEmbeddings(base, query_cache, dim)
+
+    return load_faiss_store(embeddings, directory, BACKEND)
 
 def get_mmr_retriever(vector_store: FAISS):
     return vector_store.as_retriever(
@@ -34,56 +120,618 @@ def get_mmr_retriever(vector_store: FAISS):
         }
     )
 
+def segment_reduce(
+    codes: np.ndarray,
+    scores: np.ndarray,
+    num_groups: int,
+    method: str = AGGREGATION,
+    temperature: float = SOFTMAX_TEMPERATURE,
+) -> np.ndarray:
+    """
+    Per-group reduction of chunk scores, where codes[i] is the group of
+    scores[i]: "max", "sum", or "softmax" (softmax-weighted mean).
+    """
+    if method == "sum":
+        return np.bincount(codes, weights=scores, minlength=num_groups)
+
+    group_max = np.full(num_groups, -np.inf)
+    np.maximum.at(group_max, codes, scores)
+
+    if method == "max":
+        return group_max
+
+    if method == "softmax":
+        weights = np.exp((scores - group_max[codes]) / temperature)
+        weighted = np.bincount(codes, weights=weights * scores, minlength=num_groups)
+        total = np.bincount(codes, weights=weights, minlength=num_groups)
+        return weighted / total
+
+    raise ValueError(f"Unknown aggregation method: {method!r} (use {AGGREGATION_METHODS})")
+
+
+def assessment_result(
+    assessment_id: str,
+    meta: Dict,
+    score: float,
+    supporting_chunks: int,
+    evidence: List[str],
+) -> Dict:
+    return {
+        "assessment_id": assessment_id,
+        "name": meta.get("name"),
+        "url": meta.get("url"),
+
+        "job_levels": meta.get("job_levels"),
+        "job_family": meta.get("job_family"),
+        "typical_roles": meta.get("typical_roles"),
+
+        "test_types": meta.get("test_types"),
+        "duration_minutes": meta.get("duration_minutes"),
+        "remote_testing": meta.get("remote_testing"),
+
+        "match_score": round(score, 3),
+        "supporting_chunks": supporting_chunks,
+        "evidence": evidence
+    }
+
+
 def aggregate_chunks_to_assessments(
     docs: List[Document],
-    top_n: int = 5
+    top_n: int = 5,
+    include_evidence: bool = True,
+    method: str = AGGREGATION
 ) -> List[Dict]:
 
-    grouped = defaultdict(lambda: {
-        "score": 0.0,
-        "count": 0,
-        "metadata": None,
-        "evidence": []
-    })
+    positions = [i for i, doc in enumerate(docs) if doc.metadata.get("assessment_id")]
+    if not positions:
+        return []
+
+    ids = np.array([docs[i].metadata["assessment_id"] for i in positions], dtype=object)
+    scores = np.array(
+        [docs[i].metadata.get("score", 1.0) for i in positions], dtype=np.float64
+    )
 
-    for doc in docs:
-        meta = doc.metadata
-        aid = meta.get("assessment_id")
+    group_ids, first_seen, codes = np.unique(ids, return_index=True, return_inverse=True)
+    codes = codes.ravel()
 
-        if not aid:
-            continue
+    group_scores = segment_reduce(codes, scores, len(group_ids), method)
+    counts = np.bincount(codes, minlength=len(group_ids))
 
-        grouped[aid]["score"] += doc.metadata.get("score", 1.0)
-        grouped[aid]["count"] += 1
-        grouped[aid]["metadata"] = meta
-        grouped[aid]["evidence"].append(doc.page_content)
+    # best score first, ties keep retrieval order
+    order = np.lexsort((first_seen, -group_scores))[:top_n]
 
     results = []
 
-    for aid, data in grouped.items():
-        meta = data["metadata"]
+    for g in order:
+        members = [positions[m] for m in np.flatnonzero(codes == g)]
+
+        evidence = []
+        if include_evidence:
+            evidence = [docs[m].page_content for m in members[:3]]
+
+        results.append(assessment_result(
+            group_ids[g],
+            docs[members[-1]].metadata,
+            float(group_scores[g]),
+            int(counts[g]),
+            evidence,
+        ))
+
+    return results
+
+
+def embed_queries(vector_store: FAISS, queries: List[str]) -> np.ndarray:
+    embedder = vector_store.embedding_function
+
+    if isinstance(embedder, CachedEmbeddings):
+        vectors = embedder.embed_queries(queries)
+    else:
+        vectors = embedder.embed_documents(queries)
+
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def flat_vectors(index: faiss.IndexFlat) -> np.ndarray:
+    """
+    Read-only (ntotal, d) view of a flat index's own storage, no copy. For
+    an index read with IO_FLAG_MMAP_IFC these are page-cache pages shared
+    by every process mapping the same file.
+    """
+    view = faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+    view.flags.writeable = False
+    return view
+
+
+class MMREngine:
+    """
+    Maximal Marginal Relevance over L2-normalized index vectors.
+
+    Candidates come from one multi-row FAISS search; relevance is a single
+    mat-vec, pairwise candidate similarity a single (fetch_k x fetch_k)
+    matmul, and each selection step is a vectorized running-max update
+    instead of LangChain's per-candidate Python loop.
+
+    A flat index whose vectors are already unit-length (the
+    sentence-transformer's are) is used in place; otherwise a normalized
+    copy is kept. For compressed indexes (fp16 / sq8 / pq) only the
+    fetch_k candidates of each query are decoded, so the compression is
+    not undone in RAM.
+    """
+
+    def __init__(
+        self,
+        index: faiss.Index,
+        k: int = TOP_K,
+        fetch_k: int = FETCH_K,
+        lambda_mult: float = LAMBDA_MULT,
+        normalize_L2: bool = False,
+    ):
+        self.index = index
+        self.k = k
+        self.fetch_k = fetch_k
+        self.lambda_mult = lambda_mult
+        self.normalize_L2 = normalize_L2
+
+        # IndexPQ rejects ID selectors; filtered PQ searches score the
+        # allowed rows directly instead
+        self.supports_selector = not isinstance(index, faiss.IndexPQ)
+
+        self.vectors: Optional[np.ndarray] = None
+        if isinstance(index, faiss.IndexFlat) and index.ntotal:
+            vectors = flat_vectors(index)
+            norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+            if np.allclose(norms, 1.0, atol=1e-4):
+                self.vectors = vectors
+            else:
+                self.vectors = _normalize_rows(vectors)
+
+    def row_vectors(self, rows: np.ndarray) -> np.ndarray:
+        """
+        L2-normalized vectors for index rows
+        """
+        if self.vectors is not None:
+            return self.vectors[rows]
+
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return np.zeros((0, self.index.d), dtype=np.float32)
+
+        return _normalize_rows(self.index.reconstruct_batch(rows))
+
+    def select(
+        self,
+        query_vector: np.ndarray,
+        candidates: np.ndarray,
+        k: int,
+        lambda_mult: float,
+    ) -> List[int]:
+        """
+        Positions in `candidates` (index rows) chosen by MMR, in order.
+        """
+        return self._select(query_vector, self.row_vectors(candidates), k, lambda_mult)
+
+    def _select(
+        self,
+        query_vector: np.ndarray,
+        candidate_vectors: np.ndarray,
+        k: int,
+        lambda_mult: float,
+    ) -> List[int]:
+        n = len(candidate_vectors)
+        k = min(k, n)
+        if k <= 0:
+            return []
+
+        relevance = candidate_vectors @ query_vector
+        similarity = candidate_vectors @ candidate_vectors.T
+
+        first = int(np.argmax(relevance))
+        selected = [first]
+
+        taken = np.zeros(n, dtype=bool)
+        taken[first] = True
+        redundancy = similarity[first].copy()
+
+        weighted_relevance = lambda_mult * relevance
+
+        while len(selected) < k:
+            scores = weighted_relevance - (1 - lambda_mult) * redundancy
+            scores[taken] = -np.inf
+
+            nxt = int(np.argmax(scores))
+            selected.append(nxt)
+            taken[nxt] = True
+            np.maximum(redundancy, similarity[nxt], out=redundancy)
+
+        return selected
+
+    def search(
+        self,
+        query_vectors: np.ndarray,
+        k: Optional[int] = None,
+        fetch_k: Optional[int] = None,
+        lambda_mult: Optional[float] = None,
+    ) -> List[List[int]]:
+        """
+        Selected index rows for each query vector.
+        """
+        return [
+            rows
+            for rows, _ in self.search_with_scores(query_vectors, k, fetch_k, lambda_mult)
+        ]
+
+    def _candidates(
+        self,
+        search_vectors: np.ndarray,
+        fetch_k: int,
+        selection: Optional[RowSelection],
+    ) -> np.ndarray:
+        if selection is None:
+            _, indices = self.index.search(search_vectors, fetch_k)
+            return indices
+
+        if selection.count <= fetch_k:
+            # Every allowed row is a candidate anyway: skip the ANN search
+            return np.broadcast_to(selection.rows, (len(search_vectors), selection.count))
+
+        if not self.supports_selector:
+            return self._search_rows(search_vectors, selection.rows, fetch_k)
 
-        results.append({
-            "assessment_id": aid,
-            "name": meta.get("name"),
-            "url": meta.get("url"),
+        selector = faiss.IDSelectorBitmap(selection.total, faiss.swig_ptr(selection.bitmap))
+        params = faiss.SearchParameters(sel=selector)
+        _, indices = self.index.search(search_vectors, fetch_k, params=params)
+        return indices
 
-            "job_levels": meta.get("job_levels"),
-            "job_family": meta.get("job_family"),
-            "typical_roles": meta.get("typical_roles"),
+    def _search_rows(
+        self,
+        search_vectors: np.ndarray,
+        rows: np.ndarray,
+        fetch_k: int,
+    ) -> np.ndarray:
+        # L2 over decoded vectors of the allowed rows, nearest first
+        vectors = self.index.reconstruct_batch(np.asarray(rows, dtype=np.int64))
+        distances = (vectors ** 2).sum(axis=1) - 2 * search_vectors @ vectors.T
+        order = np.argsort(distances, axis=1, kind="stable")[:, :fetch_k]
+        return rows[order]
 
-            "test_types": meta.get("test_types"),
-            "duration_minutes": meta.get("duration_minutes"),
-            "remote_testing": meta.get("remote_testing"),
+    def search_with_scores(
+        self,
+        query_vectors: np.ndarray,
+        k: Optional[int] = None,
+        fetch_k: Optional[int] = None,
+        lambda_mult: Optional[float] = None,
+        selection: Optional[RowSelection] = None,
+    ) -> List[Tuple[List[int], List[float]]]:
+        """
+        (selected index rows, cosine similarity to the query) per query.
+        `selection` restricts the search to pre-filtered rows.
+        """
+        k = self.k if k is None else k
+        fetch_k = self.fetch_k if fetch_k is None else fetch_k
+        lambda_mult = self.lambda_mult if lambda_mult is None else lambda_mult
 
-            "match_score": round(data["score"], 3),
-            "supporting_chunks": data["count"],
-            "evidence": data["evidence"][:3] 
-        })
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        if query_vectors.ndim == 1:
+            query_vectors = query_vectors[None, :]
 
-    results.sort(key=lambda x: x["match_score"], reverse=True)
+        search_vectors = query_vectors.copy()
+        if self.normalize_L2:
+            faiss.normalize_L2(search_vectors)
 
-    return results[:top_n]
+        if selection is not None and selection.count == 0:
+            return [([], []) for _ in range(len(query_vectors))]
+
+        with timed("faiss_search"):
+            indices = self._candidates(search_vectors, fetch_k, selection)
+        normalized_queries = _normalize_rows(query_vectors)
+
+        results = []
+
+        with timed("mmr"):
+            for row in range(len(query_vectors)):
+                candidates = indices[row][indices[row] != -1]
+                CANDIDATES_FETCHED.observe(len(candidates))
+
+                candidate_vectors = self.row_vectors(candidates)
+                positions = self._select(
+                    normalized_queries[row], candidate_vectors, k, lambda_mult
+                )
+
+                rows = candidates[positions]
+                scores = candidate_vectors[positions] @ normalized_queries[row]
+                results.append((rows.tolist(), scores.tolist()))
+
+        return results
+
+
+def get_mmr_engine(vector_store: FAISS) -> MMREngine:
+    engine = getattr(vector_store, "_mmr_engine", None)
+
+    if engine is None or engine.index is not vector_store.index:
+        engine = MMREngine(vector_store.index, normalize_L2=vector_store._normalize_L2)
+        vector_store._mmr_engine = engine
+
+    return engine
+
+
+def get_filter_index(vector_store: FAISS) -> FilterIndex:
+    filter_index = getattr(vector_store, "_filter_index", None)
+
+    if filter_index is None:
+        filter_index = FilterIndex(vector_store.docstore.store)
+        vector_store._filter_index = filter_index
+
+    return filter_index
+
+
+def mmr_search_batch(
+    vector_store: FAISS,
+    queries: List[str],
+    k: int = TOP_K,
+    fetch_k: int = FETCH_K,
+    lambda_mult: float = LAMBDA_MULT,
+    selection: Optional[RowSelection] = None,
+) -> List[List[Document]]:
+    """
+    Same selection as `get_mmr_retriever(...).invoke(q)` for every query,
+    but with one batched encode and one multi-row FAISS search.
+    `selection` (from `FilterIndex.select`) applies to every query in the
+    batch; None searches all rows.
+    """
+    if not queries:
+        return []
+
+    from langchain_core.documents import Document
+
+    with timed("encode"):
+        query_vectors = embed_queries(vector_store, queries)
+
+    selected = get_mmr_engine(vector_store).search_with_scores(
+        query_vectors,
+        k=k,
+        fetch_k=fetch_k,
+        lambda_mult=lambda_mult,
+        selection=selection,
+    )
+
+    batch_docs = []
+
+    with timed("fetch_documents"):
+        for rows, scores in selected:
+            docs = []
+            for i, score in zip(rows, scores):
+                doc_id = vector_store.index_to_docstore_id[i]
+                doc = vector_store.docstore.search(doc_id)
+                if isinstance(doc, Document):
+                    doc.metadata["score"] = score
+                    docs.append(doc)
+
+            batch_docs.append(docs)
+
+    return batch_docs
+
+
+def reciprocal_rank_fusion(
+    rankings: List[List[str]],
+    k: int = RRF_K,
+) -> List[Tuple[str, float]]:
+    """
+    sum(1 / (k + rank)) over the lists an id appears in, best first.
+    Ties keep the order in which ids were first seen.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores.items(), key=lambda pair: -pair[1])
+
+
+def fuse_results(
+    dense: List[Dict],
+    lexical: List[Dict],
+    top_n: int = 5,
+    k: int = RRF_K,
+) -> List[Dict]:
+    """
+    RRF over two assessment-level result lists. match_score is the fused
+    score scaled so that rank 1 in both lists is 1.0.
+    """
+    by_id = {r["assessment_id"]: r for r in lexical}
+    by_id.update({r["assessment_id"]: r for r in dense})
+
+    fused = reciprocal_rank_fusion(
+        [[r["assessment_id"] for r in dense], [r["assessment_id"] for r in lexical]], k
+    )
+    best = 2.0 / (k + 1)
+
+    return [
+        {**by_id[aid], "match_score": round(score / best, 3)}
+        for aid, score in fused[:top_n]
+    ]
+
+
+class LexicalRanker:
+    """
+    BM25 hits mapped onto metadata-store rows, so lexical results come back
+    in the same shape as aggregated dense results and honour the same
+    pre-filter bitmaps.
+    """
+
+    def __init__(self, lexical: LexicalIndex, store: MetadataStore):
+        self.lexical = lexical
+        self.store = store
+
+        first_row: Dict[str, int] = {}
+        for row in range(len(store)):
+            first_row.setdefault(store.assessment_id(row), row)
+
+        self.doc_rows = np.array(
+            [first_row.get(aid, -1) for aid in lexical.doc_ids], dtype=np.int64
+        )
+        self.available = self.doc_rows != -1
+
+    def allowed(self, selection: Optional[RowSelection]) -> np.ndarray:
+        if selection is None:
+            return self.available
+
+        rows = np.unpackbits(selection.bitmap, bitorder="little")[: selection.total]
+        return self.available & rows[np.where(self.available, self.doc_rows, 0)].astype(bool)
+
+    def is_fast_path(self, query: str) -> bool:
+        return self.lexical.is_keyword_query(
+            query, LEXICAL_FAST_PATH_MAX_TERMS, LEXICAL_FAST_PATH_MIN_IDF
+        )
+
+    def recommend(
+        self,
+        query: str,
+        top_n: int = 5,
+        include_evidence: bool = True,
+        selection: Optional[RowSelection] = None,
+    ) -> List[Dict]:
+        """
+        BM25 hits as assessment results; match_score is the BM25 score
+        relative to the best hit, so it stays on a 0-1 scale like the
+        dense and fused scores.
+        """
+        with timed("lexical"):
+            hits = self.lexical.search(query, top_n, self.allowed(selection))
+            results = []
+
+            for doc, score in hits:
+                row = int(self.doc_rows[doc])
+                evidence = [self.store.text(row)] if include_evidence else []
+
+                results.append(assessment_result(
+                    self.lexical.doc_ids[doc],
+                    self.store.metadata(row),
+                    score / hits[0][1],
+                    0,
+                    evidence,
+                ))
+
+        return results
+
+
+def get_lexical_ranker(vector_store: FAISS) -> Optional[LexicalRanker]:
+    if not hasattr(vector_store, "_lexical_ranker"):
+        store = vector_store.docstore.store
+        index_dir = store.directory.parent
+
+        ranker = None
+        if has_lexical_index(index_dir):
+            ranker = LexicalRanker(LexicalIndex(index_dir), store)
+        vector_store._lexical_ranker = ranker
+
+    return vector_store._lexical_ranker
+
+
+def hybrid_recommend(
+    queries: List[str],
+    dense_recommend: Callable[[List[str], int], List[List[Dict]]],
+    ranker: Optional[LexicalRanker],
+    selection: Optional[RowSelection] = None,
+    top_n: int = 5,
+    include_evidence: bool = True,
+    mode: str = RETRIEVAL_MODE,
+) -> List[List[Dict]]:
+    """
+    Dispatches a batch by retrieval mode. `dense_recommend(queries, n)`
+    returns aggregated dense results; only queries that need the encoder
+    are passed to it. Without a lexical index every mode is dense.
+    """
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode!r} (use {RETRIEVAL_MODES})")
+
+    for query in queries:
+        QUERY_LENGTH.observe(len(query))
+
+    if mode == "dense" or ranker is None:
+        QUERIES.inc("dense", amount=len(queries))
+        return _observe_results(dense_recommend(queries, top_n))
+
+    if mode == "lexical":
+        QUERIES.inc("lexical", amount=len(queries))
+        return _observe_results(
+            [ranker.recommend(q, top_n, include_evidence, selection) for q in queries]
+        )
+
+    results: List[Optional[List[Dict]]] = [None] * len(queries)
+    needs_encoder = []
+
+    for i, query in enumerate(queries):
+        if ranker.is_fast_path(query):
+            results[i] = ranker.recommend(query, top_n, include_evidence, selection)
+        else:
+            needs_encoder.append(i)
+
+    QUERIES.inc("lexical_fast_path", amount=len(queries) - len(needs_encoder))
+    QUERIES.inc("hybrid", amount=len(needs_encoder))
+
+    if needs_encoder:
+        dense = dense_recommend(
+            [queries[i] for i in needs_encoder], max(top_n, FUSION_DEPTH)
+        )
+        for i, dense_results in zip(needs_encoder, dense):
+            lexical_results = ranker.recommend(
+                queries[i], max(top_n, FUSION_DEPTH), include_evidence, selection
+            )
+            with timed("fusion"):
+                results[i] = fuse_results(dense_results, lexical_results, top_n)
+
+    return _observe_results(results)
+
+
+def _observe_results(batch_results: List[List[Dict]]) -> List[List[Dict]]:
+    for results in batch_results:
+        RESULTS_RETURNED.observe(len(results))
+    return batch_results
+
+
+def recommend_batch(
+    vector_store: FAISS,
+    queries: List[str],
+    top_n: int = 5,
+    include_evidence: bool = True,
+    method: str = AGGREGATION,
+    filters: Optional[SearchFilters] = None,
+    mode: str = RETRIEVAL_MODE,
+    k: int = TOP_K,
+    fetch_k: int = FETCH_K,
+    lambda_mult: float = LAMBDA_MULT
+) -> List[List[Dict]]:
+
+    # Resolved once, for the dense and the lexical side alike
+    selection = get_filter_index(vector_store).select(filters)
+
+    def dense_recommend(batch: List[str], n: int) -> List[List[Dict]]:
+        batch_docs = mmr_search_batch(
+            vector_store, batch, k, fetch_k, lambda_mult, selection=selection
+        )
+        with timed("aggregate"):
+            return [
+                aggregate_chunks_to_assessments(
+                    docs, top_n=n, include_evidence=include_evidence, method=method
+                )
+                for docs in batch_docs
+            ]
+
+    return hybrid_recommend(
+        queries,
+        dense_recommend,
+        get_lexical_ranker(vector_store),
+        selection=selection,
+        top_n=top_n,
+        include_evidence=include_evidence,
+        mode=mode,
+    )
 
 
 # Manual test
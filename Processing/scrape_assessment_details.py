@@ -1,9 +1,11 @@
-import requests
 from bs4 import BeautifulSoup
 import json
 from pathlib import Path
 import re
 
+from Scrapping.http_cache import HTTPCache, content_key
+from Scrapping.http_client import FetchError
+
 INPUT_PATH = Path("Data/Raw/shl_product_urls.json")
 OUTPUT_PATH = Path("Data/Enriched/shl_assessments_enriched.json")
 
@@ -12,9 +14,19 @@ OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
 def clean(text):
     return re.sub(r"\s+", " ", text).strip()
 
-def scrape_assessment(url):
-    r = requests.get(url, timeout=30)
-    soup = BeautifulSoup(r.text, "html.parser")
+def scrape_assessment(url, cache):
+    r = cache.fetch(url, timeout=30)
+    # Error pages must never be parsed, let alone memoized as records
+    if r.status != 200:
+        if cache.replay_only:
+            raise FetchError(url, "not in the HTTP cache (replay mode)")
+        raise FetchError(url, f"HTTP {r.status}")
+    # Unchanged pages (304s included) reuse the earlier parse
+    return cache.memo("assessment", content_key(url, r.body), lambda: parse_assessment(r.text(), url))
+
+
+def parse_assessment(html, url):
+    soup = BeautifulSoup(html, "html.parser")
 
     def text_after(label):
         h = soup.find("strong", string=re.compile(label, re.I))
@@ -42,10 +54,12 @@ def run():
     with open(INPUT_PATH, "r") as f:
         urls = json.load(f)
 
+    cache = HTTPCache()
+
     data = []
     for item in urls:
         try:
-            data.append(scrape_assessment(item["url"]))
+            data.append(scrape_assessment(item["url"], cache))
         except Exception as e:
             print("Failed:", item["url"], e)
 
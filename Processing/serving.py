@@ -0,0 +1,272 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import faiss
+import numpy as np
+
+from Processing.embedding_backends import EmbeddingBackend, check_compatible, get_backend
+from Processing.embedding_cache import CachedEmbeddings, QueryEmbeddingCache
+from Processing.embedding_ipc import EMBEDDING_SERVER, RemoteEmbeddings
+from Processing.filters import FilterIndex, RowSelection, SearchFilters
+from Processing.hash_embeddings import HashEmbeddings
+from Processing.index_versions import resolve_index_dir
+from Processing.lexical import LexicalIndex, has_lexical_index
+from Processing.metadata_store import MetadataStore, StoredDocument
+from Processing.metrics import timed
+from Processing.retrievel import (
+    VECTOR_STORE_PATH,
+    BACKEND,
+    HASH_EMBEDDING_DELAY_MS,
+    TOP_K,
+    FETCH_K,
+    LAMBDA_MULT,
+    query_cache,
+    AGGREGATION,
+    RETRIEVAL_MODE,
+    MMREngine,
+    LexicalRanker,
+    aggregate_chunks_to_assessments,
+    hybrid_recommend,
+)
+
+# Lean serving path: FAISS index + sentence-transformers loaded directly,
+# no LangChain import anywhere on this path.
+
+MODEL_READY_TIMEOUT_SECONDS = 300
+
+# Map index.faiss instead of reading it into the heap: processes serving
+# the same version share its pages through the page cache
+INDEX_MMAP = os.getenv("SHL_INDEX_MMAP", "1") != "0"
+
+
+class SentenceTransformerEmbeddings:
+    """
+    Minimal stand-in for HuggingFaceEmbeddings with identical preprocessing
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        texts = [t.replace("\n", " ") for t in texts]
+        return self.model.encode(texts, show_progress_bar=False).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def load_encoder(backend: EmbeddingBackend = BACKEND, dim: Optional[int] = None):
+    """
+    A warm encoder for `backend`. `dim` sizes the hash stand-in (default:
+    the backend's); real models encode at their own dimension.
+    """
+    if backend.stand_in:
+        return HashEmbeddings(dim or backend.dim, delay_ms=HASH_EMBEDDING_DELAY_MS)
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(backend.model_name)
+    model.encode(["warmup"], show_progress_bar=False)
+    return SentenceTransformerEmbeddings(model)
+
+
+# Mapping flat indexes needs faiss >= 1.8; older builds read into the heap
+IO_FLAG_MMAP_IFC = getattr(faiss, "IO_FLAG_MMAP_IFC", None)
+
+
+def read_index(path: Path, mmap: bool = INDEX_MMAP) -> faiss.Index:
+    if mmap and IO_FLAG_MMAP_IFC is not None:
+        try:
+            return faiss.read_index(str(path), IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # Index types without mmap support are read normally
+            pass
+    return faiss.read_index(str(path))
+
+
+class LeanEngine:
+    """
+    `embeddings` takes the (ready) embeddings of another engine, to open a
+    new index version without loading the model again. With
+    SHL_EMBEDDING_SERVER set, queries are encoded by that shared server
+    and no model is loaded in this process.
+
+    An index built with another encoder than `backend` raises
+    EmbeddingMismatchError here, before anything is served from it.
+    """
+
+    def __init__(
+        self,
+        index_dir: Path = VECTOR_STORE_PATH,
+        backend: EmbeddingBackend = BACKEND,
+        cache: QueryEmbeddingCache = query_cache,
+        embeddings: Optional[CachedEmbeddings] = None,
+    ):
+        self.index_dir = resolve_index_dir(Path(index_dir))
+        self.backend = backend
+        self.model_name = backend.model_name
+        self.cache = cache
+
+        self.index = read_index(self.index_dir / "index.faiss")
+        # A shared server's encoder is only known once it answers (_warmup)
+        if embeddings is not None or not EMBEDDING_SERVER:
+            check_compatible(
+                self.index_dir, backend, self.index.d,
+                encoder_dim=embeddings.dim if embeddings is not None else None,
+            )
+        self.store = MetadataStore(self.index_dir)
+        self.mmr = MMREngine(self.index)
+        self.filter_index = FilterIndex(self.store)
+
+        self.lexical: Optional[LexicalRanker] = None
+        if has_lexical_index(self.index_dir):
+            self.lexical = LexicalRanker(LexicalIndex(self.index_dir), self.store)
+
+        self.embeddings: Optional[CachedEmbeddings] = None
+        self.load_error: Optional[str] = None
+        self.model_load_seconds: Optional[float] = None
+        self._ready = threading.Event()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+        if embeddings is not None:
+            self.embeddings = embeddings
+            self.model_load_seconds = 0.0
+            self._ready.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def start_warmup(self):
+        if self._warmup_thread is None and not self.ready:
+            self._warmup_thread = threading.Thread(
+                target=self._warmup, name="model-warmup", daemon=True
+            )
+            self._warmup_thread.start()
+
+    def _warmup(self):
+        start = time.perf_counter()
+        try:
+            if EMBEDDING_SERVER:
+                base = RemoteEmbeddings(EMBEDDING_SERVER)
+                info = base.wait_ready()
+                # The server's encoder, not this process's setting, is what counts
+                self.backend = get_backend(info["backend"])
+                self.model_name = self.backend.model_name
+                check_compatible(self.index_dir, self.backend, self.index.d)
+                if info["dim"] != self.index.d:
+                    raise ValueError(
+                        f"Embedding server encodes {info['dim']}-d vectors, the index holds {self.index.d}-d"
+                    )
+            else:
+                base = load_encoder(self.backend, self.index.d)
+
+            # Local and remote encoders were both checked against index.d above
+            self.embeddings = CachedEmbeddings(base, self.cache, self.index.d)
+            self.model_load_seconds = time.perf_counter() - start
+        except Exception as e:
+            self.load_error = f"{type(e).__name__}: {e}"
+            print(f"Model warmup failed: {self.load_error}")
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, timeout: float = MODEL_READY_TIMEOUT_SECONDS):
+        self.start_warmup()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Embedding model is still loading")
+        if self.embeddings is None:
+            raise RuntimeError(f"Embedding model failed to load: {self.load_error}")
+
+    def status(self) -> Dict:
+        return {
+            "ready": self.ready and self.embeddings is not None,
+            "embedding_backend": self.backend.name,
+            "model_name": self.model_name,
+            "documents": len(self.store),
+            "lexical_index": self.lexical is not None,
+            "model_load_seconds": self.model_load_seconds,
+            "error": self.load_error,
+        }
+
+    def mmr_search_batch(
+        self,
+        queries: List[str],
+        k: int = TOP_K,
+        fetch_k: int = FETCH_K,
+        lambda_mult: float = LAMBDA_MULT,
+        selection: Optional[RowSelection] = None,
+    ) -> List[List[StoredDocument]]:
+        if not queries:
+            return []
+
+        self.wait_ready()
+
+        with timed("encode"):
+            query_vectors = np.asarray(
+                self.embeddings.embed_queries(queries), dtype=np.float32
+            )
+
+        selected = self.mmr.search_with_scores(
+            query_vectors,
+            k=k,
+            fetch_k=fetch_k,
+            lambda_mult=lambda_mult,
+            selection=selection,
+        )
+
+        batch_docs = []
+        with timed("fetch_documents"):
+            for rows, scores in selected:
+                docs = []
+                for i, score in zip(rows, scores):
+                    doc = self.store.document(i)
+                    doc.metadata["score"] = score
+                    docs.append(doc)
+                batch_docs.append(docs)
+
+        return batch_docs
+
+    def recommend_batch(
+        self,
+        queries: List[str],
+        top_n: int = 5,
+        include_evidence: bool = True,
+        method: str = AGGREGATION,
+        filters: Optional[SearchFilters] = None,
+        mode: str = RETRIEVAL_MODE,
+        k: int = TOP_K,
+        fetch_k: int = FETCH_K,
+        lambda_mult: float = LAMBDA_MULT,
+    ) -> List[List[Dict]]:
+        """
+        Lexical fast-path queries are answered even while the model is
+        still warming up.
+        """
+
+        # Resolved once, for the dense and the lexical side alike
+        selection = self.filter_index.select(filters)
+
+        def dense_recommend(batch: List[str], n: int) -> List[List[Dict]]:
+            batch_docs = self.mmr_search_batch(
+                batch, k, fetch_k, lambda_mult, selection=selection
+            )
+            with timed("aggregate"):
+                return [
+                    aggregate_chunks_to_assessments(
+                        docs, top_n=n, include_evidence=include_evidence, method=method
+                    )
+                    for docs in batch_docs
+                ]
+
+        return hybrid_recommend(
+            queries,
+            dense_recommend,
+            self.lexical,
+            selection=selection,
+            top_n=top_n,
+            include_evidence=include_evidence,
+            mode=mode,
+        )
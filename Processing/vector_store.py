@@ -1,33 +1,248 @@
+import argparse
+import pickle
+import time
 from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_community.docstore.base import Docstore
 from langchain_community.vectorstores import FAISS
 
+from Processing.embedding_backends import EmbeddingBackend, check_compatible, get_backend
+from Processing.index_versions import resolve_index_dir, staged_version
+from Processing.metadata_store import MetadataStore, write_metadata_store
+
 VECTOR_STORE_DIR = Path("Data/vector_store/shl_faiss")
 VECTOR_STORE_DIR.mkdir(parents=True, exist_ok=True)
 
-EMBEDDING_MODEL_NAME = "sentence-transformers/all-mpnet-base-v2"
+INDEX_FILE = "index.faiss"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+
+# On-disk encodings for index.faiss. faiss.read_index restores any of them,
+# so loaders never need to know which one was built.
+#   flat  float32, exact            3072 B/vector at 768 dims
+#   fp16  half-precision SQ         1536 B/vector
+#   sq8   8-bit scalar quantizer     768 B/vector
+#   pq    product quantizer           96 B/vector (PQ_SUBQUANTIZERS x PQ_BITS)
+INDEX_MODES = ("flat", "fp16", "sq8", "pq")
+INDEX_MODE = "flat"
+
+PQ_SUBQUANTIZERS = 96
+PQ_BITS = 8
+
+
+class ColumnarDocstore(Docstore):
+    """
+    Read-only LangChain docstore over the memory-mapped MetadataStore.
+    Docstore ids are index row numbers as strings.
+    """
+
+    def __init__(self, store: MetadataStore):
+        self.store = store
+
+    def search(self, search: str) -> Union[str, Document]:
+        try:
+            row = int(search)
+        except ValueError:
+            return f"ID {search} not found."
+
+        if not 0 <= row < len(self.store):
+            return f"ID {search} not found."
+
+        return Document(
+            page_content=self.store.text(row),
+            metadata=self.store.metadata(row),
+        )
+
+
+def get_embedding_model(backend: Optional[EmbeddingBackend] = None):
+    return HuggingFaceEmbeddings(model_name=(backend or get_backend()).model_name)
+
+
+def build_index(vectors: np.ndarray, mode: str = INDEX_MODE) -> faiss.Index:
+    """
+    L2 index over `vectors` in row order, encoded as `mode`.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    dim = vectors.shape[1]
+
+    if mode == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif mode == "fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16)
+    elif mode == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    elif mode == "pq":
+        if dim % PQ_SUBQUANTIZERS:
+            raise ValueError(f"dim {dim} is not divisible by {PQ_SUBQUANTIZERS} sub-quantizers")
+
+        # 2**bits centroids per sub-quantizer need at least that many points
+        bits = min(PQ_BITS, int(np.log2(len(vectors))))
+        index = faiss.IndexPQ(dim, PQ_SUBQUANTIZERS, bits)
+        # The catalog is far smaller than FAISS's recommended 39 points per
+        # centroid; train anyway without the per-subquantizer warning spam
+        index.pq.cp.min_points_per_centroid = 1
+    else:
+        raise ValueError(f"Unknown index mode: {mode!r} (use {INDEX_MODES})")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+
+    return index
+
+
+def index_mode(index: faiss.Index) -> str:
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    if isinstance(index, faiss.IndexPQ):
+        return "pq"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16:
+            return "fp16"
+        if index.sq.qtype == faiss.ScalarQuantizer.QT_8bit:
+            return "sq8"
+    return type(index).__name__
 
 
-def get_embedding_model():
-    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+def convert_index(mode: str, directory: Path = VECTOR_STORE_DIR) -> faiss.Index:
+    """
+    Re-encodes a flat index.faiss in place. Lossy indexes are not used as a
+    source; rebuild those with `python -m Processing.embeddings`, which
+    takes its vectors from the embedding cache.
+    """
+    path = Path(directory) / INDEX_FILE
+    index = faiss.read_index(str(path))
 
+    current = index_mode(index)
+    if current == mode:
+        return index
+    if current != "flat":
+        raise ValueError(
+            f"{path} is {current!r}; only a flat index can be converted. "
+            f"Run `python -m Processing.embeddings --index-mode {mode}` instead."
+        )
+
+    converted = build_index(index.reconstruct_n(0, index.ntotal), mode)
+    tmp_path = path.with_suffix(".tmp")
+    faiss.write_index(converted, str(tmp_path))
+    tmp_path.replace(path)
+
+    return converted
+
+
+def write_index_files(
+    index: faiss.Index,
+    records: Iterable[Tuple[Dict, str]],
+    directory: Path = VECTOR_STORE_DIR,
+):
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    faiss.write_index(index, str(directory / INDEX_FILE))
+    write_metadata_store(records, directory)
 
-def save_vector_store(vector_store: FAISS):
 
-    vector_store.save_local(VECTOR_STORE_DIR)
-    print(f"Vector store saved at: {VECTOR_STORE_DIR}")
+def save_vector_store(vector_store: FAISS, directory: Path = VECTOR_STORE_DIR):
+    records = []
+    for row in range(vector_store.index.ntotal):
+        doc = vector_store.docstore.search(vector_store.index_to_docstore_id[row])
+        records.append((doc.metadata, doc.page_content))
 
+    write_index_files(vector_store.index, records, directory)
+    print(f"Vector store saved at: {directory}")
 
-def load_vector_store() -> FAISS:
-    embeddings = get_embedding_model()
 
-    if not VECTOR_STORE_DIR.exists():
+def load_vector_store(
+    embeddings: Optional[Embeddings] = None,
+    directory: Path = VECTOR_STORE_DIR,
+    backend: Optional[EmbeddingBackend] = None,
+) -> FAISS:
+    """
+    `backend` is what `embeddings` encode with (default: SHL_EMBEDDING_BACKEND);
+    an index built with another model is refused.
+    """
+    directory = resolve_index_dir(Path(directory))
+    backend = backend or get_backend()
+
+    if not (directory / INDEX_FILE).exists():
         raise FileNotFoundError(
             "FAISS index not found. Please build embeddings first."
         )
 
-    return FAISS.load_local(
-        VECTOR_STORE_DIR,
-        embeddings,
-        allow_dangerous_deserialization=True,
+    start = time.perf_counter()
+    index = faiss.read_index(str(directory / INDEX_FILE))
+    print(
+        f"Loaded {index_mode(index)} index: {index.ntotal} vectors "
+        f"in {1000 * (time.perf_counter() - start):.1f} ms"
+    )
+    check_compatible(directory, backend, index.d, encoder_dim=getattr(embeddings, "dim", None))
+    embeddings = embeddings or get_embedding_model(backend)
+    store = MetadataStore(directory)
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=ColumnarDocstore(store),
+        index_to_docstore_id={row: str(row) for row in range(index.ntotal)},
     )
+
+
+def migrate_pickle_docstore(directory: Path = VECTOR_STORE_DIR) -> Path:
+    """
+    One-off conversion of a legacy index.pkl into the columnar store.
+    Only run this on a pickle you produced yourself.
+    """
+    directory = Path(directory)
+
+    with open(directory / LEGACY_DOCSTORE_FILE, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    records = []
+    for row in range(len(index_to_docstore_id)):
+        doc = docstore.search(index_to_docstore_id[row])
+        records.append((doc.metadata, doc.page_content))
+
+    return write_metadata_store(records, directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the on-disk vector store")
+    parser.add_argument(
+        "--index-mode",
+        choices=INDEX_MODES,
+        help="re-encode the current flat index.faiss in this mode",
+    )
+    parser.add_argument(
+        "--migrate-pickle",
+        action="store_true",
+        help=f"convert a legacy {LEGACY_DOCSTORE_FILE} into the metadata store",
+    )
+    args = parser.parse_args()
+
+    if args.index_mode:
+        # Converted in a copy that becomes a new version, never in place
+        with staged_version(VECTOR_STORE_DIR, base=resolve_index_dir(VECTOR_STORE_DIR)) as directory:
+            index = convert_index(args.index_mode, directory)
+            size = (directory / INDEX_FILE).stat().st_size
+
+        path = resolve_index_dir(VECTOR_STORE_DIR) / INDEX_FILE
+        print(f"{path}: {index_mode(index)}, {size / 1024:.0f} KiB")
+    elif args.migrate_pickle:
+        directory = resolve_index_dir(VECTOR_STORE_DIR)
+        if not (directory / LEGACY_DOCSTORE_FILE).exists():
+            parser.exit(
+                1,
+                f"No {LEGACY_DOCSTORE_FILE} in {directory}: nothing to migrate. "
+                "Indexes built by `python -m Processing.embeddings` already have a metadata store.\n",
+            )
+
+        path = migrate_pickle_docstore(directory)
+        print(f"Metadata store written: {path}")
+        print(f"{directory / LEGACY_DOCSTORE_FILE} can now be deleted.")
+    else:
+        parser.print_help()
@@ -1,16 +1,17 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
-import json
-import csv
 import time
 import os
 
+from Processing.records import RecordWriter
+from Scrapping.http_cache import HTTPCache, content_key
+
 BASE_URL = "https://www.shl.com"
 CATALOG_URL = "https://www.shl.com/solutions/products/product-catalog/"
 START_STEP = 12 
 MAX_PAGES = 32  
 TYPE_INDIVIDUAL = 1
+OUTPUT_JSONL = "Data/Raw/shl_assessments.jsonl"
 OUTPUT_JSON = "Data/Raw/shl_assessments.json"
 OUTPUT_CSV = "Data/Raw/shl_assessments.csv"
 
@@ -19,8 +20,58 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-def scrape_catalog():
-    all_assessments = []
+def parse_catalog_page(html):
+    """
+    Rows of one catalog page, or None when the page has no table.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table")
+
+    if not table:
+        return None
+
+    rows = []
+
+    for row in table.find_all("tr")[1:]:
+        cols = row.find_all("td")
+        if len(cols) < 4:
+            continue
+
+        link = cols[0].find("a")
+        if not link:
+            continue
+
+        name = link.get_text(strip=True)
+        relative_url = link.get("href")
+        full_url = urljoin(BASE_URL, relative_url)
+
+        remote_testing = "Yes" if cols[1].find("span", class_="-yes") else "No"
+
+        adaptive_irt = "Yes" if cols[2].find("span", class_="-yes") else "No"
+
+        test_keys = cols[3].find_all("span")
+        test_type = ", ".join(k.get_text(strip=True) for k in test_keys) if test_keys else "N/A"
+
+        rows.append({
+            "name": name,
+            "url": full_url,
+            "test_type": test_type,
+            "remote_testing": remote_testing,
+            "adaptive_irt": adaptive_irt
+        })
+
+    return rows
+
+
+def iter_catalog(cache=None):
+    """
+    Catalog rows as each page is parsed. Pages go through the shared HTTP
+    cache (SHL_HTTP_CACHE / SHL_HTTP_CACHE_DIR): unchanged pages come back
+    as 304s and reuse their parsed rows, and replay mode runs with no
+    network at all.
+    """
+    cache = cache or HTTPCache()
+
     seen_urls = set()
 
     for page in range(MAX_PAGES):
@@ -28,85 +79,49 @@ def scrape_catalog():
         url = f"{CATALOG_URL}?start={start}&type={TYPE_INDIVIDUAL}"
 
         print(f"Scraping: {url}")
-        response = requests.get(url, headers=HEADERS, timeout=60)
+        response = cache.fetch(url, headers=HEADERS, timeout=60)
 
-        if response.status_code != 200:
+        if response.status != 200:
             print("Failed to load page, stopping.")
             break
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        table = soup.find("table")
+        rows = cache.memo("catalog_page", content_key(response.body), lambda: parse_catalog_page(response.text()))
 
-        if not table:
+        if rows is None:
             print("No table found, stopping.")
             break
 
-        rows = table.find_all("tr")[1:]  
         if not rows:
             print("No rows found, stopping.")
             break
 
         for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 4:
+            if row["url"] in seen_urls:
                 continue
 
-            link = cols[0].find("a")
-            if not link:
-                continue
-
-            name = link.get_text(strip=True)
-            relative_url = link.get("href")
-            full_url = urljoin(BASE_URL, relative_url)
-
-            if full_url in seen_urls:
-                continue
-
-            seen_urls.add(full_url)
-
-            remote_testing = "Yes" if cols[1].find("span", class_="-yes") else "No"
-
-            adaptive_irt = "Yes" if cols[2].find("span", class_="-yes") else "No"
+            seen_urls.add(row["url"])
+            yield row
 
-            test_keys = cols[3].find_all("span")
-            test_type = ", ".join(k.get_text(strip=True) for k in test_keys) if test_keys else "N/A"
+        # Replay never touches the server, so there is nothing to pace
+        if not cache.replay_only:
+            time.sleep(1)
 
-            all_assessments.append({
-                "name": name,
-                "url": full_url,
-                "test_type": test_type,
-                "remote_testing": remote_testing,
-                "adaptive_irt": adaptive_irt
-            })
 
-        time.sleep(1)
-
-    return all_assessments
-
-
-def save_json(data, filename):
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-
-
-def save_csv(data, filename):
-    if not data:
-        return
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=data[0].keys())
-        writer.writeheader()
-        writer.writerows(data)
+def scrape_catalog(cache=None):
+    return list(iter_catalog(cache))
 
 
 if __name__ == "__main__":
     print("Starting SHL catalog scraping...")
 
-    assessments = scrape_catalog()
-
-    print(f"\nTotal assessments collected: {len(assessments)}")
+    # JSONL for the next stage (which can follow it while it grows), plus
+    # the JSON array and CSV written in the same pass
+    with RecordWriter(OUTPUT_JSONL, OUTPUT_JSON, OUTPUT_CSV) as out:
+        for row in iter_catalog():
+            out.write(row)
 
-    save_json(assessments, OUTPUT_JSON)
-    save_csv(assessments, OUTPUT_CSV)
+    print(f"\nTotal assessments collected: {out.count}")
 
-    print(f"Saved JSON → {os.path.abspath(OUTPUT_JSON)}")
-    print(f"Saved CSV  → {os.path.abspath(OUTPUT_CSV)}")
+    print(f"Saved JSONL → {os.path.abspath(OUTPUT_JSONL)}")
+    print(f"Saved JSON  → {os.path.abspath(OUTPUT_JSON)}")
+    print(f"Saved CSV   → {os.path.abspath(OUTPUT_CSV)}")
@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import requests
+
+# On-disk HTTP cache shared by the scrapers. Bodies are stored with their
+# ETag / Last-Modified and revalidated with conditional requests, so an
+# unchanged page costs a 304 instead of a download. Parse results are
+# memoized by content hash, so a 304 skips the parse as well.
+#
+#   conditional  revalidate cached entries, store new 200s (default)
+#   replay       serve only from the cache, never touch the network
+#   off          plain requests, nothing read or written
+#
+# Layout under HTTP_CACHE_DIR:
+#   entries/ab/<sha256(url)>.json    validators + body hash per URL
+#   bodies/cd/<sha256(body)>         response bodies, content-addressed
+#   parsed/<name>/ef/<key>.json      memoized parse results
+
+HTTP_CACHE_DIR = os.getenv("SHL_HTTP_CACHE_DIR", "Data/cache/http")
+HTTP_CACHE_MODES = ("conditional", "replay", "off")
+HTTP_CACHE_MODE = os.getenv("SHL_HTTP_CACHE", "conditional")
+
+
+@dataclass
+class Response:
+    url: str
+    status: int
+    headers: Mapping[str, str]
+    body: bytes = field(repr=False)
+    # True when the body came from the cache (304 or replay)
+    from_cache: bool = False
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def content_key(*parts) -> str:
+    """Hash of strings / bytes, for HTTPCache.memo keys."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class HTTPCache:
+    def __init__(self, directory: str = HTTP_CACHE_DIR, mode: str = HTTP_CACHE_MODE):
+        if mode not in HTTP_CACHE_MODES:
+            raise ValueError(f"Unknown HTTP cache mode {mode!r}; expected one of {HTTP_CACHE_MODES}")
+
+        self.directory = directory
+        self.mode = mode
+        self.stats: Counter = Counter()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def replay_only(self) -> bool:
+        return self.mode == "replay"
+
+    def _path(self, kind: str, key: str, suffix: str = "") -> str:
+        return os.path.join(self.directory, kind, key[:2], key + suffix)
+
+    def _entry(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._path("entries", sha256(url.encode()), ".json"), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # An entry without its body (partly deleted cache) is a miss
+        return entry if os.path.exists(self._path("bodies", entry["body_sha256"])) else None
+
+    def lookup(self, url: str) -> Optional[Response]:
+        entry = self._entry(url)
+        if entry is None:
+            return None
+
+        with open(self._path("bodies", entry["body_sha256"]), "rb") as f:
+            body = f.read()
+
+        return Response(url, entry["status"], entry["headers"], body, from_cache=True)
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a cached URL, else {}."""
+        if not self.enabled:
+            return {}
+
+        entry = self._entry(url)
+        if entry is None:
+            return {}
+
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def store(self, url: str, status: int, headers: Mapping[str, str], body: bytes):
+        body_sha = sha256(body)
+        body_path = self._path("bodies", body_sha)
+        if not os.path.exists(body_path):
+            write_atomic(body_path, body)
+
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": {
+                name: headers[name]
+                for name in ("ETag", "Last-Modified", "Content-Type")
+                if headers.get(name)
+            },
+            "body_sha256": body_sha,
+            "stored_at": time.time(),
+        }
+        write_atomic(
+            self._path("entries", sha256(url.encode()), ".json"),
+            json.dumps(entry).encode("utf-8"),
+        )
+
+    def resolve(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> Response:
+        """
+        Turns the network response to a (possibly conditional) request into
+        the response the caller sees: a 304 becomes the cached 200, a fresh
+        200 is stored, anything else passes through untouched (including a
+        304 whose cached body is gone; callers re-request those).
+        """
+        if not self.enabled:
+            return Response(url, status, headers, body)
+
+        if status == 304:
+            cached = self.lookup(url)
+            if cached is not None:
+                self.stats["not_modified"] += 1
+                return cached
+
+        if status == 200:
+            self.store(url, status, headers, body)
+            self.stats["stored"] += 1
+
+        return Response(url, status, headers, body)
+
+    def replay(self, url: str) -> Response:
+        """
+        The cached response, or a 504 like an `only-if-cached` request
+        that misses.
+        """
+        cached = self.lookup(url)
+        if cached is None:
+            self.stats["replay_misses"] += 1
+            return Response(url, 504, {}, b"", from_cache=True)
+
+        self.stats["replayed"] += 1
+        return cached
+
+    def fetch(self, url: str, get: Callable = requests.get, **kwargs) -> Response:
+        """
+        Synchronous GET through the cache; `get` is requests.get or a
+        Session's get.
+        """
+        if self.replay_only:
+            return self.replay(url)
+
+        plain_headers = kwargs.pop("headers", {})
+        conditional = self.request_headers(url)
+        r = get(url, headers={**plain_headers, **conditional}, **kwargs)
+        response = self.resolve(url, r.status_code, r.headers, r.content)
+
+        if response.status == 304 and conditional:
+            # The cached body went away in between: ask again in full
+            self.stats["not_modified_misses"] += 1
+            r = get(url, headers=plain_headers, **kwargs)
+            response = self.resolve(url, r.status_code, r.headers, r.content)
+        return response
+
+    def _memo_path(self, name: str, key: str) -> str:
+        return os.path.join(self.directory, "parsed", name, key[:2], key + ".json")
+
+    def recall(self, name: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        try:
+            with open(self._memo_path(name, key), "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        self.stats["parse_reused"] += 1
+        return value
+
+    def remember(self, name: str, key: str, value: Any):
+        if self.enabled and value is not None:
+            write_atomic(self._memo_path(name, key), json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def memo(self, name: str, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        `compute()` once per (name, key); the JSON-serializable result is
+        kept under parsed/<name>/. Keys should hash the content that was
+        parsed (content_key), so a changed body is always parsed again.
+        """
+        value = self.recall(name, key)
+        if value is None:
+            value = compute()
+            self.remember(name, key, value)
+        return value
@@ -0,0 +1,199 @@
+import asyncio
+import time
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+from multidict import CIMultiDict
+
+from Scrapping.http_cache import HTTPCache, Response
+
+# Async HTTP client for the scrapers: bounded concurrency, a token bucket
+# per host, and the retry policy the detail scraper's requests session used
+# (urllib3 Retry(total=5, backoff_factor=1.5, status_forcelist=...)).
+
+CONCURRENCY = 8
+RATE_PER_HOST = 2.0
+BURST = 2
+TIMEOUT = 30
+
+RETRY_TOTAL = 5
+RETRY_BACKOFF_FACTOR = 1.5
+RETRY_BACKOFF_MAX = 120
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_AFTER_STATUSES = (413, 429, 503)
+
+
+class FetchError(Exception):
+    def __init__(self, url: str, reason: str):
+        super().__init__(f"{url}: {reason}")
+        self.url = url
+        self.reason = reason
+
+
+class TokenBucket:
+    """
+    `rate` requests per second on average, at most `burst` back to back.
+    """
+
+    def __init__(self, rate: float, burst: int = BURST):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def backoff_time(consecutive_errors: int, backoff_factor: float = RETRY_BACKOFF_FACTOR) -> float:
+    """
+    urllib3's schedule: no wait before the first retry, then
+    backoff_factor * 2 ** (errors - 1), capped at RETRY_BACKOFF_MAX.
+    """
+    if consecutive_errors <= 1:
+        return 0.0
+    return min(RETRY_BACKOFF_MAX, backoff_factor * 2 ** (consecutive_errors - 1))
+
+
+def retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    value = headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class AsyncClient:
+    """
+    ```
+    async with AsyncClient(headers=HEADERS) as client:
+        page = await client.get(url)
+    ```
+
+    At most `concurrency` requests are in flight overall, each host gets
+    its own TokenBucket, and every attempt (retries included) takes a
+    token. Connection errors, timeouts and RETRY_STATUSES are retried up to
+    `retries` times; any other non-2xx status raises FetchError straight
+    away.
+
+    With an HTTPCache, requests are conditional and a 304 returns the
+    cached body, or is re-requested unconditionally if that body is gone;
+    in replay mode nothing goes over the network and an
+    uncached URL raises FetchError.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = CONCURRENCY,
+        rate_per_host: float = RATE_PER_HOST,
+        burst: int = BURST,
+        timeout: float = TIMEOUT,
+        headers: Optional[Dict[str, str]] = None,
+        retries: int = RETRY_TOTAL,
+        backoff_factor: float = RETRY_BACKOFF_FACTOR,
+        cache: Optional[HTTPCache] = None,
+    ):
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+
+        self.requests = 0
+        self.retried = 0
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        return False
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    async def _attempt(self, url: str, headers: Optional[Dict[str, str]]) -> Response:
+        await self.bucket(url).acquire()
+
+        async with self._semaphore:
+            self.requests += 1
+            async with self._session.get(url, headers=headers) as r:
+                return Response(str(r.url), r.status, CIMultiDict(r.headers), await r.read())
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Response:
+        if self.cache is not None:
+            if self.cache.replay_only:
+                response = self.cache.replay(url)
+                if response.status != 200:
+                    raise FetchError(url, "not in the HTTP cache (replay mode)")
+                return response
+
+            plain_headers = headers
+            conditional = self.cache.request_headers(url)
+            headers = {**(headers or {}), **conditional}
+
+        errors = 0
+
+        while True:
+            wait = None
+            try:
+                response = await self._attempt(url, headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if self.cache is not None:
+                    response = self.cache.resolve(
+                        url, response.status, response.headers, response.body
+                    )
+                    # A 304 still here has no cached body left (evicted or
+                    # deleted since the request went out): ask again in full
+                    if response.status == 304:
+                        if not conditional:
+                            raise FetchError(url, "HTTP 304 to an unconditional request")
+                        self.cache.stats["not_modified_misses"] += 1
+                        conditional = {}
+                        headers = plain_headers
+                        continue
+                if response.status < 400:
+                    return response
+                if response.status not in RETRY_STATUSES:
+                    raise FetchError(url, f"HTTP {response.status}")
+
+                reason = f"HTTP {response.status}"
+                if response.status in RETRY_AFTER_STATUSES:
+                    wait = retry_after(response.headers)
+
+            errors += 1
+            if errors > self.retries:
+                raise FetchError(url, f"{reason} after {self.retries} retries")
+
+            self.retried += 1
+            await asyncio.sleep(wait if wait is not None else backoff_time(errors, self.backoff_factor))
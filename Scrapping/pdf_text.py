@@ -0,0 +1,133 @@
+import asyncio
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from pypdf import PdfReader
+
+from Scrapping.http_cache import sha256, write_atomic
+
+# Fact-sheet text extraction off the event loop. pypdf is pure Python and
+# CPU-bound, so documents are parsed in a process pool. Results are cached
+# under the SHA-256 of the PDF bytes, so an unchanged fact sheet is only
+# ever parsed once. Every document's parse time is recorded.
+
+PDF_WORKERS = max(1, min(4, os.cpu_count() or 1))
+PDF_TEXT_CACHE_DIR = os.getenv("SHL_PDF_TEXT_CACHE_DIR", "Data/cache/pdf_text")
+
+
+def reader_text(reader: PdfReader) -> str:
+    parts = []
+
+    for page in reader.pages:
+        text = page.extract_text()
+        if text:
+            parts.append(text)
+
+    return "\n".join(parts).strip()
+
+
+def parse_pdf(content: bytes) -> Dict:
+    """Text, page count and parse time; runs in a pool worker."""
+    start = time.perf_counter()
+    reader = PdfReader(io.BytesIO(content))
+    text = reader_text(reader)
+
+    return {
+        "text": text,
+        "pages": len(reader.pages),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+class PDFExtractor:
+    """
+    ```
+    with PDFExtractor() as pdfs:
+        text = await pdfs.extract(url, body)
+    ```
+
+    `timings` gets one entry per extract() call: url, sha256, bytes,
+    pages, parse seconds (as measured when the document was first parsed)
+    and whether the result came from the cache. Identical PDFs requested
+    concurrently share one parse. `workers=0` parses inline, for
+    debugging.
+    """
+
+    def __init__(self, workers: int = PDF_WORKERS, cache_dir: Optional[str] = PDF_TEXT_CACHE_DIR):
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.timings: List[Dict] = []
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __enter__(self):
+        if self.workers:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        return False
+
+    def _cache_path(self, digest: str) -> str:
+        return os.path.join(self.cache_dir, digest[:2], digest + ".json")
+
+    def _cached(self, digest: str) -> Optional[Dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(digest), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    async def _parse(self, digest: str, content: bytes) -> Dict:
+        if self._pool is None:
+            result = parse_pdf(content)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, parse_pdf, content)
+
+        if self.cache_dir:
+            write_atomic(self._cache_path(digest), json.dumps(result, ensure_ascii=False).encode("utf-8"))
+        return result
+
+    async def extract(self, url: str, content: bytes) -> str:
+        digest = sha256(content)
+        timing = {"url": url, "sha256": digest, "bytes": len(content)}
+
+        result = self._cached(digest)
+        # Served from the cache or from another caller's parse
+        cached = result is not None
+
+        if result is None:
+            future = self._inflight.get(digest)
+            cached = future is not None
+            if future is None:
+                future = self._inflight[digest] = asyncio.ensure_future(self._parse(digest, content))
+                future.add_done_callback(lambda _: self._inflight.pop(digest, None))
+
+            try:
+                result = await asyncio.shield(future)
+            except Exception as e:
+                self.timings.append({**timing, "error": f"{type(e).__name__}: {e}"})
+                raise
+
+        self.timings.append({**timing, "pages": result["pages"], "seconds": result["seconds"], "cached": cached})
+        return result["text"]
+
+    def summary(self, slowest: int = 5) -> Dict:
+        parsed = [t for t in self.timings if "seconds" in t and not t["cached"]]
+        return {
+            "documents": len(self.timings),
+            "parsed": len(parsed),
+            "cached": sum(1 for t in self.timings if t.get("cached")),
+            "failed": sum(1 for t in self.timings if "error" in t),
+            "parse_seconds": sum(t["seconds"] for t in parsed),
+            "slowest": sorted(parsed, key=lambda t: -t["seconds"])[:slowest],
+        }
@@ -1,58 +1,55 @@
+import argparse
+import asyncio
 import json
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-from pypdf import PdfReader
-import io
 import re
 import os
 import time
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+
+from Processing.records import RecordWriter, jsonl_path, read_records, resolve_input
+from Scrapping.http_cache import (
+    HTTPCache,
+    content_key,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MODE,
+    HTTP_CACHE_MODES,
+)
+from Scrapping.http_client import (
+    AsyncClient,
+    CONCURRENCY,
+    RATE_PER_HOST,
+    TIMEOUT,
+)
+from Scrapping.pdf_text import PDFExtractor, PDF_TEXT_CACHE_DIR, PDF_WORKERS
 
 
 INPUT_FILE = "Data/Raw/shl_assessments.json"
 OUTPUT_FILE = "Data/Enriched/shl_assessments_enriched.json"
+# Completed records, one JSON line each, appended as they arrive
+CHECKPOINT_FILE = "Data/Enriched/shl_assessments_enriched.checkpoint.jsonl"
+# Finished records held back for an earlier, slower one, per worker
+REORDER_WINDOW = 4
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X)",
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-TIMEOUT = 30
-SLEEP_SECONDS = 1
-
-
-def create_session():
-    session = requests.Session()
-    retry = Retry(
-        total=5,
-        backoff_factor=1.5,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET"]
-    )
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount("https://", adapter)
-    session.headers.update(HEADERS)
-    return session
-
-
-session = create_session()
+EMPTY_DETAILS = {
+    "description": None,
+    "job_levels": None,
+    "languages": None,
+    "assessment_length_minutes": None,
+    "pdf_url": None,
+    "pdf_text": None,
+}
 
 
-def extract_pdf_text(pdf_url):
+async def extract_pdf_text(client, pdfs, pdf_url):
     try:
-        r = session.get(pdf_url, timeout=TIMEOUT)
-        r.raise_for_status()
-
-        reader = PdfReader(io.BytesIO(r.content))
-        text = ""
-
-        for page in reader.pages:
-            if page.extract_text():
-                text += page.extract_text() + "\n"
-
-        return text.strip()
+        r = await client.get(pdf_url)
+        return await pdfs.extract(pdf_url, r.body)
 
     except Exception as e:
         print(f"⚠️ PDF failed: {pdf_url}")
@@ -64,90 +61,303 @@ def clean_page_text(soup):
         tag.decompose()
     return soup.get_text(separator="\n")
 
-def scrape_detail(url):
+
+def parse_detail(html, url):
+    soup = BeautifulSoup(html, "lxml")
+    page_text = clean_page_text(soup)
+
+    description = None
+    desc_match = re.search(
+        r"Description\s*(.+?)Job levels",
+        page_text,
+        re.IGNORECASE | re.DOTALL,
+    )
+    if desc_match:
+        description = desc_match.group(1).strip()
+
+    job_levels = None
+    jl_match = re.search(r"Job levels\s*(.+)", page_text, re.IGNORECASE)
+    if jl_match:
+        job_levels = jl_match.group(1).strip()
+
+    languages = None
+    lang_match = re.search(r"Languages\s*(.+)", page_text, re.IGNORECASE)
+    if lang_match:
+        languages = lang_match.group(1).strip()
+
+    duration = None
+    dur_match = re.search(
+        r"Approximate Completion Time.*?(\d+)",
+        page_text,
+        re.IGNORECASE,
+    )
+    if dur_match:
+        duration = int(dur_match.group(1))
+
+    pdf_url = None
+    pdf_link = soup.find("a", string=re.compile("Product Flyer|Fact Sheet", re.I))
+    if pdf_link and pdf_link.get("href"):
+        pdf_url = urljoin(url, pdf_link["href"])
+
+    return {
+        "description": description,
+        "job_levels": job_levels,
+        "languages": languages,
+        "assessment_length_minutes": duration,
+        "pdf_url": pdf_url,
+    }
+
+
+async def scrape_detail(client, pdfs, url):
+    """
+    Detail fields plus flyer text, or None if the page itself could not be
+    fetched. A failed PDF only leaves pdf_text empty, as before.
+    """
     try:
         print(f"Scraping: {url}")
 
-        r = session.get(url, timeout=TIMEOUT)
-        r.raise_for_status()
-
-        soup = BeautifulSoup(r.text, "lxml")
-        page_text = clean_page_text(soup)
-
-        description = None
-        desc_match = re.search(
-            r"Description\s*(.+?)Job levels",
-            page_text,
-            re.IGNORECASE | re.DOTALL,
-        )
-        if desc_match:
-            description = desc_match.group(1).strip()
-
-        job_levels = None
-        jl_match = re.search(r"Job levels\s*(.+)", page_text, re.IGNORECASE)
-        if jl_match:
-            job_levels = jl_match.group(1).strip()
-
-        languages = None
-        lang_match = re.search(r"Languages\s*(.+)", page_text, re.IGNORECASE)
-        if lang_match:
-            languages = lang_match.group(1).strip()
-
-        duration = None
-        dur_match = re.search(
-            r"Approximate Completion Time.*?(\d+)",
-            page_text,
-            re.IGNORECASE,
-        )
-        if dur_match:
-            duration = int(dur_match.group(1))
-
-        pdf_url = None
-        pdf_link = soup.find("a", string=re.compile("Product Flyer|Fact Sheet", re.I))
-        if pdf_link and pdf_link.get("href"):
-            pdf_url = urljoin(url, pdf_link["href"])
-
-        pdf_text = extract_pdf_text(pdf_url) if pdf_url else None
-
-        return {
-            "description": description,
-            "job_levels": job_levels,
-            "languages": languages,
-            "assessment_length_minutes": duration,
-            "pdf_url": pdf_url,
-            "pdf_text": pdf_text,
-        }
+        r = await client.get(url)
+        parse = lambda: parse_detail(r.text(), url)
+        # Unchanged pages (304s included) reuse the earlier parse
+        details = client.cache.memo("detail", content_key(url, r.body), parse) if client.cache else parse()
 
     except Exception as e:
-        print(f"Failed page (skipped): {url}")
-        return {
-            "description": None,
-            "job_levels": None,
-            "languages": None,
-            "assessment_length_minutes": None,
-            "pdf_url": None,
-            "pdf_text": None,
-        }
-
-def main():
-    os.makedirs("Data/Enriched", exist_ok=True)
-
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        assessments = json.load(f)
+        print(f"Failed page (skipped): {url} ({e})")
+        return None
 
-    enriched = []
+    pdf_url = details["pdf_url"]
+    details["pdf_text"] = await extract_pdf_text(client, pdfs, pdf_url) if pdf_url else None
+
+    return details
+
+
+def load_checkpoint(path):
+    """
+    url -> details for every record completed by earlier runs. A line cut
+    short by a crash is ignored; that record is simply scraped again.
+    """
+    done = {}
+
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["url"]] = record["details"]
+
+    return done
+
+
+async def iter_enriched(
+    assessments,
+    checkpoint_file=CHECKPOINT_FILE,
+    concurrency=CONCURRENCY,
+    rate_per_host=RATE_PER_HOST,
+    pdf_workers=PDF_WORKERS,
+    pdf_cache_dir=PDF_TEXT_CACHE_DIR,
+    stats=None,
+    **client_options,
+):
+    """
+    Enriched records ({**item, **details}) in input order, yielded as soon
+    as they and everything before them are done. `assessments` is consumed
+    lazily (it can be a read_records follower of the catalog stage).
+
+    Assessments already in the checkpoint are not fetched again; new
+    successes are appended to it as they complete. Pages that fail keep
+    empty fields and stay out of the checkpoint, so the next run retries
+    them. Downloads feed a pool of `pdf_workers` processes that parse the
+    flyers. `stats`, if given, receives resumed / scraped counts, failed
+    urls, request and retry counts and PDF timings.
+    """
+    done = load_checkpoint(checkpoint_file)
+
+    stats = {} if stats is None else stats
+    stats.update(resumed=0, scraped=0, failed=[])
+
+    items = enumerate(assessments)
+    input_lock = asyncio.Lock()
+
+    # Completed records waiting for an earlier one. A worker takes a slot
+    # before pulling an item and the slot is freed once that record is
+    # yielded, so one slow page cannot make the buffer grow without bound.
+    window = asyncio.Semaphore(REORDER_WINDOW * concurrency)
+    finished = asyncio.Queue()
+
+    async def next_item():
+        # The input may block (a follower polls its file), so read it off
+        # the event loop, one worker at a time
+        async with input_lock:
+            return await asyncio.to_thread(next, items, None)
+
+    with PDFExtractor(pdf_workers, pdf_cache_dir) as pdfs:
+        async with AsyncClient(
+            concurrency=concurrency,
+            rate_per_host=rate_per_host,
+            headers=HEADERS,
+            timeout=TIMEOUT,
+            **client_options,
+        ) as client:
+            with open(checkpoint_file, "a", encoding="utf-8") as checkpoint:
+
+                async def worker():
+                    try:
+                        while True:
+                            await window.acquire()
+                            entry = await next_item()
+                            if entry is None:
+                                window.release()
+                                return
+
+                            index, item = entry
+                            url = item["url"]
+
+                            if url in done:
+                                details = done.pop(url)
+                                stats["resumed"] += 1
+                            else:
+                                details = await scrape_detail(client, pdfs, url)
+
+                                if details is None:
+                                    stats["failed"].append(url)
+                                    details = EMPTY_DETAILS
+                                else:
+                                    stats["scraped"] += 1
+                                    checkpoint.write(json.dumps({"url": url, "details": details}, ensure_ascii=False) + "\n")
+                                    checkpoint.flush()
+
+                            finished.put_nowait((index, {**item, **details}))
+                    finally:
+                        finished.put_nowait(None)
+
+                # A fixed pool of workers rather than a task per assessment, so at
+                # most `concurrency` pages and flyers are in flight at once
+                workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+                ready = {}
+                next_index = 0
+
+                try:
+                    running = len(workers)
+                    while running:
+                        entry = await finished.get()
+                        if entry is None:
+                            running -= 1
+                            continue
+
+                        ready[entry[0]] = entry[1]
+                        while next_index in ready:
+                            yield ready.pop(next_index)
+                            next_index += 1
+                            window.release()
+
+                    # Re-raises a worker's unexpected error, if any
+                    await asyncio.gather(*workers)
+                finally:
+                    for task in workers:
+                        task.cancel()
+                    await asyncio.gather(*workers, return_exceptions=True)
+
+                    stats.update(
+                        requests=client.requests,
+                        retried=client.retried,
+                        pdf=pdfs.summary(),
+                        pdf_timings=pdfs.timings,
+                    )
+
+
+async def scrape_all(assessments, checkpoint_file=CHECKPOINT_FILE, *args, **kwargs):
+    """
+    iter_enriched collected: (url -> details for successes, failed urls,
+    stats).
+    """
+    stats = {}
+    done = {}
+
+    async for record in iter_enriched(assessments, checkpoint_file, *args, stats=stats, **kwargs):
+        done[record["url"]] = {field: record[field] for field in EMPTY_DETAILS}
+
+    for url in stats["failed"]:
+        done.pop(url, None)
+
+    return done, stats["failed"], stats
 
-    for idx, item in enumerate(assessments, start=1):
-        print(f"\n[{idx}/{len(assessments)}]")
-        details = scrape_detail(item["url"])
-        enriched.append({**item, **details})
-        time.sleep(SLEEP_SECONDS)
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(enriched, f, indent=2, ensure_ascii=False)
+def main():
+    parser = argparse.ArgumentParser(description="Scrape assessment detail pages and flyers")
+    parser.add_argument("--input", default=INPUT_FILE, help="catalog records; its .jsonl sibling is preferred")
+    parser.add_argument("--output", default=OUTPUT_FILE, help="JSON array; records also stream to its .jsonl sibling")
+    parser.add_argument("--no-json", action="store_true", help="write only the .jsonl output")
+    parser.add_argument("--follow", action="store_true", help="start while the catalog stage is still writing")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=RATE_PER_HOST, help="requests per second per host")
+    parser.add_argument("--fresh", action="store_true", help="ignore and replace an existing checkpoint")
+    parser.add_argument("--http-cache", choices=HTTP_CACHE_MODES, default=HTTP_CACHE_MODE)
+    parser.add_argument("--http-cache-dir", default=HTTP_CACHE_DIR)
+    parser.add_argument("--pdf-workers", type=int, default=PDF_WORKERS, help="0 parses in-process")
+    parser.add_argument("--pdf-timings", help="write per-document PDF timings (JSON) here")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.checkpoint) or ".", exist_ok=True)
+
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    outputs = [jsonl_path(args.output)] + ([] if args.no_json else [args.output])
+    assessments = read_records(resolve_input(args.input), follow=args.follow)
+
+    start = time.perf_counter()
+    cache = HTTPCache(args.http_cache_dir, args.http_cache)
+    stats = {}
+
+    async def run():
+        with RecordWriter(*outputs) as out:
+            async for record in iter_enriched(
+                assessments,
+                args.checkpoint,
+                args.concurrency,
+                args.rate,
+                pdf_workers=args.pdf_workers,
+                stats=stats,
+                cache=cache,
+            ):
+                out.write(record)
+        return out.count
+
+    total = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    failed = stats["failed"]
+
+    if not failed:
+        os.remove(args.checkpoint)
+
+    print(f"\nDONE → {', '.join(str(p) for p in outputs)}")
+    print(f"Total processed: {total}")
+    print(
+        f"Scraped {stats['scraped']} in {elapsed:.1f}s "
+        f"({stats['requests']} requests, {stats['retried']} retries), "
+        f"resumed {stats['resumed']}, failed {len(failed)}"
+    )
+    if cache.enabled:
+        print(f"HTTP cache ({cache.mode}): {dict(cache.stats)}")
 
-    print(f"\nDONE → {OUTPUT_FILE}")
-    print(f"Total processed: {len(enriched)}")
+    pdf = stats["pdf"]
+    print(
+        f"PDFs: {pdf['parsed']} parsed in {pdf['parse_seconds']:.1f}s CPU, "
+        f"{pdf['cached']} from cache, {pdf['failed']} failed"
+    )
+    for t in pdf["slowest"]:
+        print(f"  {t['seconds']:7.2f}s  {t['pages']:>3} pages  {t['bytes'] / 1024:8.0f} KiB  {t['url']}")
+
+    if args.pdf_timings:
+        with open(args.pdf_timings, "w", encoding="utf-8") as f:
+            json.dump(stats["pdf_timings"], f, indent=2)
+    if failed:
+        print(f"Checkpoint kept at {args.checkpoint}; rerun to retry the failures")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
-import json
+import argparse
 import os
 import re
 from urllib.parse import urlparse
 
+from Processing.records import RecordWriter, jsonl_path, read_records, resolve_input
+
 INPUT_FILE = "Data/Enriched/shl_assessments_enriched.json"
-OUTPUT_DIR = "Data/final_enriched_data/final_enriched_data"
+OUTPUT_DIR = "Data/final_enriched_data"
 OUTPUT_FILE = os.path.join(OUTPUT_DIR, "shl_assessments_structured.json")
+OUTPUT_JSONL = jsonl_path(OUTPUT_FILE)
 
 
 def slugify(text):
@@ -109,21 +112,21 @@ def build_structured_record(item):
 
 
 def main():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    parser = argparse.ArgumentParser(description="Structure the enriched assessment records")
+    parser.add_argument("--follow", action="store_true", help="start while the enrichment stage is still writing")
+    args = parser.parse_args()
 
-    with open(INPUT_FILE, "r", encoding="utf-8") as f:
-        enriched_data = json.load(f)
-
-    structured_data = []
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    for item in enriched_data:
-        structured_data.append(build_structured_record(item))
+    enriched_data = read_records(resolve_input(INPUT_FILE), follow=args.follow)
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(structured_data, f, indent=2, ensure_ascii=False)
+    # One record in, one record out: nothing is held beyond the current item
+    with RecordWriter(OUTPUT_JSONL, OUTPUT_FILE) as out:
+        for item in enriched_data:
+            out.write(build_structured_record(item))
 
-    print(f"Structured data created: {OUTPUT_FILE}")
-    print(f"Total records: {len(structured_data)}")
+    print(f"Structured data created: {OUTPUT_JSONL}, {OUTPUT_FILE}")
+    print(f"Total records: {out.count}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import os
+from typing import List
+
+import numpy as np
+
+from api.batching import MicroBatcher
+from Processing.embedding_backends import EmbeddingBackend
+from Processing.embedding_ipc import pack, read_frame
+from Processing.serving import BACKEND, load_encoder
+
+# One process that owns the query encoder for every API worker on the box
+# (see api/multiworker.py). Workers connect over a Unix socket; requests
+# from all of them are micro-batched into single forward passes.
+
+EMBEDDING_BATCH_SIZE = int(os.getenv("SHL_EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("SHL_EMBEDDING_BATCH_WAIT_MS", "2"))
+
+
+class EmbeddingServer:
+    """
+    ```
+    server = EmbeddingServer(encoder, backend, dim, "/tmp/shl.sock")
+    await server.serve()
+    ```
+
+    Each request (a list of texts from one worker) is a batch item; a batch
+    is encoded with one embed_documents call and split back per request.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        backend: EmbeddingBackend,
+        dim: int,
+        path: str,
+        max_batch_size: int = EMBEDDING_BATCH_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_WAIT_MS,
+    ):
+        self.embeddings = embeddings
+        self.backend = backend
+        self.dim = dim
+        self.path = path
+        self.batcher = MicroBatcher(self._encode_batch, max_batch_size, max_wait_ms)
+        self.connections = 0
+
+    def _encode_batch(self, requests: List[List[str]]) -> List[np.ndarray]:
+        texts = [text for request in requests for text in request]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+
+        results, start = [], 0
+        for request in requests:
+            results.append(vectors[start:start + len(request)])
+            start += len(request)
+        return results
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request, _ = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+
+                if request.get("op") == "info":
+                    response = pack({
+                        "backend": self.backend.name,
+                        "model_name": self.backend.model_name,
+                        "dim": self.dim,
+                        "connections": self.connections,
+                        "batching": self.batcher.stats(),
+                    })
+                elif request.get("op") == "embed":
+                    try:
+                        vectors = await self.batcher.submit(request["texts"])
+                        response = pack(
+                            {"rows": len(vectors), "dim": self.dim},
+                            np.ascontiguousarray(vectors, dtype=np.float32).tobytes(),
+                        )
+                    except Exception as e:
+                        response = pack({"error": f"{type(e).__name__}: {e}"})
+                else:
+                    response = pack({"error": f"Unknown op {request.get('op')!r}"})
+
+                writer.write(response)
+                await writer.drain()
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        server = await asyncio.start_unix_server(self._handle, path=self.path)
+        print(f"Embedding server ({self.backend.model_name}, {self.dim}-d) listening on {self.path}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared query-embedding server for API workers")
+    parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    parser.add_argument("--dim", type=int, help="vector size of the hash stand-in (default: 768)")
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    parser.add_argument("--batch-wait-ms", type=float, default=EMBEDDING_BATCH_WAIT_MS)
+    args = parser.parse_args()
+
+    embeddings = load_encoder(BACKEND, args.dim)
+    dim = len(embeddings.embed_query("warmup"))
+
+    server = EmbeddingServer(embeddings, BACKEND, dim, args.socket, args.batch_size, args.batch_wait_ms)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
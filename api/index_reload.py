@@ -0,0 +1,157 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from Processing.index_versions import activate, current_version, list_versions, version_dir
+from Processing.metrics import INDEX_INFO, INDEX_LOADED_AT, INDEX_RELOADS, timed
+
+# Hot reload of the served index. The next version is loaded and warmed in
+# the reloading thread while requests keep using the current one, then
+# swapped in by rebinding one attribute. A request reads `current` once,
+# so it finishes on the version it started with and nothing waits on the
+# swap. The version that was replaced stays loaded for an instant rollback.
+
+
+@dataclass(frozen=True)
+class ServedIndex:
+    version: str
+    directory: Path
+    backend: Any
+    loaded_at: float
+    load_seconds: float
+
+
+class IndexReloader:
+    """
+    ```
+    reloader = IndexReloader(VECTOR_STORE_PATH, load=open_backend, warm=probe)
+    served = reloader.current          # once per request
+    reloader.reload()                  # whatever CURRENT points at
+    reloader.rollback()
+    ```
+
+    `load(directory, previous_backend)` opens the index in `directory`;
+    `previous_backend` is None for the first load, and otherwise lets the
+    loader reuse the warm model. `warm(backend)` runs before a reloaded
+    index is swapped in; if it or the load raises, the current index stays.
+
+    CURRENT on disk is kept pointing at the served version, so a watcher
+    (or another worker) never undoes a rollback.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        load: Callable[[Path, Optional[Any]], Any],
+        warm: Optional[Callable[[Any], None]] = None,
+    ):
+        self.root = Path(root)
+        self._load = load
+        self._warm = warm
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self._failed_version: Optional[str] = None
+
+        self.previous: Optional[ServedIndex] = None
+        self.current = self._open(current_version(self.root), None)
+        self._publish()
+
+    def _open(self, version: str, reuse: Optional[Any]) -> ServedIndex:
+        start = time.perf_counter()
+        directory = version_dir(self.root, version)
+
+        with timed("index_load"):
+            backend = self._load(directory, reuse)
+            if reuse is not None and self._warm is not None:
+                self._warm(backend)
+
+        return ServedIndex(version, directory, backend, time.time(), time.perf_counter() - start)
+
+    def _publish(self):
+        INDEX_INFO.set(1, self.current.version, replace=True)
+        INDEX_LOADED_AT.set(self.current.loaded_at)
+
+    def reload(self, version: Optional[str] = None) -> Dict:
+        """
+        Loads `version` (default: the one CURRENT points at) and swaps it
+        in. Blocks the calling thread only; one reload runs at a time.
+        """
+        with self._lock:
+            target = version or current_version(self.root)
+            if target == self.current.version:
+                return self.status()
+
+            if target not in list_versions(self.root):
+                INDEX_RELOADS.inc("failed")
+                raise ValueError(f"No complete index version {target!r}")
+
+            try:
+                served = self._open(target, self.current.backend)
+            except Exception as e:
+                self.last_error = f"{target}: {type(e).__name__}: {e}"
+                self._failed_version = target
+                INDEX_RELOADS.inc("failed")
+                raise
+
+            self.previous, self.current = self.current, served
+            if version is not None and current_version(self.root) != target:
+                activate(self.root, target)
+
+            self.last_error = self._failed_version = None
+            self._publish()
+            INDEX_RELOADS.inc("reloaded")
+            return self.status()
+
+    def rollback(self) -> Dict:
+        """Swaps the previously served version back in, without reloading it."""
+        with self._lock:
+            if self.previous is None:
+                raise ValueError("No previous index version is loaded")
+
+            self.previous, self.current = self.current, self.previous
+            if current_version(self.root) != self.current.version:
+                activate(self.root, self.current.version)
+
+            self._publish()
+            INDEX_RELOADS.inc("rolled_back")
+            return self.status()
+
+    def watch(self, interval: float):
+        """Polls CURRENT every `interval` seconds and reloads when it moves."""
+        if self._watcher is not None or interval <= 0:
+            return
+
+        def poll():
+            while not self._stop.wait(interval):
+                # A version that failed to load is not retried until CURRENT moves on
+                if current_version(self.root) in (self.current.version, self._failed_version):
+                    continue
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"Index reload failed: {type(e).__name__}: {e}")
+
+        self._watcher = threading.Thread(target=poll, name="index-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> Dict:
+        current, previous = self.current, self.previous
+        return {
+            "version": current.version,
+            "directory": str(current.directory),
+            "loaded_at": current.loaded_at,
+            "load_seconds": round(current.load_seconds, 3),
+            "previous_version": previous.version if previous else None,
+            "on_disk": current_version(self.root),
+            "available": list_versions(self.root),
+            "watching": self._watcher is not None,
+            "last_error": self.last_error,
+        }
@@ -1,28 +1,206 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import AsyncIterator, List, Literal
 from typing import Optional
+from api.batching import MicroBatcher
+from api.index_reload import IndexReloader
+from api.response_cache import ResponseCache
+from Processing.filters import SearchFilters
+from Processing.metrics import FIRST_RESULT_SECONDS, REQUEST_SECONDS, render_metrics, timed
 from Processing.retrievel import (
+    VECTOR_STORE_PATH,
+    RETRIEVAL_MODE,
     load_vector_store,
-    get_mmr_retriever,
-    aggregate_chunks_to_assessments,
+    embed_queries,
+    get_lexical_ranker,
+    get_query_cache_stats,
+    recommend_batch,
 )
 
+MAX_BATCH_SIZE = int(os.getenv("SHL_MAX_BATCH_SIZE", "32"))
+MAX_BATCH_WAIT_MS = float(os.getenv("SHL_MAX_BATCH_WAIT_MS", "2"))
+
+# Seconds between checks of the index's CURRENT pointer; 0 disables the
+# watcher (POST /admin/index/reload still works)
+INDEX_WATCH_SECONDS = float(os.getenv("SHL_INDEX_WATCH_SECONDS", "5"))
+# When set, the /admin endpoints require it in X-Admin-Token
+ADMIN_TOKEN = os.getenv("SHL_ADMIN_TOKEN", "")
+
+# "langchain": FAISS.load_local + HuggingFaceEmbeddings, loaded at import.
+# "lean": raw FAISS index + sentence-transformers warmed in the background,
+#         never imports LangChain; see Processing/serving.py.
+SERVING_MODE = os.getenv("SHL_SERVING_MODE", "langchain")
+
+if SERVING_MODE == "lean":
+    from Processing.serving import LeanEngine
+
+    def open_backend(directory, previous):
+        if previous is None:
+            engine = LeanEngine(directory)
+            engine.start_warmup()
+            return engine
+        return LeanEngine(
+            directory, backend=previous.backend, embeddings=previous.embeddings
+        )
+else:
+    def open_backend(directory, previous):
+        return load_vector_store(
+            directory, embeddings=previous.embedding_function if previous else None
+        )
+
+
+def search_with(
+    backend,
+    queries: List[str],
+    top_n: int,
+    filters: Optional[SearchFilters] = None
+) -> List[List[dict]]:
+    if SERVING_MODE == "lean":
+        return backend.recommend_batch(
+            queries, top_n=top_n, include_evidence=False, filters=filters
+        )
+
+    return recommend_batch(
+        backend, queries, top_n=top_n, include_evidence=False, filters=filters
+    )
+
+
+# A reloaded index answers one query (model, FAISS, metadata pages) before
+# it is swapped in
+reloader = IndexReloader(
+    VECTOR_STORE_PATH,
+    load=open_backend,
+    warm=lambda backend: search_with(backend, ["software engineer"], top_n=1),
+)
+
+
+def embed_with(backend, queries: List[str]) -> list:
+    """
+    Query vectors for the response cache's semantic tier, None for queries
+    the search would answer without the encoder. They go through the query
+    embedding cache, so the search that may follow does not encode again.
+    """
+    if SERVING_MODE == "lean":
+        if not backend.ready or backend.embeddings is None:
+            return [None] * len(queries)
+        ranker = backend.lexical
+    else:
+        ranker = get_lexical_ranker(backend)
+
+    if RETRIEVAL_MODE == "lexical" and ranker is not None:
+        return [None] * len(queries)
+
+    needs_encoder = [
+        i for i, q in enumerate(queries)
+        if ranker is None or RETRIEVAL_MODE == "dense" or not ranker.is_fast_path(q)
+    ]
+    vectors = [None] * len(queries)
+    if needs_encoder:
+        batch = [queries[i] for i in needs_encoder]
+        if SERVING_MODE == "lean":
+            encoded = backend.embeddings.embed_queries(batch)
+        else:
+            encoded = embed_queries(backend, batch)
+        for i, vector in zip(needs_encoder, encoded):
+            vectors[i] = vector
+
+    return vectors
+
+
+response_cache = ResponseCache(current_version=lambda: reloader.current.version)
+
+
+def search_batch(
+    queries: List[str],
+    top_n: int,
+    filters: Optional[SearchFilters] = None
+) -> tuple:
+    """Results and the index version that produced them."""
+    served = reloader.current
+    results = response_cache.search(
+        served.version,
+        queries,
+        top_n,
+        filters,
+        search=lambda batch: search_with(served.backend, batch, top_n, filters),
+        embed=lambda batch: embed_with(served.backend, batch),
+    )
+    return results, served.version
+
+
+def run_recommend_batch(items: List[tuple]) -> List[tuple]:
+    # One search per distinct filter set; each shares a single selector
+    groups = {}
+    for position, (_, _, filters) in enumerate(items):
+        groups.setdefault(filters, []).append(position)
+
+    outputs = [None] * len(items)
+
+    for filters, positions in groups.items():
+        queries = [items[p][0] for p in positions]
+        max_top_k = max(items[p][1] for p in positions)
+
+        batch_results, version = search_batch(queries, top_n=max_top_k, filters=filters)
+
+        for p, results in zip(positions, batch_results):
+            outputs[p] = (results[:items[p][1]], version)
+
+    return outputs
+
+
+batcher = MicroBatcher(
+    run_recommend_batch,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait_ms=MAX_BATCH_WAIT_MS,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    reloader.watch(INDEX_WATCH_SECONDS)
+    yield
+    reloader.stop()
+    await batcher.stop()
+
 
 app = FastAPI(
     title="SHL Assessment Recommendation API",
     description="Semantic recommendation engine for SHL assessments using FAISS + MMR",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
-vector_store = load_vector_store()
-retriever = get_mmr_retriever(vector_store)
+class SearchFilterFields(BaseModel):
+    max_duration: Optional[int] = None
+    job_levels: Optional[List[str]] = None
+    test_types: Optional[List[str]] = None
+    remote_testing: Optional[bool] = None
+
+    def to_filters(self) -> Optional[SearchFilters]:
+        return SearchFilters.from_fields(
+            max_duration=self.max_duration,
+            job_levels=self.job_levels,
+            test_types=self.test_types,
+            remote_testing=self.remote_testing,
+        )
 
-class QueryRequest(BaseModel):
+
+class QueryRequest(SearchFilterFields):
     query: str
     top_k: int = 5
 
 
+class BatchQueryRequest(SearchFilterFields):
+    queries: List[str]
+    top_k: int = 5
+
+
 class AssessmentResponse(BaseModel):
     assessment_id: str
     name: str
@@ -31,22 +209,106 @@ class AssessmentResponse(BaseModel):
     test_types: List[str]
     duration_minutes: Optional[int] = None
 
+# Responses are validated and encoded here rather than by FastAPI so the
+# cost shows up as its own stage in /metrics
+results_adapter = TypeAdapter(List[AssessmentResponse])
+batch_results_adapter = TypeAdapter(List[List[AssessmentResponse]])
+
+
+def serialize(adapter: TypeAdapter, payload, index_version: str) -> Response:
+    with timed("serialize"):
+        body = adapter.dump_json(adapter.validate_python(payload))
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"X-Index-Version": index_version},
+    )
+
+
 @app.get("/")
 def health_check():
     return {"status": "API is running"}
 
 
-@app.post("/recommend", response_model=List[AssessmentResponse])
-def recommend_assessments(payload: QueryRequest):
+@app.get("/ready")
+def readiness_check():
+    served = reloader.current
+    if SERVING_MODE != "lean":
+        return {"status": "ready", "mode": SERVING_MODE, "index_version": served.version}
 
-    docs = retriever.invoke(payload.query)
+    status = served.backend.status()
+    status["mode"] = SERVING_MODE
+    status["index_version"] = served.version
 
-    results = aggregate_chunks_to_assessments(
-    docs,
-    top_n=payload.top_k
-)
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=status)
+
+    return status
 
 
+@app.get("/stats/cache")
+def query_cache_stats():
+    return get_query_cache_stats()
+
+
+@app.get("/stats/response-cache")
+def response_cache_stats():
+    return response_cache.stats()
+
+
+@app.get("/stats/batching")
+def batching_stats():
+    return batcher.stats()
+
+
+def check_admin_token(token: Optional[str]):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+class ReloadRequest(BaseModel):
+    # Default: the version CURRENT points at
+    version: Optional[str] = None
+
+
+@app.get("/admin/index")
+def index_status(x_admin_token: Optional[str] = Header(default=None)):
+    check_admin_token(x_admin_token)
+    return reloader.status()
+
+
+@app.post("/admin/index/reload")
+async def reload_index(
+    payload: Optional[ReloadRequest] = None,
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    check_admin_token(x_admin_token)
+    # Loaded off the event loop; requests keep being served meanwhile
+    try:
+        return await asyncio.to_thread(reloader.reload, payload.version if payload else None)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {type(e).__name__}: {e}")
+
+
+@app.post("/admin/index/rollback")
+def rollback_index(x_admin_token: Optional[str] = Header(default=None)):
+    check_admin_token(x_admin_token)
+    try:
+        return reloader.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def format_results(results: List[dict]) -> List[dict]:
     response = []
     for r in results:
         response.append({
@@ -60,3 +322,95 @@ def recommend_assessments(payload: QueryRequest):
 
     return response
 
+
+@app.post("/recommend", response_model=List[AssessmentResponse])
+async def recommend_assessments(payload: QueryRequest):
+    start = time.perf_counter()
+
+    results, index_version = await batcher.submit(
+        (payload.query, payload.top_k, payload.to_filters())
+    )
+
+    response = serialize(results_adapter, format_results(results), index_version)
+    REQUEST_SECONDS.observe(time.perf_counter() - start, "/recommend")
+
+    return response
+
+
+@app.post("/recommend/batch", response_model=List[List[AssessmentResponse]])
+def recommend_assessments_batch(payload: BatchQueryRequest):
+    start = time.perf_counter()
+
+    batch_results, index_version = search_batch(
+        payload.queries, top_n=payload.top_k, filters=payload.to_filters()
+    )
+
+    response = serialize(
+        batch_results_adapter,
+        [format_results(results) for results in batch_results],
+        index_version,
+    )
+    REQUEST_SECONDS.observe(time.perf_counter() - start, "/recommend/batch")
+
+    return response
+
+
+
+# Streamed responses: one event per assessment, in rank order, then a
+# "done" event carrying the index version (headers are already gone by
+# the time it is known). Failures after the 200 arrive as an "error" event.
+#   ndjson  {"event": "result", "rank": 1, "assessment": {...}} per line
+#   sse     event: result / data: {"rank": 1, "assessment": {...}}
+STREAM_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+
+
+def encode_event(stream_format: str, event: str, data: dict) -> bytes:
+    if stream_format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+    return (json.dumps({"event": event, **data}) + "\n").encode()
+
+
+async def stream_recommendations(payload: QueryRequest, stream_format: str) -> AsyncIterator[bytes]:
+    start = time.perf_counter()
+
+    try:
+        results, index_version = await batcher.submit(
+            (payload.query, payload.top_k, payload.to_filters())
+        )
+    except Exception as e:
+        yield encode_event(stream_format, "error", {"detail": f"{type(e).__name__}: {e}"})
+        return
+
+    for rank, result in enumerate(format_results(results), start=1):
+        with timed("serialize"):
+            assessment = AssessmentResponse.model_validate(result).model_dump()
+            chunk = encode_event(stream_format, "result", {"rank": rank, "assessment": assessment})
+        if rank == 1:
+            FIRST_RESULT_SECONDS.observe(time.perf_counter() - start, stream_format)
+        yield chunk
+
+    elapsed = time.perf_counter() - start
+    yield encode_event(stream_format, "done", {
+        "count": len(results),
+        "index_version": index_version,
+        "elapsed_ms": round(1000 * elapsed, 3),
+    })
+    REQUEST_SECONDS.observe(elapsed, "/recommend/stream")
+
+
+@app.post("/recommend/stream")
+async def recommend_assessments_stream(
+    payload: QueryRequest,
+    stream_format: Optional[Literal["ndjson", "sse"]] = Query(default=None, alias="format"),
+    accept: Optional[str] = Header(default=None),
+):
+    # ?format= wins; otherwise SSE when the client asks for it
+    if stream_format is None:
+        stream_format = "sse" if accept and "text/event-stream" in accept else "ndjson"
+
+    return StreamingResponse(
+        stream_recommendations(payload, stream_format),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
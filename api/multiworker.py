@@ -0,0 +1,59 @@
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+import uvicorn
+
+from Processing.embedding_ipc import RemoteEmbeddings
+
+# Several API workers sharing one copy of everything heavy:
+#   - index.faiss and the metadata store are memory-mapped (SHL_INDEX_MMAP),
+#     so workers serving the same version share their pages;
+#   - the encoder lives in one embedding server process (api/embedding_server.py)
+#     that micro-batches queries from all workers.
+# Each worker then holds only the API itself, so adding workers adds
+# little memory. Runs the lean serving mode.
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the API from N workers sharing one encoder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--socket", help="embedding server socket (default: a temp path)")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    path = args.socket or os.path.join(tempfile.gettempdir(), f"shl-embeddings-{os.getpid()}.sock")
+
+    server = subprocess.Popen([sys.executable, "-m", "api.embedding_server", "--socket", path])
+    try:
+        info = RemoteEmbeddings(path).wait_ready()
+        print(f"Embedding server ready: {info['model_name']} ({info['dim']}-d)", flush=True)
+
+        # Inherited by the workers uvicorn spawns
+        os.environ["SHL_SERVING_MODE"] = "lean"
+        os.environ["SHL_EMBEDDING_SERVER"] = path
+
+        # uvicorn re-raises SIGTERM once it has shut down; exit through the
+        # finally below so the embedding server goes down with us
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        uvicorn.run(
+            "api.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from Processing.embedding_cache import normalize_query
+from Processing.metrics import RESPONSE_CACHE, timed
+
+# Final recommendation lists, looked up in two tiers:
+#   exact     normalized query text + filters
+#   semantic  the cached query whose embedding is closest to this one, if
+#             its cosine similarity is at least `threshold`
+# An entry computed for top_n results also answers any smaller top_k (its
+# prefix), the same slicing the micro-batcher already does. Everything is
+# tied to one index version and dropped when the served version changes.
+
+RESPONSE_CACHE_SIZE = int(os.getenv("SHL_RESPONSE_CACHE_SIZE", "1024"))
+# Cosine similarity for a semantic hit; above 1 (the default) turns the
+# tier off. A hit returns another query's results, so pick a value with
+# benchmarks/response_cache.py on the served model, never the hash stand-in
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("SHL_RESPONSE_CACHE_THRESHOLD", "2"))
+
+
+class ResponseCache:
+    """
+    ```
+    cache = ResponseCache(current_version=lambda: reloader.current.version)
+    results = cache.search(version, queries, top_n, filters, search=..., embed=...)
+    ```
+
+    `current_version()` names the version being served. A request still
+    running on a version that has since been replaced bypasses the cache.
+    `search(queries)` computes results for the misses. `embed(queries)`
+    returns one query vector per query, or None where the search path
+    would not encode it (lexical fast path, model still loading); those
+    queries only use the exact tier.
+
+    Memory is bounded by `max_entries` (LRU): the entries' result lists
+    plus one preallocated max_entries x dim float32 matrix of query vectors.
+    """
+
+    def __init__(
+        self,
+        current_version: Callable[[], str],
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+    ):
+        self.current_version = current_version
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.version: Optional[str] = None
+
+        # key -> (slot, results); slots index the arrays below
+        self._entries: "OrderedDict[Tuple, Tuple[int, List[Dict]]]" = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._keys: List[Optional[Tuple]] = [None] * max_entries
+        self._vectors: Optional[np.ndarray] = None
+        self._has_vector = np.zeros(max_entries, dtype=bool)
+        self._depth = np.zeros(max_entries, dtype=np.int32)
+        # hash(filters) per slot; a match is confirmed against the key
+        self._filter_hashes = np.zeros(max_entries, dtype=np.int64)
+        self._lock = threading.Lock()
+
+        self._exact_hits = 0
+        self._semantic_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _clear(self):
+        self._entries.clear()
+        self._free = list(range(self.max_entries - 1, -1, -1))
+        self._keys = [None] * self.max_entries
+        self._has_vector[:] = False
+
+    def _sync(self, version: str):
+        if version != self.version:
+            if self._entries:
+                self._invalidations += 1
+            self._clear()
+            self.version = version
+
+    def _exact(self, key: Tuple, top_n: int) -> Optional[List[Dict]]:
+        entry = self._entries.get(key)
+        if entry is None or self._depth[entry[0]] < top_n:
+            return None
+        self._entries.move_to_end(key)
+        return entry[1][:top_n]
+
+    def _nearest(self, vector: np.ndarray, top_n: int, filters: Hashable) -> Optional[List[Dict]]:
+        if self._vectors is None or self.threshold > 1 or len(vector) != self._vectors.shape[1]:
+            return None
+
+        candidates = np.flatnonzero(
+            self._has_vector
+            & (self._depth >= top_n)
+            & (self._filter_hashes == hash(filters))
+        )
+        if not len(candidates):
+            return None
+
+        similarity = self._vectors[candidates] @ vector
+        best = int(np.argmax(similarity))
+        if similarity[best] < self.threshold:
+            return None
+
+        key = self._keys[candidates[best]]
+        if key[1] != filters:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key][1][:top_n]
+
+    def _put(self, key: Tuple, vector: Optional[np.ndarray], top_n: int, filters: Hashable, results: List[Dict]):
+        if key in self._entries:
+            slot = self._entries.pop(key)[0]
+        else:
+            if not self._free:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._keys[evicted] = None
+                self._has_vector[evicted] = False
+                self._free.append(evicted)
+                self._evictions += 1
+            slot = self._free.pop()
+
+        self._entries[key] = (slot, results)
+        self._keys[slot] = key
+        self._depth[slot] = top_n
+        self._filter_hashes[slot] = hash(filters)
+        self._has_vector[slot] = False
+
+        if vector is not None:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self._has_vector[:] = False
+            self._vectors[slot] = vector
+            self._has_vector[slot] = True
+
+    def search(
+        self,
+        version: str,
+        queries: Sequence[str],
+        top_n: int,
+        filters: Hashable,
+        search: Callable[[List[str]], List[List[Dict]]],
+        embed: Callable[[List[str]], List[Optional[Sequence[float]]]],
+    ) -> List[List[Dict]]:
+        if not self.enabled or version != self.current_version():
+            return search(list(queries))
+
+        keys = [(normalize_query(q), filters) for q in queries]
+        results: List[Optional[List[Dict]]] = [None] * len(queries)
+
+        with timed("response_cache"), self._lock:
+            self._sync(version)
+            for i, key in enumerate(keys):
+                results[i] = self._exact(key, top_n)
+        exact = sum(r is not None for r in results)
+
+        pending = [i for i, r in enumerate(results) if r is None]
+        vectors: Dict[int, np.ndarray] = {}
+        if pending and self.threshold <= 1:
+            for i, vector in zip(pending, embed([queries[i] for i in pending])):
+                if vector is not None:
+                    vector = np.asarray(vector, dtype=np.float32)
+                    vectors[i] = vector / (np.linalg.norm(vector) or 1.0)
+
+            with timed("response_cache"), self._lock:
+                if version == self.version:
+                    for i in pending:
+                        if i in vectors:
+                            results[i] = self._nearest(vectors[i], top_n, filters)
+
+        misses = [i for i, r in enumerate(results) if r is None]
+        semantic = len(pending) - len(misses)
+
+        if misses:
+            for i, computed in zip(misses, search([queries[i] for i in misses])):
+                results[i] = computed
+
+            with self._lock:
+                # A search that straddled a reload must not land in the new version
+                if version == self.version == self.current_version():
+                    for i in misses:
+                        self._put(keys[i], vectors.get(i), top_n, filters, results[i])
+
+        with self._lock:
+            self._exact_hits += exact
+            self._semantic_hits += semantic
+            self._misses += len(misses)
+        RESPONSE_CACHE.inc("exact", amount=exact)
+        RESPONSE_CACHE.inc("semantic", amount=semantic)
+        RESPONSE_CACHE.inc("miss", amount=len(misses))
+
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self._exact_hits + self._semantic_hits + self._misses
+            hits = self._exact_hits + self._semantic_hits
+
+            return {
+                "enabled": self.enabled,
+                "index_version": self.version,
+                "size": len(self._entries),
+                "max_size": self.max_entries,
+                "threshold": self.threshold,
+                "exact_hits": self._exact_hits,
+                "semantic_hits": self._semantic_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "semantic_hit_rate": round(self._semantic_hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+GROUND_TRUTH_PATH = ROOT / "Data/evaluation/ground_truth.json"
+BASELINE_PATH = ROOT / "benchmarks/baselines/api_load.json"
+
+TRANSPORTS = ("inprocess", "socket")
+MIXES = ("repeat", "unique", "keyword", "mixed")
+
+# Short exact-token queries: these take the lexical fast path
+KEYWORD_QUERIES = ["Java 8", "SQL Server", ".NET MVC", "Python", "Selenium", "sales"]
+
+READY_TIMEOUT_SECONDS = 300
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+# Load test for POST /recommend, in-process (ASGI transport, no network)
+# or against a uvicorn subprocess over a local socket. Closed loop:
+# `concurrency` clients each send their next request as soon as the
+# previous one returns.
+
+
+def load_queries() -> List[str]:
+    with open(GROUND_TRUTH_PATH, "r", encoding="utf-8") as f:
+        return [item["query"] for item in json.load(f)]
+
+
+def make_payloads(mix: str, n: int, top_k: int, filtered: float, seed: int) -> List[Dict]:
+    """
+    repeat   ground-truth queries verbatim (query cache warms up)
+    unique   a distinct variant per request (every request encodes)
+    keyword  short keyword queries (lexical fast path)
+    mixed    a random draw from the three above
+    """
+    rng = random.Random(seed)
+    queries = load_queries()
+
+    payloads = []
+    for i in range(n):
+        kind = rng.choice(MIXES[:3]) if mix == "mixed" else mix
+
+        if kind == "keyword":
+            query = rng.choice(KEYWORD_QUERIES)
+        elif kind == "unique":
+            query = f"{rng.choice(queries)} (request {seed}-{i})"
+        else:
+            query = rng.choice(queries)
+
+        payload = {"query": query, "top_k": top_k}
+        if rng.random() < filtered:
+            payload["max_duration"] = 30
+        payloads.append(payload)
+
+    return payloads
+
+
+async def wait_ready(client: httpx.AsyncClient, server: Optional[subprocess.Popen] = None):
+    deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if server is not None and server.poll() is not None:
+            raise RuntimeError(f"API server exited with code {server.returncode}")
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise TimeoutError("API did not become ready")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    payloads: List[Dict],
+    concurrency: int,
+) -> Tuple[List[Tuple[float, bool]], float]:
+    samples: List[Tuple[float, bool]] = []
+    position = iter(range(len(payloads)))
+
+    async def worker():
+        for i in position:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/recommend", json=payloads[i])
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            samples.append((time.perf_counter() - start, ok))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples: List[Tuple[float, bool]], wall_seconds: float) -> Dict:
+    latencies = np.array([s for s, ok in samples if ok]) * 1000
+    errors = sum(1 for _, ok in samples if not ok)
+
+    def pct(q):
+        return float(np.percentile(latencies, q)) if len(latencies) else float("nan")
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+        "mean_ms": float(latencies.mean()) if len(latencies) else float("nan"),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+async def run_load(client: httpx.AsyncClient, payloads, warmup, concurrency) -> Dict:
+    await wait_ready(client)
+    await drive(client, payloads[:warmup], concurrency)
+    samples, wall = await drive(client, payloads[warmup:], concurrency)
+    return summarize(samples, wall)
+
+
+async def run_inprocess(runs: List[Tuple]) -> List[Dict]:
+    # Environment is already set, so the import picks the right backend
+    import api.main as app_module
+
+    transport = httpx.ASGITransport(app=app_module.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://inprocess") as client:
+            return [await run_load(client, *run) for run in runs]
+    finally:
+        await app_module.batcher.stop()
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def run_socket(runs: List[Tuple]) -> List[Dict]:
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "api.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=max(run[2] for run in runs))
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            await wait_ready(client, server)
+            return [await run_load(client, *run) for run in runs]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(report: Dict, baseline: Dict, threshold: float, min_delta_ms: float) -> List[str]:
+    """
+    Regressions against stored baselines: a latency percentile more than
+    `threshold` (relative) and `min_delta_ms` (absolute) slower, throughput
+    more than `threshold` lower, or a higher error rate.
+    """
+    failures = []
+
+    for scenario, current in report.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+
+        for metric in METRICS:
+            limit = max(base[metric] * (1 + threshold), base[metric] + min_delta_ms)
+            if current[metric] > limit:
+                failures.append(
+                    f"{scenario}: {metric} {current[metric]:.2f} > {limit:.2f} "
+                    f"(baseline {base[metric]:.2f})"
+                )
+
+        if current["rps"] < base["rps"] * (1 - threshold):
+            failures.append(f"{scenario}: rps {current['rps']:.1f} < baseline {base['rps']:.1f}")
+
+        if current["error_rate"] > base["error_rate"]:
+            failures.append(
+                f"{scenario}: error_rate {current['error_rate']:.3f} > "
+                f"baseline {base['error_rate']:.3f}"
+            )
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency / throughput of POST /recommend")
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS, default=["inprocess"])
+    parser.add_argument("--serving-mode", choices=["langchain", "lean"], default="lean")
+    parser.add_argument(
+        "--embedder",
+        choices=["hash", "huggingface"],
+        default="hash",
+        help="hash: deterministic stand-in, no model download",
+    )
+    parser.add_argument("--encode-delay-ms", type=float, default=0.0, help="simulated encode cost for --embedder hash")
+    parser.add_argument("--mix", choices=MIXES, default="mixed")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--filtered", type=float, default=0.0, help="share of requests with a max_duration filter")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if the run regresses against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-delta-ms", type=float, default=2.0)
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "SHL_SERVING_MODE": args.serving_mode,
+        "SHL_EMBEDDING_BACKEND": args.embedder,
+        "SHL_HASH_EMBEDDING_DELAY_MS": str(args.encode_delay_ms),
+        # Keep load-test queries out of the on-disk query cache
+        "SHL_QUERY_CACHE_DIR": "",
+        # Measure the search path; benchmarks.response_cache covers the cache
+        "SHL_RESPONSE_CACHE_SIZE": "0",
+    })
+
+    report = {}
+
+    for transport in args.transport:
+        runs = [
+            (
+                make_payloads(
+                    args.mix, args.warmup + args.requests, args.top_k, args.filtered, args.seed
+                ),
+                args.warmup,
+                concurrency,
+            )
+            for concurrency in args.concurrency
+        ]
+        runner = run_inprocess if transport == "inprocess" else run_socket
+
+        embedder = args.embedder
+        if args.embedder == "hash" and args.encode_delay_ms:
+            embedder += f"+{args.encode_delay_ms:g}ms"
+
+        for concurrency, result in zip(args.concurrency, asyncio.run(runner(runs))):
+            scenario = f"{transport}/{args.serving_mode}/{embedder}/{args.mix}/c{concurrency}"
+            report[scenario] = result
+
+    print(
+        f"{'scenario':<44} {'req':>5} {'err%':>6} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for scenario, r in report.items():
+        print(
+            f"{scenario:<44} {r['requests']:>5} {100 * r['error_rate']:>6.2f} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+
+    if args.check:
+        failures = compare(report, baseline, args.threshold, args.min_delta_ms)
+        missing = [s for s in report if s not in baseline]
+        if missing:
+            print(f"\nNo baseline for: {', '.join(missing)}")
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            raise SystemExit(1)
+        print("\nNo regressions against baseline")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({**baseline, **report}, indent=2, sort_keys=True))
+        print(f"\nBaseline written: {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
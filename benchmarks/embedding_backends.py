@@ -0,0 +1,122 @@
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from Processing.embedding_backends import BACKENDS, get_backend
+from Processing.embeddings import STRUCTURED_DATA_PATH, iter_documents
+from Processing.evaluation import load_ground_truth, score_rankings
+from Processing.metadata_store import MetadataStore, write_metadata_store
+from Processing.records import read_records, resolve_input
+from Processing.retrievel import MMREngine, aggregate_chunks_to_assessments
+from Processing.serving import load_encoder
+from Processing.vector_store import build_index
+
+# Side by side for each embedding backend, each on an index built from the
+# same chunks: model load time, document and query encode latency, index
+# size and dense-retrieval quality on the ground truth. Lexical retrieval
+# does not depend on the encoder, so only the dense path is scored.
+#
+# Backends whose model cannot be loaded (not cached, no network) are
+# reported as unavailable instead of failing the run.
+
+
+def recommend(engine: MMREngine, store: MetadataStore, query_vector: np.ndarray):
+    rows, scores = engine.search_with_scores(query_vector)[0]
+
+    docs = []
+    for row, score in zip(rows, scores):
+        doc = store.document(row)
+        doc.metadata["score"] = score
+        docs.append(doc)
+
+    return aggregate_chunks_to_assessments(docs, top_n=10, include_evidence=False)
+
+
+def run_backend(name: str, documents, data, tmp: Path) -> dict:
+    backend = get_backend(name)
+    texts = [doc.page_content for doc in documents]
+    queries = [item["query"] for item in data]
+
+    start = time.perf_counter()
+    encoder = load_encoder(backend)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = np.asarray(encoder.embed_documents(texts), dtype=np.float32)
+    document_seconds = time.perf_counter() - start
+
+    index = build_index(vectors, "flat")
+    directory = tmp / backend.name
+    directory.mkdir()
+    faiss.write_index(index, str(directory / "index.faiss"))
+    write_metadata_store([(doc.metadata, doc.page_content) for doc in documents], directory)
+
+    # One query per call, as the API encodes a lone request
+    query_samples = []
+    query_vectors = []
+    for q in queries:
+        start = time.perf_counter()
+        query_vectors.append(encoder.embed_query(q))
+        query_samples.append(time.perf_counter() - start)
+    query_vectors = np.asarray(query_vectors, dtype=np.float32)
+
+    engine = MMREngine(index)
+    store = MetadataStore(directory)
+    all_recs = [recommend(engine, store, q) for q in query_vectors]
+
+    return {
+        "model_name": backend.model_name,
+        "dim": int(vectors.shape[1]),
+        "load_seconds": load_seconds,
+        "document_ms": 1000 * document_seconds / len(texts),
+        "query_ms_median": 1000 * statistics.median(query_samples),
+        "query_ms_p95": 1000 * float(np.percentile(query_samples, 95)),
+        "index_bytes": (directory / "index.faiss").stat().st_size,
+        **score_rankings(data, all_recs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode latency / index size / recall per embedding backend")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=["mpnet", "minilm", "hash"])
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    documents = list(iter_documents(read_records(resolve_input(STRUCTURED_DATA_PATH))))
+    data = load_ground_truth()
+
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.backends:
+            try:
+                report[name] = run_backend(name, documents, data, Path(tmp))
+            except Exception as e:
+                report[name] = {"error": f"{type(e).__name__}: {e}"}
+
+    print(f"{len(documents)} chunks, {len(data)} ground-truth queries\n")
+    print(
+        f"{'backend':<11} {'dim':>4} {'load s':>7} {'doc ms':>7} {'query ms':>9} {'p95 ms':>7} "
+        f"{'index KiB':>10} {'R@5':>6} {'R@10':>6} {'MRR':>6}"
+    )
+    for name, r in report.items():
+        if "error" in r:
+            print(f"{name:<11} unavailable: {r['error'][:90]}")
+            continue
+        print(
+            f"{name:<11} {r['dim']:>4} {r['load_seconds']:>7.2f} {r['document_ms']:>7.2f} "
+            f"{r['query_ms_median']:>9.2f} {r['query_ms_p95']:>7.2f} {r['index_bytes'] / 1024:>10.0f} "
+            f"{r['recall@5']:>6.2f} {r['recall@10']:>6.2f} {r['mrr']:>6.2f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
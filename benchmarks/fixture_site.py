@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+# Local stand-in for the SHL catalog: detail pages shaped like the real
+# ones (the fields scrape_assi_details.py parses) and a product-flyer PDF
+# per page. Latency and transient failures can be injected, and every
+# request is logged so callers can check request counts and pacing.
+# Responses carry an ETag and Last-Modified and honour conditional
+# requests; bumping `revisions[i]` changes page i.
+
+LAST_MODIFIED = "Wed, 01 Oct 2025 00:00:00 GMT"
+
+
+def make_pdf(text: str, pages: int = 1) -> bytes:
+    """
+    A PDF whose text layer is `text` (Helvetica, one line per line),
+    repeated on each of `pages` pages.
+    """
+    lines = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").splitlines()
+    stream = "BT /F1 11 Tf 50 780 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+
+    # 1 catalog, 2 pages tree, 3 font, then a page and its content per page
+    kids = " ".join(f"{4 + 2 * p} 0 R" for p in range(pages))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for p in range(pages):
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * p} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def description(i: int, revision: int = 0) -> str:
+    text = f"Measures skill area {i} for engineering roles."
+    return text + f" Revision {revision}." if revision else text
+
+
+def expected_details(i: int, base_url: str, revision: int = 0) -> Dict:
+    """What the detail scraper should extract from fixture page `i`."""
+    return {
+        "description": description(i, revision),
+        "job_levels": "Mid-Professional, Professional Individual Contributor,",
+        "languages": "English (USA),",
+        "assessment_length_minutes": 10 + i % 30,
+        "pdf_url": f"{base_url}/flyers/{i}.pdf",
+        "pdf_text": f"Fact sheet for assessment {i}\nJob Family/Title Engineering",
+    }
+
+
+def detail_page(i: int, revision: int = 0) -> str:
+    return f"""<html><head><title>Assessment {i}</title>
+<script>var tracking = "Description Job levels";</script></head>
+<body>
+<h1>Assessment {i}</h1>
+<div class="product-catalogue-training-calendar">
+  <h4>Description</h4>
+  <p>{description(i, revision)}</p>
+  <h4>Job levels</h4>
+  <p>Mid-Professional, Professional Individual Contributor,</p>
+  <h4>Languages</h4>
+  <p>English (USA),</p>
+  <h4>Assessment length</h4>
+  <p>Approximate Completion Time in minutes = {10 + i % 30}</p>
+  <a href="/flyers/{i}.pdf">Product Fact Sheet</a>
+</div>
+</body></html>"""
+
+
+class FixtureSite:
+    """
+    ```
+    async with FixtureSite(pages=50, latency_ms=20) as site:
+        catalog = site.catalog()
+    ```
+
+    `fail_first` maps a path to how many 503s it answers before succeeding;
+    `missing` pages answer 404.
+    """
+
+    def __init__(
+        self,
+        pages: int = 50,
+        latency_ms: float = 0.0,
+        fail_first: Optional[Dict[str, int]] = None,
+        missing: Optional[List[int]] = None,
+        revisions: Optional[Dict[int, int]] = None,
+    ):
+        self.pages = pages
+        self.latency_ms = latency_ms
+        self.fail_first = dict(fail_first or {})
+        self.missing = set(missing or [])
+        self.revisions: Dict[int, int] = dict(revisions or {})
+
+        self.hits: Counter = Counter()
+        self.log: List[float] = []
+        self.not_modified = 0
+        self.bytes_sent = 0
+
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def catalog(self) -> List[Dict]:
+        return [
+            {
+                "name": f"Assessment {i}",
+                "url": f"{self.base_url}/products/{i}/",
+                "test_type": "K",
+                "remote_testing": "Yes",
+                "adaptive_irt": "No",
+            }
+            for i in range(self.pages)
+        ]
+
+    async def _serve(self, request: web.Request, body_for) -> web.Response:
+        path = request.path
+        self.hits[path] += 1
+        self.log.append(time.monotonic())
+
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        if self.fail_first.get(path, 0) > 0:
+            self.fail_first[path] -= 1
+            return web.Response(status=503, headers={"Retry-After": "0"})
+
+        i = int(request.match_info["i"])
+        if i in self.missing or i >= self.pages:
+            return web.Response(status=404)
+
+        body, content_type = body_for(i)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        validators = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers=validators)
+
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type=content_type, headers=validators)
+
+    async def _page(self, request):
+        return await self._serve(
+            request,
+            lambda i: (detail_page(i, self.revisions.get(i, 0)).encode(), "text/html"),
+        )
+
+    async def _flyer(self, request):
+        return await self._serve(
+            request,
+            lambda i: (
+                make_pdf(f"Fact sheet for assessment {i}\nJob Family/Title Engineering"),
+                "application/pdf",
+            ),
+        )
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/products/{i}/", self._page)
+        app.router.add_get("/flyers/{i}.pdf", self._flyer)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+        return False
+
+    def max_rate(self, window: float = 1.0) -> int:
+        """Most requests seen in any `window`-second span."""
+        best = 0
+        start = 0
+        for end, t in enumerate(self.log):
+            while t - self.log[start] > window:
+                start += 1
+            best = max(best, end - start + 1)
+        return best
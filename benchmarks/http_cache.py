@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.fixture_site import FixtureSite, expected_details
+from Scrapping.http_cache import HTTPCache
+from Scrapping.scrape_assi_details import scrape_all
+
+# Detail scraper through the HTTP cache against the local fixture site:
+# a cold run, a warm run where everything revalidates as 304, a run after
+# a few pages change, and an offline replay that must not send a single
+# request.
+
+
+async def run(pages, latency_ms, concurrency, changed):
+    with tempfile.TemporaryDirectory() as tmp:
+        async with FixtureSite(pages=pages, latency_ms=latency_ms) as site:
+            catalog = site.catalog()
+            report = {}
+
+            async def phase(name, mode):
+                cache = HTTPCache(os.path.join(tmp, "http"), mode)
+                hits, not_modified, sent = sum(site.hits.values()), site.not_modified, site.bytes_sent
+
+                start = time.perf_counter()
+                done, failed, stats = await scrape_all(
+                    catalog,
+                    os.path.join(tmp, f"{name}.jsonl"),
+                    concurrency,
+                    rate_per_host=1000.0,
+                    pdf_cache_dir=os.path.join(tmp, "pdf_text"),
+                    cache=cache,
+                )
+                elapsed = time.perf_counter() - start
+
+                correct = all(
+                    done.get(item["url"]) == expected_details(
+                        i, site.base_url, site.revisions.get(i, 0)
+                    )
+                    for i, item in enumerate(catalog)
+                )
+                report[name] = {
+                    "seconds": elapsed,
+                    "requests": sum(site.hits.values()) - hits,
+                    "not_modified": site.not_modified - not_modified,
+                    "kib_downloaded": (site.bytes_sent - sent) / 1024,
+                    "parses_reused": cache.stats["parse_reused"] + stats["pdf"]["cached"],
+                    "correct": correct and not failed,
+                }
+
+            await phase("cold", "conditional")
+            await phase("warm", "conditional")
+
+            for i in range(changed):
+                site.revisions[i] = 1
+            await phase(f"{changed} changed", "conditional")
+
+            await phase("replay", "replay")
+
+            return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper runs through the conditional HTTP cache")
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--changed", type=int, default=5)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = asyncio.run(run(args.pages, args.latency_ms, args.concurrency, args.changed))
+
+    print(f"{args.pages} pages + flyers, {args.latency_ms:g} ms server latency\n")
+    print(
+        f"{'run':<12} {'seconds':>8} {'requests':>9} {'304s':>6} "
+        f"{'KiB down':>9} {'parses reused':>14} {'correct':>8}"
+    )
+    for name, r in report.items():
+        print(
+            f"{name:<12} {r['seconds']:>8.2f} {r['requests']:>9} {r['not_modified']:>6} "
+            f"{r['kib_downloaded']:>9.1f} {r['parses_reused']:>14} {str(r['correct']):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from Processing.evaluation import load_ground_truth, score_rankings
+from Processing.index_versions import resolve_index_dir
+from Processing.metadata_store import MetadataStore
+from Processing.retrievel import (
+    VECTOR_STORE_PATH,
+    BACKEND,
+    EMBEDDING_MODEL_NAME,
+    query_cache,
+    MMREngine,
+    aggregate_chunks_to_assessments,
+)
+from Processing.vector_store import INDEX_FILE, INDEX_MODES, build_index, index_mode
+
+# Size / load time / dense query latency / accuracy for every index mode,
+# all built from the same float32 vectors and scored on the ground truth.
+
+
+def encode_queries(queries):
+    from sentence_transformers import SentenceTransformer
+
+    from Processing.embedding_cache import CachedEmbeddings
+    from Processing.serving import SentenceTransformerEmbeddings
+
+    embeddings = CachedEmbeddings(
+        SentenceTransformerEmbeddings(SentenceTransformer(EMBEDDING_MODEL_NAME)),
+        query_cache,
+        BACKEND.dim,
+    )
+    return np.asarray(embeddings.embed_queries(queries), dtype=np.float32)
+
+
+def recommend(engine: MMREngine, store: MetadataStore, query_vector: np.ndarray):
+    rows, scores = engine.search_with_scores(query_vector)[0]
+
+    docs = []
+    for row, score in zip(rows, scores):
+        doc = store.document(row)
+        doc.metadata["score"] = score
+        docs.append(doc)
+
+    return aggregate_chunks_to_assessments(docs, top_n=10, include_evidence=False)
+
+
+def run(modes, repeats: int) -> dict:
+    index_dir = resolve_index_dir(VECTOR_STORE_PATH)
+    source = faiss.read_index(str(index_dir / INDEX_FILE))
+    if index_mode(source) != "flat":
+        raise SystemExit(
+            f"{index_dir / INDEX_FILE} is {index_mode(source)!r}; "
+            "the report needs the flat index as its source"
+        )
+
+    vectors = source.reconstruct_n(0, source.ntotal)
+    store = MetadataStore(index_dir)
+
+    data = load_ground_truth()
+    query_vectors = encode_queries([item["query"] for item in data])
+
+    report = {}
+    reference = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in modes:
+            path = Path(tmp) / f"{mode}.faiss"
+            faiss.write_index(build_index(vectors, mode), str(path))
+
+            load_samples = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                index = faiss.read_index(str(path))
+                load_samples.append(time.perf_counter() - start)
+
+            engine = MMREngine(index)
+            recommend(engine, store, query_vectors[0])
+
+            latency_samples = []
+            all_recs = []
+            for q in query_vectors:
+                start = time.perf_counter()
+                all_recs.append(recommend(engine, store, q))
+                latency_samples.append(time.perf_counter() - start)
+
+            ranked = [[r["assessment_id"] for r in recs] for recs in all_recs]
+            if reference is None:
+                reference = ranked
+
+            # Agreement with the first mode (flat): how much quantization
+            # changes the top 10, independent of ground-truth quality
+            overlap = statistics.mean(
+                len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(ranked, reference)
+            )
+
+            report[mode] = {
+                "index_bytes": path.stat().st_size,
+                "resident_vector_bytes": engine.vectors.nbytes if engine.vectors is not None else 0,
+                "load_ms_median": 1000 * statistics.median(load_samples),
+                "query_ms_median": 1000 * statistics.median(latency_samples),
+                **score_rankings(data, all_recs),
+                "overlap@10_vs_flat": overlap,
+            }
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index size / latency / recall per index mode")
+    parser.add_argument("--modes", nargs="+", choices=INDEX_MODES, default=list(INDEX_MODES))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    modes = ["flat"] + [m for m in args.modes if m != "flat"]
+    report = run(modes, args.repeats)
+
+    print(
+        f"{'mode':<6} {'index KiB':>10} {'+MMR KiB':>9} {'load ms':>8} {'query ms':>9} "
+        f"{'R@5':>6} {'R@10':>6} {'MRR':>6} {'top10 vs flat':>14}"
+    )
+    for mode, r in report.items():
+        print(
+            f"{mode:<6} {r['index_bytes'] / 1024:>10.0f} {r['resident_vector_bytes'] / 1024:>9.0f} "
+            f"{r['load_ms_median']:>8.2f} {r['query_ms_median']:>9.3f} "
+            f"{r['recall@5']:>6.2f} {r['recall@10']:>6.2f} {r['mrr']:>6.2f} "
+            f"{r['overlap@10_vs_flat']:>14.2f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
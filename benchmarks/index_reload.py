@@ -0,0 +1,149 @@
+import argparse
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+import httpx
+import numpy as np
+
+from benchmarks.api_load import ROOT, free_port, load_queries, wait_ready
+from Processing.index_versions import current_version, resolve_index_dir, staged_version
+from Processing.retrievel import VECTOR_STORE_PATH
+
+# Zero-downtime index swaps under load. A uvicorn server (lean mode, hash
+# embedder, so no model download) serves a copy of the index from a temp
+# directory while closed-loop clients hit /recommend. Halfway through, a
+# new version is published and picked up by the watcher, then rolled back
+# and re-activated through the admin endpoints. Reports errors, latency
+# per phase and how long each switch took to show up in X-Index-Version.
+
+
+async def run(concurrency: int, phase_seconds: float, watch_seconds: float) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / VECTOR_STORE_PATH
+        shutil.copytree(resolve_index_dir(ROOT / VECTOR_STORE_PATH), root)
+
+        port = free_port()
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(ROOT),
+            "SHL_SERVING_MODE": "lean",
+            "SHL_EMBEDDING_BACKEND": "hash",
+            "SHL_QUERY_CACHE_DIR": "",
+            "SHL_INDEX_WATCH_SECONDS": str(watch_seconds),
+        }
+        server = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "api.main:app",
+                "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+            ],
+            cwd=tmp,
+            env=env,
+        )
+
+        queries = load_queries()
+        samples = []  # (sent at, latency, ok, version)
+        events = []  # (time, label, expected version)
+        stop = asyncio.Event()
+
+        try:
+            limits = httpx.Limits(max_connections=concurrency + 2)
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+            ) as client:
+                await wait_ready(client, server)
+
+                async def worker(n):
+                    i = n
+                    while not stop.is_set():
+                        start = time.perf_counter()
+                        try:
+                            response = await client.post(
+                                "/recommend", json={"query": queries[i % len(queries)], "top_k": 5}
+                            )
+                            ok = response.status_code == 200
+                            version = response.headers.get("X-Index-Version")
+                        except httpx.HTTPError:
+                            ok, version = False, None
+                        samples.append((start, time.perf_counter() - start, ok, version))
+                        i += concurrency
+
+                workers = [asyncio.create_task(worker(n)) for n in range(concurrency)]
+                initial = current_version(root)
+                events.append((time.perf_counter(), "start", initial))
+                await asyncio.sleep(phase_seconds)
+
+                # A rebuild publishes a new version; the watcher swaps it in
+                with staged_version(root, base=resolve_index_dir(root)):
+                    pass
+                published = current_version(root)
+                events.append((time.perf_counter(), "publish (watcher)", published))
+                await asyncio.sleep(phase_seconds)
+
+                events.append((time.perf_counter(), "rollback (admin)", initial))
+                rollback = await client.post("/admin/index/rollback")
+                rollback.raise_for_status()
+                await asyncio.sleep(phase_seconds)
+
+                events.append((time.perf_counter(), "reload (admin)", published))
+                reload = await client.post("/admin/index/reload", json={"version": published})
+                reload.raise_for_status()
+                await asyncio.sleep(phase_seconds)
+
+                stop.set()
+                await asyncio.gather(*workers)
+                metrics = (await client.get("/metrics")).text
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    phases = []
+    for n, (at, label, expected) in enumerate(events):
+        end = events[n + 1][0] if n + 1 < len(events) else float("inf")
+        window = [s for s in samples if at <= s[0] < end]
+        latencies = np.array([s[1] for s in window if s[2]]) * 1000
+        switched = next((s[0] - at for s in window if s[3] == expected), None)
+        phases.append({
+            "phase": label,
+            "version": expected,
+            "requests": len(window),
+            "errors": sum(1 for s in window if not s[2]),
+            "p50_ms": float(np.percentile(latencies, 50)) if len(latencies) else float("nan"),
+            "p99_ms": float(np.percentile(latencies, 99)) if len(latencies) else float("nan"),
+            "switch_seconds": switched,
+        })
+
+    reload_lines = [l for l in metrics.splitlines() if l.startswith(("shl_index_info", "shl_index_reloads_total"))]
+    return {"phases": phases, "metrics": reload_lines}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index hot reload and rollback under load")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--phase-seconds", type=float, default=3.0)
+    parser.add_argument("--watch-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.concurrency, args.phase_seconds, args.watch_seconds))
+
+    print(f"{args.concurrency} clients, watcher every {args.watch_seconds:g}s\n")
+    print(f"{'phase':<20} {'version':<24} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'switched after':>15}")
+    for p in report["phases"]:
+        switched = "-" if p["switch_seconds"] is None else f"{p['switch_seconds']:.2f}s"
+        print(
+            f"{p['phase']:<20} {p['version']:<24} {p['requests']:>9} {p['errors']:>7} "
+            f"{p['p50_ms']:>8.1f} {p['p99_ms']:>8.1f} {switched:>15}"
+        )
+    print()
+    for line in report["metrics"]:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
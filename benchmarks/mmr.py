@@ -0,0 +1,94 @@
+import argparse
+import time
+
+import numpy as np
+
+from Processing.retrievel import (
+    TOP_K,
+    FETCH_K,
+    LAMBDA_MULT,
+    VECTOR_STORE_PATH,
+    get_mmr_engine,
+)
+from Processing.vector_store import load_vector_store
+
+
+class NoEmbeddings:
+    """
+    The benchmark feeds vectors directly, so no model is loaded
+    """
+
+    def embed_documents(self, texts):
+        raise NotImplementedError
+
+    def embed_query(self, text):
+        raise NotImplementedError
+
+
+def make_queries(index_vectors: np.ndarray, n: int, noise: float, seed: int) -> np.ndarray:
+    # Perturbed catalog vectors: realistic neighbourhoods, no encoder needed
+    rng = np.random.default_rng(seed)
+    base = index_vectors[rng.integers(0, len(index_vectors), size=n)]
+    queries = base + noise * rng.standard_normal(base.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def document_id(vector_store, row: int) -> str:
+    return vector_store.docstore.search(vector_store.index_to_docstore_id[row]).metadata["assessment_id"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LangChain MMR vs native NumPy MMR")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from langchain_core.embeddings import Embeddings
+
+    Embeddings.register(NoEmbeddings)
+    vector_store = load_vector_store(NoEmbeddings(), VECTOR_STORE_PATH)
+
+    engine = get_mmr_engine(vector_store)
+    index_vectors = engine.row_vectors(np.arange(engine.index.ntotal))
+    queries = make_queries(index_vectors, args.queries, args.noise, args.seed)
+
+    # Equivalence: same documents, same order, for every query
+    mismatches = 0
+    langchain_seconds = 0.0
+    native_seconds = 0.0
+
+    for q in queries:
+        start = time.perf_counter()
+        docs = vector_store.max_marginal_relevance_search_by_vector(
+            q.tolist(), k=TOP_K, fetch_k=FETCH_K, lambda_mult=LAMBDA_MULT
+        )
+        langchain_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        rows = engine.search(q)[0]
+        native_seconds += time.perf_counter() - start
+
+        expected = [d.metadata["assessment_id"] for d in docs]
+        actual = [document_id(vector_store, r) for r in rows]
+        if expected != actual:
+            mismatches += 1
+
+    start = time.perf_counter()
+    engine.search(queries)
+    batched_seconds = time.perf_counter() - start
+
+    n = len(queries)
+    print(f"queries: {n}  (k={TOP_K}, fetch_k={FETCH_K}, lambda_mult={LAMBDA_MULT})")
+    print(f"equivalent: {n - mismatches}/{n}")
+    print(f"langchain MMR      : {1000 * langchain_seconds / n:.3f} ms/query")
+    print(f"native MMR         : {1000 * native_seconds / n:.3f} ms/query")
+    print(f"native MMR, batched: {1000 * batched_seconds / n:.3f} ms/query")
+    print(f"speedup            : {langchain_seconds / native_seconds:.1f}x")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.api_load import ROOT, drive, free_port, make_payloads, summarize, wait_ready
+
+# Memory and throughput of N API workers, two ways:
+#   per-worker  uvicorn --workers N, lean mode: every worker reads the
+#               index into its heap and loads its own encoder
+#   shared      api.multiworker: index mmapped, one embedding server
+# Memory is summed over the whole process tree: RSS counts shared pages
+# once per process, PSS splits them between the processes mapping them,
+# so PSS is the memory the box actually spends.
+#
+# The hash embedder (default) loads no model, so it shows the index and
+# interpreter overhead only; --embedder huggingface loads the real model
+# in each per-worker process, which is where most of the gap comes from.
+
+MODES = ("per-worker", "shared")
+
+
+def children(pid: int) -> List[int]:
+    found = []
+    for task in Path(f"/proc/{pid}/task").glob("*"):
+        try:
+            found.extend(int(c) for c in (task / "children").read_text().split())
+        except OSError:
+            pass
+    return found
+
+
+def process_tree(pid: int) -> List[int]:
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children(current))
+    return tree
+
+
+def tree_memory_mib(pid: int) -> Dict[str, float]:
+    rss = pss = 0
+    for p in process_tree(pid):
+        try:
+            for line in Path(f"/proc/{p}/smaps_rollup").read_text().splitlines():
+                if line.startswith("Rss:"):
+                    rss += int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss += int(line.split()[1])
+        except OSError:
+            pass
+    return {"rss_mib": rss / 1024, "pss_mib": pss / 1024}
+
+
+def start(mode: str, workers: int, port: int, socket_path: str, embedder: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "SHL_SERVING_MODE": "lean",
+        "SHL_EMBEDDING_BACKEND": embedder,
+        "SHL_QUERY_CACHE_DIR": "",
+        "SHL_RESPONSE_CACHE_SIZE": "0",
+        "SHL_INDEX_WATCH_SECONDS": "0",
+    }
+    if mode == "per-worker":
+        env["SHL_INDEX_MMAP"] = "0"
+        command = [
+            sys.executable, "-m", "uvicorn", "api.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+    else:
+        command = [
+            sys.executable, "-m", "api.multiworker",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--socket", socket_path, "--log-level", "warning",
+        ]
+    return subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL)
+
+
+async def measure(mode: str, workers: int, requests: int, concurrency: int, embedder: str) -> Dict:
+    port = free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start(mode, workers, port, os.path.join(tmp, "embeddings.sock"), embedder)
+        try:
+            limits = httpx.Limits(max_connections=concurrency + 2)
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=120
+            ) as client:
+                await wait_ready(client, server)
+
+                # /ready only proves one worker is up: keep the others busy
+                # until every worker has loaded (memory stops growing)
+                warm = make_payloads("unique", 20 * workers, 5, 0.0, seed=1)
+                await drive(client, warm, concurrency=2 * workers)
+                time.sleep(1)
+
+                idle = tree_memory_mib(server.pid)
+                payloads = make_payloads("unique", requests, 5, 0.0, seed=2)
+                samples, wall = await drive(client, payloads, concurrency)
+                loaded = tree_memory_mib(server.pid)
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "idle": idle,
+        "loaded": loaded,
+        **summarize(samples, wall),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker vs shared-encoder multi-worker serving")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--embedder", choices=["hash", "huggingface"], default="hash")
+    args = parser.parse_args()
+
+    rows = []
+    for workers in args.workers:
+        for mode in MODES:
+            rows.append(asyncio.run(
+                measure(mode, workers, args.requests, args.concurrency, args.embedder)
+            ))
+
+    print(f"embedder={args.embedder}, {args.requests} unique queries, {args.concurrency} clients\n")
+    print(f"{'mode':<11} {'workers':>7} {'RSS MiB':>9} {'PSS MiB':>9} {'rps':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for r in rows:
+        print(
+            f"{r['mode']:<11} {r['workers']:>7} {r['loaded']['rss_mib']:>9.0f} {r['loaded']['pss_mib']:>9.0f} "
+            f"{r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import io
+import os
+import random
+import tempfile
+import time
+
+from pypdf import PdfReader
+
+from benchmarks.fixture_site import make_pdf
+from Scrapping.pdf_text import PDFExtractor, PDF_WORKERS
+
+# Fact-sheet parsing throughput: the old inline loop against PDFExtractor
+# inline, on a process pool, and from its content-addressed cache. The
+# corpus mixes typical 1-3 page sheets with a few long outliers so the
+# per-document timings have something to flag.
+
+
+def legacy_pdf_to_text(content):
+    # The extraction loop scrape_assi_details.py used to run per flyer
+    reader = PdfReader(io.BytesIO(content))
+    text = ""
+
+    for page in reader.pages:
+        if page.extract_text():
+            text += page.extract_text() + "\n"
+
+    return text.strip()
+
+
+def make_corpus(documents: int, outliers: int, seed: int):
+    rng = random.Random(seed)
+    corpus = []
+
+    for i in range(documents):
+        lines = "\n".join(
+            f"Fact sheet {i} line {j}: competency {rng.randint(0, 999)} measured at level {j % 5}"
+            for j in range(40)
+        )
+        pages = 30 if i < outliers else rng.randint(1, 3)
+        corpus.append((f"fixture://flyers/{i}.pdf", make_pdf(lines, pages)))
+
+    return corpus
+
+
+async def extract_all(extractor: PDFExtractor, corpus):
+    return await asyncio.gather(*(extractor.extract(url, body) for url, body in corpus))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF text extraction throughput")
+    parser.add_argument("--documents", type=int, default=60)
+    parser.add_argument("--outliers", type=int, default=2, help="documents with 30 pages")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, PDF_WORKERS}))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.documents, args.outliers, args.seed)
+    total_pages = sum(len(PdfReader(io.BytesIO(body)).pages) for _, body in corpus)
+
+    start = time.perf_counter()
+    reference = [legacy_pdf_to_text(body) for _, body in corpus]
+    results = {"legacy inline": (time.perf_counter() - start, True)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in [0] + args.workers:
+            name = "inline" if workers == 0 else f"pool x{workers}"
+            with PDFExtractor(workers, cache_dir=None) as extractor:
+                start = time.perf_counter()
+                texts = asyncio.run(extract_all(extractor, corpus))
+                results[name] = (time.perf_counter() - start, texts == reference)
+
+        cache_dir = os.path.join(tmp, "pdf_text")
+        with PDFExtractor(max(args.workers), cache_dir) as extractor:
+            asyncio.run(extract_all(extractor, corpus))
+        with PDFExtractor(max(args.workers), cache_dir) as extractor:
+            start = time.perf_counter()
+            texts = asyncio.run(extract_all(extractor, corpus))
+            results["warm cache"] = (time.perf_counter() - start, texts == reference)
+
+        with PDFExtractor(0, cache_dir=None) as extractor:
+            asyncio.run(extract_all(extractor, corpus))
+            summary = extractor.summary()
+
+    print(f"{len(corpus)} PDFs, {total_pages} pages, {os.cpu_count()} CPUs\n")
+    print(f"{'extractor':<14} {'seconds':>8} {'docs/s':>8} {'same text':>10}")
+    for name, (seconds, same) in results.items():
+        print(f"{name:<14} {seconds:>8.3f} {len(corpus) / seconds:>8.1f} {str(same):>10}")
+
+    print("\nSlowest documents")
+    for t in summary["slowest"]:
+        print(f"  {t['seconds']:7.3f}s  {t['pages']:>3} pages  {t['bytes'] / 1024:6.0f} KiB  {t['url']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+# Response cache hit rates and answer quality per similarity threshold, on
+# a stream of paraphrased queries. Each request runs through ResponseCache
+# in front of a LeanEngine (in-process, no HTTP). For every semantic hit,
+# the cached list is compared with what a fresh search returns for that
+# exact query: `agreement@k` is their top-k overlap, the price of the hit.
+#
+# Similarities depend on the encoder, so tune the threshold with the
+# model that is served (--embedder huggingface); under the hash stand-in
+# they only measure shared words.
+
+# Paraphrase groups; a request draws a group (Zipf-like), then a wording
+PARAPHRASES = [
+    [
+        "Java developer 3 years",
+        "Java dev with 3 yrs experience",
+        "hiring a Java developer with three years of experience",
+        "mid-level Java engineer, 3 years",
+    ],
+    [
+        "entry level sales role for new graduates",
+        "sales graduate hiring",
+        "new graduates for a sales position",
+        "junior sales representative, fresh graduates",
+    ],
+    [
+        "senior data analyst SQL Excel Python",
+        "data analyst with SQL, Python and Excel skills",
+        "hiring a senior data analyst, expert in SQL and Python",
+        "SQL Python Excel analyst with 5 years of experience",
+    ],
+    [
+        "content writer English SEO",
+        "SEO content writer with excellent English",
+        "hiring a content writer, SEO expert",
+        "English copywriter with SEO skills",
+    ],
+    [
+        "bank assistant admin 0-2 years",
+        "administrative assistant for a bank, entry level",
+        "junior admin assistant in banking",
+        "bank admin assistant, fresher",
+    ],
+    [
+        "marketing manager brand positioning",
+        "brand marketing manager",
+        "hiring a marketing manager for brand and community growth",
+        "marketing lead for brand strategy",
+    ],
+    [
+        "COO cultural fit",
+        "chief operating officer culture fit assessment",
+        "executive COO hire, culture fit",
+        "culture fit test for a COO",
+    ],
+    [
+        "customer service representative",
+        "call center customer support agent",
+        "customer support rep for phone service",
+        "contact centre customer service agent",
+    ],
+]
+
+# Context users tack on, which makes most wordings near-duplicates of one
+# already seen rather than exact repeats
+SUFFIXES = ["", "", "", ", remote", ", urgent", " for our Bangalore office", ", asap", " - need options"]
+# Share of requests that repeat a wording with different whitespace
+WHITESPACE_VARIANTS = 0.2
+
+
+def make_stream(n: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(PARAPHRASES))]
+
+    stream = []
+    for _ in range(n):
+        query = rng.choice(rng.choices(PARAPHRASES, weights)[0]) + rng.choice(SUFFIXES)
+        if rng.random() < WHITESPACE_VARIANTS:
+            query = "  " + query.replace(" ", "  ") + " "
+        stream.append(query)
+    return stream
+
+
+def agreement(a: List[Dict], b: List[Dict]) -> float:
+    ids_a = {r["assessment_id"] for r in a}
+    ids_b = {r["assessment_id"] for r in b}
+    return len(ids_a & ids_b) / max(len(ids_b), 1)
+
+
+def run(engine, stream: List[str], threshold: float, max_entries: int, top_k: int) -> Dict:
+    from api.response_cache import ResponseCache
+
+    cache = ResponseCache(lambda: "bench", max_entries=max_entries, threshold=threshold)
+
+    def embed(batch):
+        return engine.embeddings.embed_queries(batch)
+
+    def search(batch):
+        return engine.recommend_batch(batch, top_n=top_k, include_evidence=False)
+
+    fresh: Dict[str, List[Dict]] = {}
+    latencies = {"exact": [], "semantic": [], "miss": []}
+    agreements = []
+
+    for query in stream:
+        before = cache.stats()
+        start = time.perf_counter()
+        results = cache.search("bench", [query], top_k, None, search=search, embed=embed)[0]
+        elapsed = time.perf_counter() - start
+        after = cache.stats()
+
+        if after["exact_hits"] > before["exact_hits"]:
+            outcome = "exact"
+        elif after["semantic_hits"] > before["semantic_hits"]:
+            outcome = "semantic"
+            if query not in fresh:
+                fresh[query] = search([query])[0]
+            agreements.append(agreement(results, fresh[query]))
+        else:
+            outcome = "miss"
+        latencies[outcome].append(elapsed * 1000)
+
+    stats = cache.stats()
+    everything = [ms for samples in latencies.values() for ms in samples]
+    return {
+        "threshold": threshold,
+        "hit_rate": stats["hit_rate"],
+        "exact_hit_rate": stats["exact_hits"] / len(stream),
+        "semantic_hit_rate": stats["semantic_hit_rate"],
+        "agreement@k": statistics.mean(agreements) if agreements else float("nan"),
+        "mean_ms": statistics.mean(everything),
+        "p50_ms": float(np.percentile(everything, 50)),
+        "miss_ms": statistics.mean(latencies["miss"]) if latencies["miss"] else float("nan"),
+        "hit_ms": statistics.mean(latencies["exact"] + latencies["semantic"])
+        if latencies["exact"] or latencies["semantic"] else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response cache hit rate / agreement per similarity threshold")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9, 0.95])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--max-entries", type=int, default=1024)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--embedder", choices=["hash", "huggingface"], default="hash")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    os.environ.update({"SHL_EMBEDDING_BACKEND": args.embedder, "SHL_QUERY_CACHE_DIR": ""})
+    from Processing.serving import LeanEngine
+
+    engine = LeanEngine()
+    engine.wait_ready()
+
+    stream = make_stream(args.requests, args.seed)
+
+    # No cache at all: every request searches
+    baseline = run(engine, stream, threshold=2.0, max_entries=0, top_k=args.top_k)
+    rows = [{**baseline, "threshold": "off"}]
+    rows += [run(engine, stream, t, args.max_entries, args.top_k) for t in args.thresholds]
+
+    print(f"embedder={args.embedder}, {args.requests} requests over {len(PARAPHRASES)} paraphrase groups\n")
+    print(
+        f"{'threshold':>9} {'hit rate':>9} {'exact':>7} {'semantic':>9} {'agree@k':>8} "
+        f"{'mean ms':>8} {'p50 ms':>7} {'hit ms':>7} {'miss ms':>8}"
+    )
+    for r in rows:
+        print(
+            f"{r['threshold']:>9} {r['hit_rate']:>9.2f} {r['exact_hit_rate']:>7.2f} "
+            f"{r['semantic_hit_rate']:>9.2f} {r['agreement@k']:>8.2f} {r['mean_ms']:>8.3f} "
+            f"{r['p50_ms']:>7.3f} {r['hit_ms']:>7.3f} {r['miss_ms']:>8.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from benchmarks.fixture_site import FixtureSite, expected_details
+from Scrapping.scrape_assi_details import load_checkpoint, scrape_all
+
+# Detail scraper against a local fixture site: wall time at each
+# concurrency level, per-host pacing, retries on injected 503s, and
+# resuming from the checkpoint after a run is killed halfway.
+
+
+async def timed_run(site_options, concurrency, rate, checkpoint):
+    async with FixtureSite(**site_options) as site:
+        start = time.perf_counter()
+        done, failed, stats = await scrape_all(
+            site.catalog(), checkpoint, concurrency, rate, pdf_cache_dir=None, backoff_factor=0.01
+        )
+        elapsed = time.perf_counter() - start
+
+        wrong = [
+            url for i, url in enumerate(item["url"] for item in site.catalog())
+            if url in done and done[url] != expected_details(i, site.base_url)
+        ]
+        return {
+            "seconds": elapsed,
+            "scraped": len(done),
+            "failed": len(failed),
+            "wrong": len(wrong),
+            "requests": stats["requests"],
+            "retried": stats["retried"],
+            "max_per_second": site.max_rate(),
+        }
+
+
+async def interrupted_run(site_options, concurrency, rate, checkpoint):
+    """
+    Cancels the scrape once half the pages are checkpointed (a crash, as
+    far as the checkpoint can tell), then runs it again.
+    """
+    async with FixtureSite(**site_options) as site:
+        catalog = site.catalog()
+        half = len(catalog) // 2
+
+        task = asyncio.create_task(
+            scrape_all(catalog, checkpoint, concurrency, rate, pdf_cache_dir=None, backoff_factor=0.01)
+        )
+        while len(load_checkpoint(checkpoint)) < half:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+        completed_before = set(load_checkpoint(checkpoint))
+        site.hits.clear()
+
+        done, failed, stats = await scrape_all(
+            catalog, checkpoint, concurrency, rate, pdf_cache_dir=None, backoff_factor=0.01
+        )
+
+        refetched = [url for url in completed_before if site.hits[urlparse(url).path]]
+        pages_second_run = sum(n for path, n in site.hits.items() if path.startswith("/products/"))
+        correct = all(
+            done.get(item["url"]) == expected_details(i, site.base_url)
+            for i, item in enumerate(catalog)
+        )
+        return {
+            "checkpointed_before_kill": len(completed_before),
+            "resumed": stats["resumed"],
+            "pages_fetched_after_restart": pages_second_run,
+            "complete_and_correct": correct and not failed and not refetched,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detail scraper against a local fixture site")
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 16])
+    parser.add_argument("--rate", type=float, default=1000.0, help="per-host requests per second")
+    parser.add_argument("--paced-rate", type=float, default=20.0, help="rate for the pacing check")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    args = parser.parse_args()
+
+    site_options = {"pages": args.pages, "latency_ms": args.latency_ms}
+    flaky = {
+        **site_options,
+        "fail_first": {"/products/3/": 2, "/flyers/5.pdf": 1},
+        "missing": [7],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def checkpoint(name):
+            return os.path.join(tmp, f"{name}.jsonl")
+
+        quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+
+        with quiet:
+            throughput = {
+                c: asyncio.run(timed_run(site_options, c, args.rate, checkpoint(f"c{c}")))
+                for c in args.concurrency
+            }
+            paced = asyncio.run(
+                timed_run(site_options, max(args.concurrency), args.paced_rate, checkpoint("paced"))
+            )
+            failures = asyncio.run(
+                timed_run(flaky, max(args.concurrency), args.rate, checkpoint("flaky"))
+            )
+            resume = asyncio.run(
+                interrupted_run(site_options, max(args.concurrency), args.rate, checkpoint("resume"))
+            )
+
+    print(f"{args.pages} pages + flyers, {args.latency_ms:g} ms server latency\n")
+    print(f"{'concurrency':<12} {'seconds':>8} {'pages/s':>8} {'requests':>9} {'wrong':>6}")
+    for c, r in throughput.items():
+        print(
+            f"{c:<12} {r['seconds']:>8.2f} {r['scraped'] / r['seconds']:>8.1f} "
+            f"{r['requests']:>9} {r['wrong']:>6}"
+        )
+
+    print(
+        f"\nrate limit {args.paced_rate:g}/s (burst included): busiest second saw "
+        f"{paced['max_per_second']} requests, run took {paced['seconds']:.1f}s"
+    )
+    print(
+        f"injected 503s: {failures['retried']} retries, {failures['scraped']} scraped, "
+        f"{failures['failed']} failed (one 404 page), {failures['wrong']} wrong"
+    )
+    print(
+        f"resume: {resume['checkpointed_before_kill']} checkpointed before the kill, "
+        f"{resume['resumed']} reused, {resume['pages_fetched_after_restart']} pages fetched "
+        f"after restart, complete and correct: {resume['complete_and_correct']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODES = ["langchain", "lean"]
+
+# Runs in a fresh interpreter so every sample is a true cold start.
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import api.main as m
+imported = time.perf_counter() - start
+if m.SERVING_MODE == "lean":
+    m.reloader.current.backend.wait_ready()
+ready = time.perf_counter() - start
+print(json.dumps({
+    "import_seconds": imported,
+    "ready_seconds": ready,
+    "langchain_modules": sum(1 for k in sys.modules if k.startswith("langchain")),
+}))
+"""
+
+
+def measure(mode: str) -> dict:
+    env = {**os.environ, "SHL_SERVING_MODE": mode}
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def run(modes, repeats: int) -> dict:
+    report = {}
+
+    for mode in modes:
+        samples = [measure(mode) for _ in range(repeats)]
+
+        report[mode] = {
+            "repeats": repeats,
+            "import_seconds_median": statistics.median(s["import_seconds"] for s in samples),
+            "ready_seconds_median": statistics.median(s["ready_seconds"] for s in samples),
+            "langchain_modules": samples[-1]["langchain_modules"],
+        }
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time of api.main per serving mode")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print raw JSON report")
+    args = parser.parse_args()
+
+    report = run(args.modes, args.repeats)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'mode':<10} {'import (s)':>12} {'ready (s)':>12} {'langchain mods':>16}")
+    for mode, r in report.items():
+        print(
+            f"{mode:<10} {r['import_seconds_median']:>12.2f} "
+            f"{r['ready_seconds_median']:>12.2f} {r['langchain_modules']:>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+from benchmarks.api_load import ROOT, free_port, make_payloads, wait_ready
+
+# Time to first result vs total latency, POST /recommend against
+# POST /recommend/stream (NDJSON and SSE), on a uvicorn subprocess over a
+# local socket so the response really is delivered in chunks. Closed loop
+# as in api_load.
+#
+# The plain endpoint's first result is only usable once the whole JSON
+# body has arrived and parsed; a stream's is the first "result" event.
+# All results are ranked together, so the gap is the tail of the response
+# (serialization and transfer), not the search; use --encode-delay-ms to
+# give the hash embedder a realistic encode cost.
+
+FORMATS = ("json", "ndjson", "sse")
+
+
+def event_name(fmt: str, line: str, pending: str) -> Tuple[str, str]:
+    """(completed event or "", pending SSE event name) for one line."""
+    if fmt == "ndjson":
+        return (json.loads(line)["event"] if line else ""), ""
+    if line.startswith("event: "):
+        return "", line[len("event: "):]
+    if line.startswith("data: "):
+        return pending, ""
+    return "", pending
+
+
+async def timed_request(client: httpx.AsyncClient, fmt: str, payload: Dict) -> Dict:
+    start = time.perf_counter()
+
+    if fmt == "json":
+        response = await client.post("/recommend", json=payload)
+        results = response.json()
+        total = time.perf_counter() - start
+        return {"ok": response.status_code == 200, "first_ms": 1000 * total, "total_ms": 1000 * total, "count": len(results)}
+
+    first = None
+    count = 0
+    ok = False
+    pending = ""
+    async with client.stream("POST", f"/recommend/stream?format={fmt}", json=payload) as response:
+        async for line in response.aiter_lines():
+            event, pending = event_name(fmt, line, pending)
+            if event == "result":
+                count += 1
+                if first is None:
+                    first = time.perf_counter() - start
+            elif event == "done":
+                ok = response.status_code == 200
+    total = time.perf_counter() - start
+    return {"ok": ok, "first_ms": 1000 * (total if first is None else first), "total_ms": 1000 * total, "count": count}
+
+
+async def drive(client: httpx.AsyncClient, fmt: str, payloads: List[Dict], concurrency: int) -> List[Dict]:
+    samples: List[Dict] = []
+    position = iter(range(len(payloads)))
+
+    async def worker():
+        for i in position:
+            try:
+                samples.append(await timed_request(client, fmt, payloads[i]))
+            except httpx.HTTPError:
+                samples.append({"ok": False})
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+def summarize(fmt: str, concurrency: int, samples: List[Dict]) -> Dict:
+    ok = [s for s in samples if s["ok"]]
+    first = np.array([s["first_ms"] for s in ok])
+    total = np.array([s["total_ms"] for s in ok])
+
+    def pct(values, q):
+        return float(np.percentile(values, q)) if len(values) else float("nan")
+
+    return {
+        "format": fmt,
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "first_p50_ms": pct(first, 50),
+        "first_p95_ms": pct(first, 95),
+        "total_p50_ms": pct(total, 50),
+        "total_p95_ms": pct(total, 95),
+    }
+
+
+async def run(args) -> List[Dict]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(ROOT),
+        "SHL_SERVING_MODE": "lean",
+        "SHL_EMBEDDING_BACKEND": args.embedder,
+        "SHL_HASH_EMBEDDING_DELAY_MS": str(args.encode_delay_ms),
+        "SHL_QUERY_CACHE_DIR": "",
+        "SHL_RESPONSE_CACHE_SIZE": "0",
+        "SHL_INDEX_WATCH_SECONDS": "0",
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "api.main:app",
+            "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+
+    rows = []
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 2)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60
+        ) as client:
+            await wait_ready(client, server)
+            for concurrency in args.concurrency:
+                for i, fmt in enumerate(FORMATS):
+                    seed = 100 * concurrency + i
+                    await drive(client, fmt, make_payloads("unique", 20, args.top_k, 0.0, seed=seed), concurrency)
+                    payloads = make_payloads("unique", args.requests, args.top_k, 0.0, seed=seed + 50)
+                    rows.append(summarize(fmt, concurrency, await drive(client, fmt, payloads, concurrency)))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first result: /recommend vs /recommend/stream")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--embedder", choices=["hash", "huggingface"], default="hash")
+    parser.add_argument("--encode-delay-ms", type=float, default=0.0, help="simulated encode cost for --embedder hash")
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+
+    print(f"embedder={args.embedder}, {args.requests} unique queries per run, top_k={args.top_k}\n")
+    print(
+        f"{'format':<7} {'clients':>7} {'first p50':>10} {'first p95':>10} "
+        f"{'total p50':>10} {'total p95':>10} {'errors':>7}"
+    )
+    for r in rows:
+        print(
+            f"{r['format']:<7} {r['concurrency']:>7} {r['first_p50_ms']:>10.2f} {r['first_p95_ms']:>10.2f} "
+            f"{r['total_p50_ms']:>10.2f} {r['total_p95_ms']:>10.2f} {r['errors']:>7}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
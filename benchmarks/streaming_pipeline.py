@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from Processing.records import RecordWriter, read_records
+from Scrapping.structured_data import INPUT_FILE, build_structured_record
+
+# The structuring stage over a catalog scaled up from the enriched data:
+# json.load + json.dump of whole arrays against read_records/RecordWriter,
+# by peak Python heap (tracemalloc). Then two stages run at once, the
+# downstream one following the upstream's .jsonl.partial, to show when the
+# first structured record lands compared with waiting for the full file.
+
+
+def scaled_catalog(copies: int):
+    with open(INPUT_FILE, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    return [
+        {**item, "name": f"{item['name']} {c}", "url": f"{item['url']}#{c}"}
+        for c in range(copies)
+        for item in base
+    ]
+
+
+def peak(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, top / 2**20
+
+
+def array_stage(src, dst):
+    with open(src, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump([build_structured_record(item) for item in data], f, indent=2, ensure_ascii=False)
+
+
+def streaming_stage(src, *dst):
+    with RecordWriter(*dst) as out:
+        for item in read_records(src):
+            out.write(build_structured_record(item))
+
+
+def overlap(tmp, records, delay):
+    upstream = os.path.join(tmp, "enriched.jsonl")
+    downstream = os.path.join(tmp, "structured_follow.jsonl")
+
+    def produce():
+        with RecordWriter(upstream) as out:
+            for item in records:
+                out.write(item)
+                time.sleep(delay)
+
+    start = time.perf_counter()
+    producer = threading.Thread(target=produce)
+    producer.start()
+
+    first = None
+    with RecordWriter(downstream) as out:
+        for item in read_records(upstream, follow=True):
+            out.write(build_structured_record(item))
+            if first is None:
+                first = time.perf_counter() - start
+
+    producer.join()
+    return first, time.perf_counter() - start, out.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Array vs streaming stage memory and stage overlap")
+    parser.add_argument("--copies", type=int, default=20, help="catalog size as a multiple of the real one")
+    parser.add_argument("--follow-records", type=int, default=200)
+    parser.add_argument("--delay-ms", type=float, default=5.0, help="upstream time per record")
+    args = parser.parse_args()
+
+    catalog = scaled_catalog(args.copies)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src_json = os.path.join(tmp, "enriched.json")
+        src_jsonl = os.path.join(tmp, "enriched_full.jsonl")
+        with open(src_json, "w", encoding="utf-8") as f:
+            json.dump(catalog, f, indent=2, ensure_ascii=False)
+        with RecordWriter(src_jsonl) as out:
+            for item in catalog:
+                out.write(item)
+        size = os.path.getsize(src_json) / 2**20
+        del catalog
+
+        out_array = os.path.join(tmp, "array.json")
+        out_stream = os.path.join(tmp, "stream.json")
+        rows = {
+            "array (json)": peak(lambda: array_stage(src_json, out_array)),
+            "stream (json)": peak(lambda: streaming_stage(src_json, out_stream)),
+            "stream (jsonl)": peak(lambda: streaming_stage(src_jsonl, os.path.join(tmp, "stream.jsonl"))),
+        }
+        with open(out_array, "rb") as a, open(out_stream, "rb") as b:
+            identical = a.read() == b.read()
+
+        records = list(read_records(src_jsonl))[: args.follow_records]
+        start = time.perf_counter()
+        for item in records:
+            build_structured_record(item)
+        downstream_seconds = time.perf_counter() - start
+        first, total, count = overlap(tmp, records, args.delay_ms / 1000)
+
+    print(f"structuring {size:.1f} MiB of enriched records ({args.copies}x catalog)\n")
+    print(f"{'stage':<16} {'seconds':>8} {'peak MiB':>9}")
+    for name, (seconds, mib) in rows.items():
+        print(f"{name:<16} {seconds:>8.2f} {mib:>9.1f}")
+    print(f"streamed JSON identical to json.dump: {identical}")
+
+    upstream_seconds = len(records) * args.delay_ms / 1000
+    print(
+        f"\nfollow: {len(records)} records, upstream ~{upstream_seconds:.2f}s; "
+        f"first structured record after {first:.3f}s, all {count} after {total:.2f}s "
+        f"(one stage after the other: first after ~{upstream_seconds:.2f}s, "
+        f"all after ~{upstream_seconds + downstream_seconds:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()